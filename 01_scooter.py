@@ -1,11 +1,18 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Iterable, List, Set
+
+# подписчик на изменения: (самокат, имя поля, старое значение, новое значение)
+ChangeListener = Callable[["Scooter", str, Any, Any], None]
 
 # валидация входных данных
 class InvalidScooterError(ValueError):
     pass
 
 class Scooter(ABC):
+    # фиксированный набор полей вместо __dict__ (экономия памяти)
+    __slots__ = ("__scooter_id", "__model", "__battery_level", "__hourly_rate", "__is_available", "__listeners")
+
     def __init__(self, scooter_id: str, model: str, battery_level: int, hourly_rate: float, is_available: bool = True):
         # приватные атрибуты 
         self.__scooter_id = scooter_id
@@ -13,6 +20,8 @@ class Scooter(ABC):
         self.__battery_level = battery_level
         self.__hourly_rate = hourly_rate
         self.__is_available = is_available
+        # подписчики на изменения свойств (станции, индексы и т.п.)
+        self.__listeners: List[ChangeListener] = []
 
         # валидация с данных
         if not (0 <= self.__battery_level <= 100):
@@ -35,7 +44,8 @@ class Scooter(ABC):
     def model(self, value: str) -> None:
         if not value:
             raise InvalidScooterError("Модель не может быть пустой.")
-        self.__model = value
+        old, self.__model = self.__model, value
+        self._notify("model", old, value)
 
     # геттер/сеттер для уровня заряда
     @property
@@ -47,7 +57,8 @@ class Scooter(ABC):
         # уровень заряда должен быть от 0 до 100
         if not (0 <= value <= 100):
             raise InvalidScooterError("Уровень заряда должен быть 0..100.")
-        self.__battery_level = value
+        old, self.__battery_level = self.__battery_level, value
+        self._notify("battery_level", old, value)
 
     # геттер/сеттер для почасовой ставки
     @property
@@ -59,7 +70,8 @@ class Scooter(ABC):
         # почасовая ставка должна быть положительной
         if value <= 0:
             raise InvalidScooterError("hourly_rate должен быть > 0.")
-        self.__hourly_rate = value
+        old, self.__hourly_rate = self.__hourly_rate, value
+        self._notify("hourly_rate", old, value)
 
     # геттер/сеттер доступности
     @property
@@ -69,7 +81,26 @@ class Scooter(ABC):
     @is_available.setter
     def is_available(self, value: bool) -> None:
         # приводим к bool для единообразия
-        self.__is_available = bool(value)
+        old, self.__is_available = self.__is_available, bool(value)
+        self._notify("is_available", old, self.__is_available)
+
+    # подписка на изменения свойств
+    def add_listener(self, listener: ChangeListener) -> None:
+        self.__listeners.append(listener)
+
+    def remove_listener(self, listener: ChangeListener) -> None:
+        # отписка; неизвестного подписчика молча игнорируем
+        try:
+            self.__listeners.remove(listener)
+        except ValueError:
+            pass
+
+    def _notify(self, field: str, old: Any, new: Any) -> None:
+        # уведомляем только о реальных изменениях
+        if old == new:
+            return
+        for listener in tuple(self.__listeners):
+            listener(self, field, old, new)
 
     @abstractmethod
     def calculate_rental_cost(self, hours: float) -> float:
@@ -101,3 +132,73 @@ class Scooter(ABC):
             return self.hourly_rate > other.hourly_rate
         # если ставки равны, сравниваем по заряду
         return self.battery_level > other.battery_level
+
+class DirtyTracker:
+    """
+    Учет самокатов, измененных через сеттеры, между сохранениями.
+    Подписывается на изменения свойств (add_listener) и запоминает
+    scooter_id -> имена измененных полей, поэтому сохранение дельты стоит
+    столько, сколько было изменений, а не размер парка. Подходит любой
+    самокат с add_listener, в том числе самокаты 12_serialization.
+    Методы:
+      - track / untrack: подписать / отписать самокат(ы)
+      - dirty: текущие изменения {scooter_id: {поле, ...}}
+      - peek: то же без очистки учета
+      - mark_saved: снять с учета записанные значения (после записи peek)
+      - take: peek с очисткой учета
+    """
+    def __init__(self, scooters: Iterable[Scooter] = ()):
+        self._changes: Dict[str, Set[str]] = {}
+        self._objects: Dict[str, Scooter] = {}
+        for scooter in scooters:
+            self.track(scooter)
+
+    def __len__(self) -> int:
+        # число измененных самокатов
+        return len(self._changes)
+
+    def track(self, scooter: Scooter) -> None:
+        scooter.add_listener(self._on_change)
+
+    def untrack(self, scooter: Scooter) -> None:
+        scooter.remove_listener(self._on_change)
+        self._changes.pop(scooter.scooter_id, None)
+        self._objects.pop(scooter.scooter_id, None)
+
+    def dirty(self) -> Dict[str, Set[str]]:
+        return {sid: set(fields) for sid, fields in self._changes.items()}
+
+    def peek(self) -> Dict[str, Dict[str, Any]]:
+        # значения читаются в момент вызова: несколько изменений поля дают одно
+        objects = self._objects
+        return {
+            sid: {name: getattr(objects[sid], name) for name in fields}
+            for sid, fields in self._changes.items()
+        }
+
+    def mark_saved(self, changes: Dict[str, Dict[str, Any]]) -> None:
+        # поле остается в учете, если после peek его значение снова изменилось
+        for sid, saved in changes.items():
+            fields = self._changes.get(sid)
+            if fields is None:
+                continue
+            obj = self._objects[sid]
+            for name, value in saved.items():
+                if name in fields and getattr(obj, name) == value:
+                    fields.discard(name)
+            if not fields:
+                del self._changes[sid]
+                del self._objects[sid]
+
+    def take(self) -> Dict[str, Dict[str, Any]]:
+        changes = self.peek()
+        self._changes, self._objects = {}, {}
+        return changes
+
+    def _on_change(self, scooter: Scooter, field: str, old: Any, new: Any) -> None:
+        sid = scooter.scooter_id
+        fields = self._changes.get(sid)
+        if fields is None:
+            self._changes[sid] = fields = set()
+            self._objects[sid] = scooter
+        fields.add(field)
@@ -1,5 +1,5 @@
 from __future__ import annotations
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional
 from dataclasses import dataclass, field
 
 # простые исключения локально, чтобы файл был автономным
@@ -7,7 +7,7 @@ class InvalidScooterError(ValueError):
     # ошибка некорректных данных самоката
     pass
 
-@dataclass
+@dataclass(slots=True)
 class Location:
     """
     Класс Location для композиции со станцией.
@@ -49,10 +49,23 @@ class RentalStation:
       - capacity: максимальная вместимость
       - location_info: композиция с Location
       - scooters: список самокатов (агрегация, может быть пустым при создании)
+      - indexed: индексированный режим инвентаря (по умолчанию выключен)
     Методы:
       - add_scooter
       - remove_scooter
       - get_available_scooters
+      - has_scooter / available_count
+      - refresh_availability
+      - add_listener / remove_listener: подписка на изменение заполненности
+        (вызывается с самой станцией после add_scooter/remove_scooter)
+    Индексированный режим:
+      - словарь scooter_id -> позиция в scooters и набор доступных самокатов;
+      - удаление, проверка наличия и available_count — O(1),
+        get_available_scooters — пропорционально числу доступных;
+      - набор доступных обновляется через add_listener самоката, для объектов
+        без подписки нужно вызывать refresh_availability;
+      - порядок scooters при удалении не сохраняется (на место удаленного
+        переносится последний элемент).
     Сравнение (__eq__, __lt__, __gt__):
       - сравниваем по коэффициенту заполнения (занято/вместимость), затем по capacity.
     """
@@ -60,28 +73,55 @@ class RentalStation:
     capacity: int
     location_info: Location
     scooters: List[object] = field(default_factory=list)
+    indexed: bool = False
+    # служебные индексы (используются только в индексированном режиме)
+    _positions: Dict[str, int] = field(default_factory=dict, init=False, repr=False)
+    _available: Dict[str, object] = field(default_factory=dict, init=False, repr=False)
+    _listeners: List[Callable[["RentalStation"], None]] = field(default_factory=list, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        if not self.indexed:
+            return
+        # строим индексы по начальному списку
+        initial, self.scooters = self.scooters, []
+        for s in initial:
+            self._index_scooter(s)
 
     def add_scooter(self, scooter: object) -> None:
         # добавляем самокат, если есть место
         if len(self.scooters) >= self.capacity:
             # нет свободных слотов
             raise InvalidScooterError("Станция переполнена.")
-        # добавляем объект самоката (агрегация, станция не владеет жизненным циклом)
-        self.scooters.append(scooter)
+        if self.indexed:
+            self._index_scooter(scooter)
+        else:
+            # добавляем объект самоката (агрегация, станция не владеет жизненным циклом)
+            self.scooters.append(scooter)
+        self._notify()
 
     def remove_scooter(self, scooter_id: str) -> bool:
-        # удаляем самокат по идентификатору
-        for i, s in enumerate(self.scooters):
-            # пытаемся прочитать атрибут scooter_id
-            sid = getattr(s, "scooter_id", None)
-            if sid == scooter_id:
-                # удаляем элемент по индексу
-                del self.scooters[i]
-                return True
-        # самокат не найден
-        return False
+        if self.indexed:
+            removed = self._unindex_scooter(scooter_id)
+        else:
+            removed = False
+            # удаляем самокат по идентификатору
+            for i, s in enumerate(self.scooters):
+                # пытаемся прочитать атрибут scooter_id
+                sid = getattr(s, "scooter_id", None)
+                if sid == scooter_id:
+                    # удаляем элемент по индексу
+                    del self.scooters[i]
+                    removed = True
+                    break
+        if removed:
+            self._notify()
+        # False — самокат не найден
+        return removed
 
     def get_available_scooters(self) -> List[object]:
+        if self.indexed:
+            # только доступные, без прохода по всему инвентарю
+            return list(self._available.values())
         # фильтруем по признаку доступности
         result = []
         for s in self.scooters:
@@ -91,6 +131,85 @@ class RentalStation:
                 result.append(s)
         return result
 
+    def has_scooter(self, scooter_id: str) -> bool:
+        # проверка наличия самоката на станции
+        if self.indexed:
+            return scooter_id in self._positions
+        return any(getattr(s, "scooter_id", None) == scooter_id for s in self.scooters)
+
+    def available_count(self) -> int:
+        # количество доступных самокатов
+        if self.indexed:
+            return len(self._available)
+        return len(self.get_available_scooters())
+
+    def refresh_availability(self, scooter_id: str) -> None:
+        # перечитываем is_available самоката (для объектов без add_listener)
+        if not self.indexed:
+            return
+        pos = self._positions.get(scooter_id)
+        if pos is not None:
+            self._sync_availability(self.scooters[pos])
+
+    def add_listener(self, listener: Callable[["RentalStation"], None]) -> None:
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[["RentalStation"], None]) -> None:
+        # отписка; неизвестного подписчика молча игнорируем
+        try:
+            self._listeners.remove(listener)
+        except ValueError:
+            pass
+
+    def _notify(self) -> None:
+        # сообщаем подписчикам об изменении заполненности
+        for listener in tuple(self._listeners):
+            listener(self)
+
+    def _index_scooter(self, scooter: object) -> None:
+        # добавление в индексированном режиме
+        sid = getattr(scooter, "scooter_id", None)
+        if sid is None:
+            raise InvalidScooterError("У самоката нет scooter_id.")
+        if sid in self._positions:
+            raise InvalidScooterError(f"Самокат {sid!r} уже на станции.")
+        self._positions[sid] = len(self.scooters)
+        self.scooters.append(scooter)
+        self._sync_availability(scooter)
+        # подписываемся на смену доступности, если самокат это поддерживает
+        add_listener = getattr(scooter, "add_listener", None)
+        if add_listener is not None:
+            add_listener(self._on_scooter_changed)
+
+    def _unindex_scooter(self, scooter_id: str) -> bool:
+        # удаление за O(1): на место удаляемого ставим последний элемент
+        pos = self._positions.pop(scooter_id, None)
+        if pos is None:
+            return False
+        scooter = self.scooters[pos]
+        last = self.scooters.pop()
+        if pos < len(self.scooters):
+            self.scooters[pos] = last
+            self._positions[getattr(last, "scooter_id")] = pos
+        self._available.pop(scooter_id, None)
+        remove_listener = getattr(scooter, "remove_listener", None)
+        if remove_listener is not None:
+            remove_listener(self._on_scooter_changed)
+        return True
+
+    def _sync_availability(self, scooter: object) -> None:
+        # приводим набор доступных в соответствие с is_available
+        sid = getattr(scooter, "scooter_id")
+        if getattr(scooter, "is_available", True):
+            self._available[sid] = scooter
+        else:
+            self._available.pop(sid, None)
+
+    def _on_scooter_changed(self, scooter: object, name: str, old: object, new: object) -> None:
+        # реакция на изменение свойства самоката
+        if name == "is_available":
+            self._sync_availability(scooter)
+
     def utilization(self) -> float:
         # коэффициент заполнения станции
         if self.capacity <= 0:
@@ -106,14 +225,16 @@ class RentalStation:
 
     def __lt__(self, other: "RentalStation") -> bool:
         # сначала сравним по коэффициенту заполнения, потом по вместимости
-        if self.utilization() != other.utilization():
-            return self.utilization() < other.utilization()
+        mine, theirs = self.utilization(), other.utilization()
+        if mine != theirs:
+            return mine < theirs
         # если одинаково, сравним по capacity
         return self.capacity < other.capacity
 
     def __gt__(self, other: "RentalStation") -> bool:
         # сначала сравним по коэффициенту заполнения, потом по вместимости
-        if self.utilization() != other.utilization():
-            return self.utilization() > other.utilization()
+        mine, theirs = self.utilization(), other.utilization()
+        if mine != theirs:
+            return mine > theirs
         # если одинаково, сравним по capacity
         return self.capacity > other.capacity
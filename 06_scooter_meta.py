@@ -1,11 +1,20 @@
 from __future__ import annotations
-from abc import ABC, abstractmethod
+import importlib
+import json
+import threading
+from abc import ABC, ABCMeta, abstractmethod
+from typing import List, Mapping
 
 class InvalidScooterError(ValueError):
     pass
 
-class ScooterMeta(type):
+class ScooterMeta(ABCMeta):
+    # наследуемся от ABCMeta: Scooter — абстрактный класс (ABC), и метакласс
+    # от type конфликтовал бы с метаклассом ABC
     registry: dict[str, type["Scooter"]] = {}
+    # отложенные типы: ключ -> "пакет.модуль" или "пакет.модуль:Класс";
+    # модуль импортируется при первом обращении к ключу
+    lazy: dict[str, str] = {}
 
     def __new__(mcls, name, bases, namespace, **kwargs):
         # создаем класс 
@@ -16,6 +25,8 @@ class ScooterMeta(type):
             key = namespace.get("REGISTRY_KEY", name.lower())
             # сохраняем ссылку на класс в реестре
             ScooterMeta.registry[key] = cls
+            # импортированный тип больше не отложенный
+            ScooterMeta.lazy.pop(key, None)
         return cls
 
 class Scooter(ABC, metaclass=ScooterMeta):
@@ -60,6 +71,73 @@ class OffRoadScooter(Scooter):
         # коэф за внедорожность
         return self.hourly_rate * 1.2 * hours
 
+# группа entry points, в которой плагины объявляют типы самокатов
+ENTRY_POINT_GROUP = "scooter_service.scooter_types"
+
+# импорт плагина — один поток на ключ, остальные ждут результат
+_lazy_lock = threading.RLock()
+
+def register_lazy(type_key: str, target: str) -> None:
+    """
+    Объявляет тип без импорта: target — "модуль" (класс регистрируется
+    метаклассом при импорте) или "модуль:Класс".
+    Уже импортированный тип с тем же ключом не перекрывается.
+    """
+    key = type_key.lower()
+    if key not in ScooterMeta.registry:
+        ScooterMeta.lazy[key] = target
+
+def register_manifest(manifest: Mapping[str, str] | str) -> int:
+    # манифест — словарь ключ -> target или путь к такому JSON; возвращает число типов
+    if isinstance(manifest, str):
+        with open(manifest, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    for key, target in manifest.items():
+        register_lazy(key, target)
+    return len(manifest)
+
+def register_entry_points(group: str = ENTRY_POINT_GROUP) -> int:
+    # типы из entry points установленных пакетов; сами плагины не импортируются
+    from importlib.metadata import entry_points
+    found = entry_points(group=group)
+    for ep in found:
+        register_lazy(ep.name, ep.value)
+    return len(found)
+
+def _load_lazy(key: str) -> type[Scooter] | None:
+    # импортируем отложенный тип и переносим его в registry
+    with _lazy_lock:
+        cls = ScooterMeta.registry.get(key)
+        if cls is not None:
+            return cls
+        target = ScooterMeta.lazy.get(key)
+        if target is None:
+            return None
+        module_name, _, attr = target.partition(":")
+        try:
+            module = importlib.import_module(module_name)
+            if attr:
+                cls = getattr(module, attr)
+        except (ImportError, AttributeError) as exc:
+            raise InvalidScooterError(f"Не удалось загрузить тип {key!r} из {target!r}: {exc}") from exc
+        if attr:
+            if not isinstance(cls, ScooterMeta):
+                raise InvalidScooterError(f"{target!r} не является классом самоката.")
+            ScooterMeta.registry[key] = cls
+        cls = ScooterMeta.registry.get(key)
+        if cls is None:
+            raise InvalidScooterError(f"Модуль {module_name!r} не зарегистрировал тип {key!r}.")
+        ScooterMeta.lazy.pop(key, None)
+        return cls
+
+def available_types() -> List[str]:
+    # все известные ключи, включая еще не импортированные
+    return sorted(ScooterMeta.registry.keys() | ScooterMeta.lazy.keys())
+
 def get_scooter_class(type_key: str) -> type[Scooter] | None:
-    # возвращаем класс по ключу из реестра
-    return ScooterMeta.registry.get(type_key.lower())
+    # возвращаем класс по ключу из реестра; отложенный тип импортируется здесь
+    key = type_key.lower()
+    cls = ScooterMeta.registry.get(key)
+    if cls is None and key in ScooterMeta.lazy:
+        cls = _load_lazy(key)
+    return cls
@@ -1,11 +1,25 @@
 from __future__ import annotations
+import gc
+import inspect
+from contextlib import contextmanager
+from itertools import repeat
 from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+try:
+    import numpy as np
+except ImportError:  # numpy нужен только для пакетного расчета стоимости
+    np = None
 
 class InvalidScooterError(ValueError):
     pass
 
 class Scooter(ABC):
     # базовый класс самоката для фабрики
+    # фиксированный набор полей вместо __dict__ (экономия памяти)
+    __slots__ = ("__scooter_id", "__model", "__hourly_rate")
+
     def __init__(self, scooter_id: str, model: str, hourly_rate: float):
         # приватные поля
         self.__scooter_id = scooter_id
@@ -32,8 +46,15 @@ class Scooter(ABC):
         # абстрактный метод стоимости
         raise NotImplementedError
 
+    @classmethod
+    def batch_rental_cost(cls, rates: "np.ndarray", hours: "np.ndarray") -> "np.ndarray":
+        # векторный вариант calculate_rental_cost; подкласс объявляет его рядом со скалярным
+        raise NotImplementedError(f"Для {cls.__name__} нет пакетного расчета стоимости.")
+
 class CityScooter(Scooter):
     # городской самокат с  формулой
+    __slots__ = ("max_speed",)
+
     def __init__(self, scooter_id: str, model: str, hourly_rate: float, max_speed: int = 25):
         super().__init__(scooter_id, model, hourly_rate)
         self.max_speed = max_speed
@@ -42,8 +63,14 @@ class CityScooter(Scooter):
         # линейная стоимость без коэффициентов
         return self.hourly_rate * hours
 
+    @classmethod
+    def batch_rental_cost(cls, rates: "np.ndarray", hours: "np.ndarray") -> "np.ndarray":
+        return rates * hours
+
 class OffRoadScooter(Scooter):
     # внедорожный самокат с коэффициентом
+    __slots__ = ("tire_type",)
+
     def __init__(self, scooter_id: str, model: str, hourly_rate: float, tire_type: str = "all-terrain"):
         super().__init__(scooter_id, model, hourly_rate)
         self.tire_type = tire_type
@@ -52,8 +79,15 @@ class OffRoadScooter(Scooter):
         # коэффициент 1.2 за внедорожность
         return self.hourly_rate * 1.2 * hours
 
+    @classmethod
+    def batch_rental_cost(cls, rates: "np.ndarray", hours: "np.ndarray") -> "np.ndarray":
+        # тот же порядок операций, что и в скалярной формуле
+        return rates * 1.2 * hours
+
 class FoldableScooter(Scooter):
     # складной самокат со скидкой
+    __slots__ = ("weight",)
+
     def __init__(self, scooter_id: str, model: str, hourly_rate: float, weight: float = 12.0):
         super().__init__(scooter_id, model, hourly_rate)
         self.weight = weight
@@ -64,6 +98,46 @@ class FoldableScooter(Scooter):
         # если длительная аренда, применяем скидку
         return base * 0.9 if hours >= 4 else base
 
+    @classmethod
+    def batch_rental_cost(cls, rates: "np.ndarray", hours: "np.ndarray") -> "np.ndarray":
+        base = rates * hours
+        return np.where(hours >= 4, base * 0.9, base)
+
+@dataclass
+class BulkCreateResult:
+    """
+    Результат ScooterFactory.create_many.
+    Поля:
+      - scooters: созданные самокаты в исходном порядке (без ошибочных)
+      - errors: пары (индекс спецификации, исключение) по возрастанию индекса;
+        исключения те же, что бросил бы create_scooter
+    """
+    scooters: List[Scooter] = field(default_factory=list)
+    errors: List[Tuple[int, Exception]] = field(default_factory=list)
+
+# отметка обязательного параметра конструктора
+_REQUIRED = object()
+
+# конструкторы, которые только сохраняют параметры: для них create_many
+# заполняет поля напрямую, без вызова __init__
+_PLAIN_INITS = {CityScooter.__init__, OffRoadScooter.__init__, FoldableScooter.__init__}
+
+@contextmanager
+def _gc_paused() -> Iterator[None]:
+    # новые объекты пакета не образуют циклов, проходы сборщика только тратят время
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+def _init_fields(cls: type) -> Dict[str, Any]:
+    # параметры конструктора класса и их значения по умолчанию
+    params = list(inspect.signature(cls.__init__).parameters.values())[1:]
+    return {p.name: (_REQUIRED if p.default is inspect.Parameter.empty else p.default) for p in params}
+
 class ScooterFactory:
     # фабрика по созданию самокатов
     TYPES = {
@@ -81,3 +155,216 @@ class ScooterFactory:
             raise InvalidScooterError(f"Неизвестный тип самоката: {scooter_type!r}")
         # создаем экземпляр, пробрасывая именованные аргументы
         return cls(**kwargs)
+
+    @staticmethod
+    def calculate_rental_costs(rates: Any, scooter_types: Any, hours: Any) -> "np.ndarray":
+        # пакетный расчет стоимости: группируем строки по типу и вызываем
+        # batch_rental_cost класса; результат совпадает с calculate_rental_cost
+        if np is None:
+            raise RuntimeError("Для пакетного расчета нужен numpy.")
+        rates = np.asarray(rates, dtype=np.float64)
+        hours = np.broadcast_to(np.asarray(hours, dtype=np.float64), rates.shape)
+        keys, groups = np.unique(np.char.lower(np.asarray(scooter_types, dtype=str)), return_inverse=True)
+        if groups.shape != rates.shape:
+            raise InvalidScooterError("rates и scooter_types должны быть одной длины.")
+        costs = np.empty_like(rates)
+        for i, key in enumerate(keys.tolist()):
+            cls = ScooterFactory.TYPES.get(key)
+            if cls is None:
+                raise InvalidScooterError(f"Неизвестный тип самоката: {key!r}")
+            rows = groups == i
+            costs[rows] = cls.batch_rental_cost(rates[rows], hours[rows])
+        return costs
+
+    @staticmethod
+    def create_many(specs: Union[Iterable[Dict[str, Any]], Dict[str, Any]],
+                    scooter_type: Optional[str] = None,
+                    prototype: Optional[Union[Scooter, Dict[str, Any]]] = None) -> BulkCreateResult:
+        """
+        Пакетное создание самокатов.
+        specs — строки (список словарей с параметрами конструктора) или колонки
+        (словарь: имя параметра -> последовательность/массив одной длины).
+        Тип берется из поля scooter_type спецификации, иначе из аргумента
+        scooter_type, иначе из прототипа. prototype — самокат или словарь
+        с общими полями; спецификации переопределяют только отличающиеся.
+        У самоката-прототипа scooter_id не общий: строка без scooter_id — ошибка.
+        Один раз на группу разбираются тип, параметры конструктора и состав
+        колонок; значения (обязательные поля, hourly_rate) проверяются
+        построчно с теми же исключениями, что у create_scooter. Ошибки
+        собираются по индексам и не прерывают пакет.
+        """
+        shared: Dict[str, Any] = {}
+        default_cls: Optional[type] = None
+        if isinstance(prototype, Scooter):
+            default_cls = type(prototype)
+            # идентификатор у каждого самоката свой
+            shared = {name: getattr(prototype, name) for name in _init_fields(default_cls) if name != "scooter_id"}
+        elif prototype is not None:
+            shared = dict(prototype)
+        default_key = shared.pop("scooter_type", None)
+        if scooter_type is not None:
+            # явный тип важнее прототипа
+            default_key = scooter_type
+        if default_key is not None:
+            default_cls = None
+
+        errors: List[Tuple[int, Exception]] = []
+        # значение scooter_type -> план группы (или ошибка для всей группы)
+        plans: Dict[Any, Any] = {}
+
+        def plan_for(key: Any) -> Any:
+            cls = default_cls if key is None else None
+            if cls is None and isinstance(key, str):
+                cls = ScooterFactory.TYPES.get(key.lower())
+            if cls is None:
+                return InvalidScooterError(f"Неизвестный тип самоката: {key!r}")
+            return _GroupPlan(cls, shared)
+
+        with _gc_paused():
+            if isinstance(specs, dict):
+                out = ScooterFactory._create_from_columns(specs, default_key, plan_for, plans, errors)
+            else:
+                out = []
+                append = out.append
+                for i, row in enumerate(specs):
+                    try:
+                        key = row.get("scooter_type", default_key)
+                        plan = plans[key]
+                    except KeyError:
+                        plan = plans[key] = plan_for(key)
+                    except (AttributeError, TypeError):
+                        if not isinstance(row, dict):
+                            errors.append((i, InvalidScooterError("Спецификация должна быть словарем.")))
+                            continue
+                        plan = plan_for(key)
+                    if isinstance(plan, Exception):
+                        errors.append((i, plan))
+                        continue
+                    try:
+                        append(plan.create_row(row))
+                    except (TypeError, ValueError) as exc:
+                        errors.append((i, exc))
+        return BulkCreateResult(out, errors)
+
+    @staticmethod
+    def _create_from_columns(specs: Dict[str, Any], default_key: Any, plan_for: Callable[[Any], Any],
+                             plans: Dict[Any, Any], errors: List[Tuple[int, Exception]]) -> List[Scooter]:
+        # колонки: массивы numpy переводятся в значения Python, строки группируются по типу
+        columns = {name: (c.tolist() if hasattr(c, "tolist") else list(c)) for name, c in specs.items()}
+        if len({len(c) for c in columns.values()}) > 1:
+            raise InvalidScooterError("Колонки спецификаций должны быть одной длины.")
+        n = len(next(iter(columns.values()), ()))
+        keys = columns.pop("scooter_type", None)
+        groups: Dict[Any, Any] = {}
+        if keys is None:
+            if n:
+                groups[default_key] = range(n)
+        else:
+            for i, key in enumerate(keys):
+                try:
+                    groups.setdefault(key, []).append(i)
+                except TypeError:
+                    errors.append((i, InvalidScooterError(f"Неизвестный тип самоката: {key!r}")))
+        out: List[Optional[Scooter]] = [None] * n
+        for key, indices in groups.items():
+            plan = plans.get(key) or plan_for(key)
+            if isinstance(plan, Exception):
+                errors.extend((i, plan) for i in indices)
+                continue
+            plan.create_columns(columns, indices, out, errors)
+        # ошибки групп идут вперемешку, результат — по возрастанию индекса
+        errors.sort(key=lambda pair: pair[0])
+        return [s for s in out if s is not None]
+
+class _GroupPlan:
+    # разобранные один раз параметры конструктора класса для create_many
+    def __init__(self, cls: type, shared: Dict[str, Any]):
+        self.cls = cls
+        fields = _init_fields(cls)
+        self.names = list(fields)
+        self.allowed = set(fields) | {"scooter_type"}
+        # значения по умолчанию: параметры конструктора, поверх — прототип
+        self.defaults = {name: shared.get(name, default) for name, default in fields.items()}
+        unknown = [name for name in shared if name not in self.allowed]
+        self.shared_error = None if not unknown else TypeError(
+            f"{cls.__name__}.__init__() got an unexpected keyword argument {unknown[0]!r}")
+        self.plain = cls.__init__ in _PLAIN_INITS
+        # у простых конструкторов порядок: scooter_id, model, hourly_rate, доп. поля
+        self.extras = [(name, self.defaults[name]) for name in self.names[3:]]
+
+    def _unexpected(self, name: str) -> TypeError:
+        return TypeError(f"{self.cls.__name__}.__init__() got an unexpected keyword argument {name!r}")
+
+    def _missing(self, name: str) -> TypeError:
+        return TypeError(f"{self.cls.__name__}.__init__() missing required argument: {name!r}")
+
+    def _build(self, values: Dict[str, Any]) -> Scooter:
+        # общий путь: обычный конструктор
+        for name, value in values.items():
+            if value is _REQUIRED:
+                raise self._missing(name)
+        return self.cls(**values)
+
+    def create_row(self, row: Dict[str, Any]) -> Scooter:
+        if self.shared_error is not None:
+            raise self.shared_error
+        if not self.allowed.issuperset(row):
+            raise self._unexpected(next(n for n in row if n not in self.allowed))
+        get = row.get
+        if not self.plain:
+            return self._build({name: get(name, default) for name, default in self.defaults.items()})
+        defaults = self.defaults
+        scooter_id = get("scooter_id", defaults["scooter_id"])
+        model = get("model", defaults["model"])
+        rate = get("hourly_rate", defaults["hourly_rate"])
+        obj = self._new(scooter_id, model, rate)
+        for name, default in self.extras:
+            setattr(obj, name, get(name, default))
+        return obj
+
+    def _new(self, scooter_id: Any, model: Any, rate: Any) -> Scooter:
+        # те же проверки, что в Scooter.__init__, но без вызова конструкторов
+        if scooter_id is _REQUIRED or model is _REQUIRED or rate is _REQUIRED:
+            raise self._missing(self.names[(scooter_id, model, rate).index(_REQUIRED)])
+        if rate <= 0:
+            # почасовая ставка должна быть положительной
+            raise InvalidScooterError("hourly_rate должен быть > 0.")
+        obj = object.__new__(self.cls)
+        obj._Scooter__scooter_id = scooter_id
+        obj._Scooter__model = model
+        obj._Scooter__hourly_rate = rate
+        return obj
+
+    def create_columns(self, columns: Dict[str, List[Any]], indices: Any,
+                       out: List[Optional[Scooter]], errors: List[Tuple[int, Exception]]) -> None:
+        # состав колонок проверяется один раз на всю группу
+        unknown = [name for name in columns if name not in self.allowed]
+        error = self.shared_error or (self._unexpected(unknown[0]) if unknown else None)
+        if error is not None:
+            errors.extend((i, error) for i in indices)
+            return
+        sources = []
+        for name in self.names:
+            if name in columns:
+                column = columns[name]
+                sources.append(column if isinstance(indices, range) else [column[i] for i in indices])
+            else:
+                sources.append(repeat(self.defaults[name]))
+        if not self.plain:
+            for i, *values in zip(indices, *sources):
+                try:
+                    out[i] = self._build(dict(zip(self.names, values)))
+                except (TypeError, ValueError) as exc:
+                    errors.append((i, exc))
+            return
+        new = self._new
+        extras = [name for name, _ in self.extras]
+        for i, scooter_id, model, rate, *extra in zip(indices, *sources):
+            try:
+                obj = new(scooter_id, model, rate)
+            except (TypeError, ValueError) as exc:
+                errors.append((i, exc))
+                continue
+            for name, value in zip(extras, extra):
+                setattr(obj, name, value)
+            out[i] = obj
@@ -1,13 +1,19 @@
 from __future__ import annotations
+import json
 from dataclasses import dataclass
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterable, List, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy нужен только для векторного расчета
+    np = None
 
 # локальные исключения
 class PermissionDeniedError(PermissionError):
     # нет прав для утверждения изменений
     pass
 
-@dataclass
+@dataclass(slots=True)
 class ChangeRequest:
     """
     Запрос на изменение аренды.
@@ -39,30 +45,215 @@ class Handler:
             # передаем запрос по цепочке
             return self._next.handle(request)
         # если некому обрабатывать, возвращаем отказ
-        return {"approved": False, "by": None, "reason": "Не обработано."}
+        return {"approved": False, "by": None, "reason": _NOT_HANDLED_REASON}
+
+class ThresholdHandler(Handler):
+    """
+    Обработчик с порогами: одобряет, если severity <= max_severity
+    и abs(cost_delta) <= max_cost_delta (None — без ограничения).
+    Пороги по умолчанию задаются в подклассе, их можно переопределить
+    при создании (например, из конфигурации).
+    """
+    MAX_SEVERITY: Optional[float] = None
+    MAX_COST_DELTA: Optional[float] = None
+
+    def __init__(self, next_handler: Optional[Handler] = None, max_severity: Optional[float] = None,
+                 max_cost_delta: Optional[float] = None, name: Optional[str] = None):
+        super().__init__(next_handler)
+        self.max_severity = self.MAX_SEVERITY if max_severity is None else max_severity
+        self.max_cost_delta = self.MAX_COST_DELTA if max_cost_delta is None else max_cost_delta
+        # имя в поле "by" ответа
+        self.name = name or type(self).__name__
+
+    def can_approve(self, request: ChangeRequest) -> bool:
+        if self.max_severity is not None and not request.severity <= self.max_severity:
+            return False
+        if self.max_cost_delta is not None and not abs(request.cost_delta) <= self.max_cost_delta:
+            return False
+        return True
 
-class StationOperator(Handler):
-    # оператор станции: одобряет мелкие изменения
     def handle(self, request: ChangeRequest) -> Dict[str, Any]:
-        # правило: может одобрить, если severity <= 20 и abs(cost_delta) <= 10
-        if request.severity <= 20 and abs(request.cost_delta) <= 10:
-            # одобряем на уровне оператора
-            return {"approved": True, "by": "StationOperator", "notes": request.notes}
+        if self.can_approve(request):
+            # одобряем на своем уровне
+            return {"approved": True, "by": self.name, "notes": request.notes}
         # иначе передаем дальше
         return super().handle(request)
 
-class Manager(Handler):
+class StationOperator(ThresholdHandler):
+    # оператор станции: одобряет мелкие изменения
+    # правило: может одобрить, если severity <= 20 и abs(cost_delta) <= 10
+    MAX_SEVERITY = 20
+    MAX_COST_DELTA = 10
+
+class Manager(ThresholdHandler):
     # менеджер: одобряет умеренные изменения
-    def handle(self, request: ChangeRequest) -> Dict[str, Any]:
-        # правило: может одобрить, если severity <= 50 и abs(cost_delta) <= 50
-        if request.severity <= 50 and abs(request.cost_delta) <= 50:
-            # одобряем на уровне менеджера
-            return {"approved": True, "by": "Manager", "notes": request.notes}
-        # иначе передаем дальше
-        return super().handle(request)
+    # правило: может одобрить, если severity <= 50 и abs(cost_delta) <= 50
+    MAX_SEVERITY = 50
+    MAX_COST_DELTA = 50
 
-class Admin(Handler):
-    # администратор: может одобрить любые изменения
-    def handle(self, request: ChangeRequest) -> Dict[str, Any]:
-        # правило: администратор одобряет всё
-        return {"approved": True, "by": "Admin", "notes": request.notes}
+class Admin(ThresholdHandler):
+    # администратор: может одобрить любые изменения (порогов нет)
+    pass
+
+# --- таблица решений ---
+
+@dataclass(frozen=True)
+class ApprovalRule:
+    """
+    Строка таблицы решений.
+    Поля:
+      - name: кто одобряет (значение "by")
+      - max_severity / max_cost_delta: пороги (None — без ограничения)
+    """
+    name: str
+    max_severity: Optional[float] = None
+    max_cost_delta: Optional[float] = None
+
+# классы обработчиков по имени для построения цепочки из конфигурации
+HANDLER_TYPES: Dict[str, type] = {
+    "StationOperator": StationOperator,
+    "Manager": Manager,
+    "Admin": Admin,
+}
+
+_NOT_HANDLED_REASON = "Не обработано."
+
+class DecisionTable:
+    """
+    Цепочка обработчиков, развернутая в плоский список порогов.
+    Первое подходящее правило одобряет запрос — так же, как цепочка.
+    Методы:
+      - from_chain / to_chain: перевод из цепочки и обратно
+      - from_config / to_config / load: правила из конфигурации (список словарей или JSON)
+      - decide: решение по одному запросу (тот же словарь, что у Handler.handle)
+      - decide_batch: решения по списку запросов
+      - approver_indices: векторный расчет по массивам severity/cost_delta (numpy)
+    """
+    def __init__(self, rules: Iterable[ApprovalRule]):
+        self.rules: Tuple[ApprovalRule, ...] = tuple(rules)
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    @classmethod
+    def from_chain(cls, head: Handler) -> "DecisionTable":
+        # обходим цепочку; компилируются только пороговые и сквозные обработчики,
+        # переопределенные handle или can_approve — ошибка
+        rules: List[ApprovalRule] = []
+        node: Optional[Handler] = head
+        seen = set()
+        while node is not None:
+            if id(node) in seen:
+                raise ValueError("Цепочка обработчиков зациклена.")
+            seen.add(id(node))
+            handle = type(node).handle
+            # логика, замененная в подклассе или на самом объекте, в пороги не сводится
+            custom = ("handle" in vars(node) or "can_approve" in vars(node)
+                      or (handle is ThresholdHandler.handle and type(node).can_approve is not ThresholdHandler.can_approve))
+            if custom:
+                raise ValueError(f"Нельзя скомпилировать обработчик {type(node).__name__} с собственной логикой.")
+            if handle is ThresholdHandler.handle:
+                rules.append(ApprovalRule(node.name, node.max_severity, node.max_cost_delta))
+                if node.max_severity is None and node.max_cost_delta is None:
+                    # дальше этого обработчика запросы не доходят
+                    break
+            elif handle is not Handler.handle:
+                raise ValueError(f"Нельзя скомпилировать обработчик {type(node).__name__} с собственной логикой.")
+            node = node._next
+        return cls(rules)
+
+    def to_chain(self) -> Optional[Handler]:
+        # цепочка пороговых обработчиков, эквивалентная таблице
+        head: Optional[Handler] = None
+        for rule in reversed(self.rules):
+            klass = HANDLER_TYPES.get(rule.name, ThresholdHandler)
+            head = klass(head, rule.max_severity, rule.max_cost_delta, name=rule.name)
+            # None в конструкторе означает «порог класса», поэтому пишем явно
+            head.max_severity, head.max_cost_delta = rule.max_severity, rule.max_cost_delta
+        return head
+
+    @classmethod
+    def from_config(cls, config: Any) -> "DecisionTable":
+        # config: список правил или {"rules": [...]}; правило — словарь с name и порогами
+        if isinstance(config, dict):
+            config = config.get("rules", [])
+        rules = []
+        for item in config:
+            if "name" not in item:
+                raise ValueError("У правила должно быть поле name.")
+            rules.append(ApprovalRule(
+                name=str(item["name"]),
+                max_severity=item.get("max_severity"),
+                max_cost_delta=item.get("max_cost_delta"),
+            ))
+        return cls(rules)
+
+    def to_config(self) -> Dict[str, Any]:
+        return {"rules": [
+            {"name": r.name, "max_severity": r.max_severity, "max_cost_delta": r.max_cost_delta}
+            for r in self.rules
+        ]}
+
+    @classmethod
+    def load(cls, path: str) -> "DecisionTable":
+        # загрузка правил из JSON-файла
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_config(json.load(f))
+
+    def approver(self, severity: float, cost_delta: float) -> Optional[str]:
+        # имя одобряющего или None
+        magnitude = abs(cost_delta)
+        for rule in self.rules:
+            if rule.max_severity is not None and not severity <= rule.max_severity:
+                continue
+            if rule.max_cost_delta is not None and not magnitude <= rule.max_cost_delta:
+                continue
+            return rule.name
+        return None
+
+    def decide(self, request: ChangeRequest) -> Dict[str, Any]:
+        # тот же ответ, что вернула бы цепочка
+        name = self.approver(request.severity, request.cost_delta)
+        if name is None:
+            return {"approved": False, "by": None, "reason": _NOT_HANDLED_REASON}
+        return {"approved": True, "by": name, "notes": request.notes}
+
+    def decide_batch(self, requests: Sequence[ChangeRequest]) -> List[Dict[str, Any]]:
+        # пакетное решение: при наличии numpy пороги применяются к массивам
+        if np is None:
+            return [self.decide(r) for r in requests]
+        indices = self.approver_indices(
+            [r.severity for r in requests],
+            [r.cost_delta for r in requests],
+        )
+        result = []
+        for request, index in zip(requests, indices.tolist()):
+            if index < 0:
+                result.append({"approved": False, "by": None, "reason": _NOT_HANDLED_REASON})
+            else:
+                result.append({"approved": True, "by": self.rules[index].name, "notes": request.notes})
+        return result
+
+    def approver_indices(self, severities: Any, cost_deltas: Any) -> "np.ndarray":
+        # индекс правила-одобряющего для каждой пары (-1 — никто не одобрил)
+        if np is None:
+            raise RuntimeError("Для векторного расчета нужен numpy.")
+        severities = np.asarray(severities, dtype=np.float64)
+        magnitudes = np.abs(np.asarray(cost_deltas, dtype=np.float64))
+        result = np.full(severities.shape, -1, dtype=np.int64)
+        pending = np.ones(severities.shape, dtype=np.bool_)
+        for i, rule in enumerate(self.rules):
+            match = pending.copy()
+            if rule.max_severity is not None:
+                match &= severities <= rule.max_severity
+            if rule.max_cost_delta is not None:
+                match &= magnitudes <= rule.max_cost_delta
+            result[match] = i
+            pending &= ~match
+            if not pending.any():
+                break
+        return result
+
+    def approver_names(self, severities: Any, cost_deltas: Any) -> List[Optional[str]]:
+        names = [rule.name for rule in self.rules]
+        return [names[i] if i >= 0 else None for i in self.approver_indices(severities, cost_deltas).tolist()]
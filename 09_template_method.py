@@ -1,6 +1,18 @@
 from __future__ import annotations
+import asyncio
+import os
+import secrets
+import threading
+import time
+import warnings
+import weakref
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Any, AsyncIterable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+try:
+    import fcntl
+except ImportError:  # fcntl нужен только для аренды номеров воркеров
+    fcntl = None
 
 # локальные исключения
 class InvalidScooterError(ValueError):
@@ -15,6 +27,242 @@ class PermissionDeniedError(PermissionError):
     # нет прав пользователя
     pass
 
+class RentalStepTimeoutError(TimeoutError):
+    # шаг асинхронной аренды не уложился в таймаут
+    def __init__(self, step: str, timeout: float):
+        super().__init__(f"Шаг {step} превысил таймаут {timeout} с.")
+        self.step = step
+
+# --- идентификаторы аренд ---
+
+class WorkerIdError(RuntimeError):
+    # нет гарантированно уникального номера воркера
+    pass
+
+# эпоха идентификаторов: 2024-01-01T00:00:00Z в миллисекундах
+RENTAL_ID_EPOCH_MS = 1_704_067_200_000
+WORKER_ID_BITS = 10
+SEQUENCE_BITS = 12
+MAX_WORKER_ID = (1 << WORKER_ID_BITS) - 1
+_MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+# номер внутри миллисекунды — ровно три младшие шестнадцатеричные цифры
+_SEQUENCE_HEX = tuple(f"{i:03x}" for i in range(1 << SEQUENCE_BITS))
+
+WORKER_ID_ENV = "SCOOTER_WORKER_ID"
+WORKER_LEASE_DIR_ENV = "SCOOTER_WORKER_ID_DIR"
+# строгий режим: без явного номера — ошибка вместо случайного номера
+WORKER_ID_STRICT_ENV = "SCOOTER_WORKER_ID_STRICT"
+
+# арендованные номера процесса: worker_id -> открытый файл с блокировкой
+_leases: Dict[int, Any] = {}
+
+def lease_worker_id(directory: str) -> int:
+    """
+    Аренда свободного номера воркера через каталог: номер занят, пока
+    процесс держит flock на файле worker-NNNN.lock (снимается при выходе
+    процесса, в том числе аварийном). Каталог должен быть общим для всех
+    процессов, делящих пространство номеров.
+    """
+    if fcntl is None:
+        raise WorkerIdError("Аренда номера воркера требует fcntl; задайте SCOOTER_WORKER_ID.")
+    os.makedirs(directory, exist_ok=True)
+    for worker_id in range(MAX_WORKER_ID + 1):
+        f = open(os.path.join(directory, f"worker-{worker_id:04d}.lock"), "a+b")
+        try:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            f.close()
+            continue
+        _leases[worker_id] = f
+        return worker_id
+    raise WorkerIdError(f"Все {MAX_WORKER_ID + 1} номеров воркеров в {directory!r} заняты.")
+
+_random_warned = False
+
+def _random_worker_id() -> int:
+    # случайный номер: один процесс работает без настройки, но между
+    # процессами совпадение возможно — предупреждаем один раз
+    global _random_warned
+    if not _random_warned:
+        _random_warned = True
+        warnings.warn(
+            f"Номер воркера rental_id выбран случайно: при нескольких процессах идентификаторы "
+            f"могут совпасть. Задайте {WORKER_ID_ENV} или {WORKER_LEASE_DIR_ENV}.",
+            RuntimeWarning, stacklevel=4,
+        )
+    return secrets.randbelow(MAX_WORKER_ID + 1)
+
+def default_worker_id(strict: Optional[bool] = None) -> Tuple[int, str]:
+    # (номер, источник): SCOOTER_WORKER_ID ("env"), иначе аренда из
+    # SCOOTER_WORKER_ID_DIR ("lease"), иначе случайный номер ("random");
+    # в строгом режиме (strict или SCOOTER_WORKER_ID_STRICT) — ошибка
+    value = os.environ.get(WORKER_ID_ENV)
+    if value is not None:
+        worker_id = int(value)
+        if not 0 <= worker_id <= MAX_WORKER_ID:
+            raise WorkerIdError(f"{WORKER_ID_ENV} должен быть в диапазоне 0..{MAX_WORKER_ID}.")
+        return worker_id, "env"
+    directory = os.environ.get(WORKER_LEASE_DIR_ENV)
+    if directory:
+        return lease_worker_id(directory), "lease"
+    if strict is None:
+        strict = os.environ.get(WORKER_ID_STRICT_ENV, "") not in ("", "0")
+    if strict:
+        raise WorkerIdError(
+            f"Не задан номер воркера: укажите {WORKER_ID_ENV} (уникальный для процесса и хоста), "
+            f"{WORKER_LEASE_DIR_ENV} (каталог для аренды номеров) или worker_id явно."
+        )
+    return _random_worker_id(), "random"
+
+class RentalIdGenerator:
+    """
+    Генератор идентификаторов аренд в стиле snowflake: 64-битное число из
+    миллисекунд от RENTAL_ID_EPOCH_MS (41 бит), номера воркера (10 бит)
+    и номера в пределах миллисекунды (12 бит).
+    Между процессами общей блокировки нет — уникальность дают разные
+    worker_id: явный аргумент, SCOOTER_WORKER_ID или аренда из каталога
+    (lease_dir / SCOOTER_WORKER_ID_DIR, см. lease_worker_id). Без них
+    номер случайный (с предупреждением), а в строгом режиме
+    (strict=True или SCOOTER_WORKER_ID_STRICT=1) — WorkerIdError.
+    Внутри процесса номера миллисекунды выдаются из итератора range —
+    next() атомарен под GIL, поэтому блокировка берется только при смене
+    миллисекунды. Если за миллисекунду выдано больше 4096 номеров или часы
+    ушли назад, генератор продолжает с последней миллисекунды + 1 и не ждет.
+    Строка — префикс канала и 16 шестнадцатеричных цифр, поэтому строки
+    одного префикса сортируются в порядке создания.
+    После fork арендованный номер в дочернем процессе арендуется заново,
+    случайный — выбирается заново; номер из SCOOTER_WORKER_ID совпал бы
+    с родительским, поэтому такой генератор в потомке выдает
+    WorkerIdError. Явный worker_id остается прежним — его уникальность
+    на совести вызывающего.
+    """
+    def __init__(self, worker_id: Optional[int] = None, clock=time.time_ns, lease_dir: Optional[str] = None,
+                 strict: Optional[bool] = None):
+        self._lease_dir = lease_dir
+        # источник номера: "explicit", "env", "lease" или "random"
+        self._source = "explicit"
+        self._auto = worker_id is None
+        if lease_dir is not None and worker_id is None:
+            worker_id, self._source = lease_worker_id(lease_dir), "lease"
+        elif worker_id is None:
+            worker_id, self._source = default_worker_id(strict)
+        if not 0 <= worker_id <= MAX_WORKER_ID:
+            raise ValueError(f"worker_id должен быть в диапазоне 0..{MAX_WORKER_ID}.")
+        self.worker_id = worker_id
+        self._clock = clock
+        self._stale = False
+        self._reset()
+        if self._auto:
+            _AUTO_GENERATORS.add(self)
+
+    def _reset(self) -> None:
+        self._lock = threading.Lock()
+        # текущая миллисекунда часов и итератор ее еще не выданных значений
+        self._ms = -1
+        self._block: Iterator[int] = iter(())
+        # кеш строки без номера: prefix -> (старшие биты, "prefix-...")
+        self._heads: Dict[str, Tuple[int, str]] = {}
+
+    def next_int(self) -> int:
+        if self._clock() // 1_000_000 == self._ms:
+            value = next(self._block, None)
+            if value is not None:
+                return value
+        return self._advance()
+
+    def _advance(self) -> int:
+        # смена миллисекунды, исчерпание номеров или часы назад
+        with self._lock:
+            if self._stale:
+                raise WorkerIdError(
+                    f"Номер воркера {self.worker_id} унаследован после fork; задайте "
+                    f"{WORKER_LEASE_DIR_ENV} или worker_id в дочернем процессе."
+                )
+            now = self._clock() // 1_000_000
+            if now <= self._ms:
+                value = next(self._block, None)
+                if value is not None:
+                    return value
+                # номера миллисекунды исчерпаны — занимаем следующую
+                now = self._ms + 1
+            if now < RENTAL_ID_EPOCH_MS:
+                raise ValueError("Системное время раньше эпохи идентификаторов.")
+            base = ((now - RENTAL_ID_EPOCH_MS) << (WORKER_ID_BITS + SEQUENCE_BITS)) | (self.worker_id << SEQUENCE_BITS)
+            block = iter(range(base, base + _MAX_SEQUENCE + 1))
+            value = next(block)
+            self._block = block
+            self._ms = now
+            return value
+
+    def next_id(self, prefix: str) -> str:
+        # быстрый путь next_int без лишнего вызова; строка собирается
+        # из кешированной головы и трех цифр номера
+        value = next(self._block, None) if self._clock() // 1_000_000 == self._ms else None
+        if value is None:
+            value = self._advance()
+        high = value >> SEQUENCE_BITS
+        head = self._heads.get(prefix)
+        if head is None or head[0] != high:
+            head = self._heads[prefix] = (high, f"{prefix}-{high:013x}")
+        return head[1] + _SEQUENCE_HEX[value & _MAX_SEQUENCE]
+
+    def _after_fork(self) -> None:
+        # в дочернем процессе: арендованный и случайный номера — новые,
+        # номер из окружения — запрет
+        self._reset()
+        if self._source == "random":
+            self.worker_id = secrets.randbelow(MAX_WORKER_ID + 1)
+            return
+        self._stale = True
+        if self._source == "lease":
+            try:
+                self.worker_id = lease_worker_id(self._lease_dir or os.environ[WORKER_LEASE_DIR_ENV])
+            except (OSError, KeyError, WorkerIdError):
+                # исключение из обработчика fork потерялось бы — остаемся с запретом
+                return
+            self._stale = False
+
+# генераторы с автоматическим worker_id (для пересчета после fork)
+_AUTO_GENERATORS: "weakref.WeakSet[RentalIdGenerator]" = weakref.WeakSet()
+
+def _reset_generators_after_fork() -> None:
+    # блокировки родителя потомку не принадлежат: файлы закрываем,
+    # номера для потомка арендуются заново
+    for f in _leases.values():
+        f.close()
+    _leases.clear()
+    for generator in list(_AUTO_GENERATORS):
+        generator._after_fork()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_generators_after_fork)
+
+def parse_rental_id(rental_id: str) -> Dict[str, Any]:
+    # разбор идентификатора: префикс, время создания (unix, мс), воркер, номер
+    prefix, _, digits = rental_id.rpartition("-")
+    value = int(digits, 16)
+    return {
+        "prefix": prefix,
+        "created_ms": (value >> (WORKER_ID_BITS + SEQUENCE_BITS)) + RENTAL_ID_EPOCH_MS,
+        "worker_id": (value >> SEQUENCE_BITS) & MAX_WORKER_ID,
+        "sequence": value & _MAX_SEQUENCE,
+    }
+
+def rental_shard(rental_id: str, shards: int) -> int:
+    # шард записи по идентификатору; перемешиваем биты, чтобы младшие
+    # (почти всегда нулевые) номера не собирали записи в одном шарде
+    value = int(rental_id.rpartition("-")[2], 16)
+    return (((value * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF) >> 32) % shards
+
+_default_generator: Optional[RentalIdGenerator] = None
+
+def default_rental_ids() -> RentalIdGenerator:
+    # общий генератор процесса
+    global _default_generator
+    if _default_generator is None:
+        _default_generator = RentalIdGenerator()
+    return _default_generator
+
 class RentalProcess(ABC):
     """
     Шаблонный метод для процесса аренды.
@@ -23,7 +271,14 @@ class RentalProcess(ABC):
       2) create_rental
       3) confirm_rental
     Подклассы реализуют шаги.
+    id_generator: генератор rental_id (None — общий для процесса, берется
+    при первой аренде; подклассы без вызова super().__init__ тоже работают).
     """
+    id_generator: Optional[RentalIdGenerator] = None
+
+    def __init__(self, id_generator: Optional[RentalIdGenerator] = None):
+        self.id_generator = id_generator
+
     def rent_scooter(self, scooter_id: str, customer_id: str, hours: float) -> Dict[str, Any]:
         # проверяем доступность самоката
         self.check_availability(scooter_id)
@@ -60,7 +315,7 @@ class OnlineRentalProcess(RentalProcess):
     def create_rental(self, scooter_id: str, customer_id: str, hours: float) -> Dict[str, Any]:
         # формируем запись для онлайн-аренды
         return {
-            "rental_id": f"ONL-{scooter_id}-{customer_id}",
+            "rental_id": (self.id_generator or default_rental_ids()).next_id("ONL"),
             "scooter_id": scooter_id,
             "customer_id": customer_id,
             "hours": hours,
@@ -83,7 +338,7 @@ class OfflineRentalProcess(RentalProcess):
     def create_rental(self, scooter_id: str, customer_id: str, hours: float) -> Dict[str, Any]:
         # формируем запись для офлайн-аренды
         return {
-            "rental_id": f"OFF-{scooter_id}-{customer_id}",
+            "rental_id": (self.id_generator or default_rental_ids()).next_id("OFF"),
             "scooter_id": scooter_id,
             "customer_id": customer_id,
             "hours": hours,
@@ -94,3 +349,143 @@ class OfflineRentalProcess(RentalProcess):
     def confirm_rental(self, rental: Dict[str, Any]) -> None:
         # подтверждение офлайн (печать чека/подпись)
         rental["status"] = "confirmed"
+
+# --- асинхронный вариант ---
+
+class AsyncRentalProcess(ABC):
+    """
+    Асинхронный шаблонный метод аренды: те же шаги, что у RentalProcess,
+    но каждый шаг — корутина (проверка в хранилище, отправка уведомления).
+    step_timeouts: таймаут в секундах по имени шага; default_timeout —
+    для остальных шагов (None — без ограничения).
+    """
+    STEPS = ("check_availability", "create_rental", "confirm_rental")
+
+    def __init__(self, step_timeouts: Optional[Dict[str, float]] = None, default_timeout: Optional[float] = None):
+        self.step_timeouts = dict(step_timeouts or {})
+        self.default_timeout = default_timeout
+
+    async def rent_scooter(self, scooter_id: str, customer_id: str, hours: float) -> Dict[str, Any]:
+        # проверяем доступность самоката
+        await self._step("check_availability", self.check_availability(scooter_id))
+        # создаем запись аренды
+        rental = await self._step("create_rental", self.create_rental(scooter_id, customer_id, hours))
+        # подтверждаем аренду
+        await self._step("confirm_rental", self.confirm_rental(rental))
+        return rental
+
+    async def _step(self, name: str, coro: Any) -> Any:
+        # выполняем шаг с таймаутом
+        timeout = self.step_timeouts.get(name, self.default_timeout)
+        if timeout is None:
+            return await coro
+        try:
+            return await asyncio.wait_for(coro, timeout)
+        except asyncio.TimeoutError:
+            raise RentalStepTimeoutError(name, timeout) from None
+
+    @abstractmethod
+    async def check_availability(self, scooter_id: str) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def create_rental(self, scooter_id: str, customer_id: str, hours: float) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def confirm_rental(self, rental: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+class _AsyncChannelProcess(AsyncRentalProcess):
+    # общая часть асинхронных каналов: логика шагов берется у синхронного процесса,
+    # ожидание — у внешних хранилищ
+    SYNC_PROCESS: type = RentalProcess
+
+    def __init__(self, availability_store: Any = None, notifier: Any = None,
+                 step_timeouts: Optional[Dict[str, float]] = None, default_timeout: Optional[float] = None,
+                 id_generator: Optional[RentalIdGenerator] = None):
+        """
+        availability_store: объект с async is_available(scooter_id) -> bool
+        notifier: объект с async send(rental) -> None (пуш/письмо/чек)
+        id_generator: генератор rental_id для синхронной логики канала
+        """
+        super().__init__(step_timeouts, default_timeout)
+        self.availability_store = availability_store
+        self.notifier = notifier
+        self._sync = self.SYNC_PROCESS(id_generator)
+
+    async def check_availability(self, scooter_id: str) -> None:
+        self._sync.check_availability(scooter_id)
+        if self.availability_store is not None and not await self.availability_store.is_available(scooter_id):
+            raise InvalidScooterError(f"Самокат {scooter_id!r} недоступен.")
+
+    async def create_rental(self, scooter_id: str, customer_id: str, hours: float) -> Dict[str, Any]:
+        return self._sync.create_rental(scooter_id, customer_id, hours)
+
+    async def confirm_rental(self, rental: Dict[str, Any]) -> None:
+        if self.notifier is not None:
+            await self.notifier.send(rental)
+        self._sync.confirm_rental(rental)
+
+class AsyncOnlineRentalProcess(_AsyncChannelProcess):
+    # асинхронный онлайн-процесс аренды
+    SYNC_PROCESS = OnlineRentalProcess
+
+class AsyncOfflineRentalProcess(_AsyncChannelProcess):
+    # асинхронный офлайн-процесс аренды
+    SYNC_PROCESS = OfflineRentalProcess
+
+RentalRequest = Tuple[str, str, float]
+
+class RentalPipeline:
+    """
+    Конкурентное выполнение аренд через AsyncRentalProcess.
+    Параметры:
+      - concurrency: сколько аренд выполняется одновременно
+      - queue_size: размер очереди; при заполнении источник ждет (обратное давление)
+    run() возвращает результаты в порядке запросов: словарь аренды
+    либо исключение, из-за которого аренда не состоялась.
+    """
+    def __init__(self, process: AsyncRentalProcess, concurrency: int = 100, queue_size: Optional[int] = None):
+        if concurrency <= 0:
+            raise ValueError("concurrency должен быть > 0.")
+        self.process = process
+        self.concurrency = concurrency
+        self.queue_size = queue_size if queue_size is not None else concurrency * 2
+
+    async def run(self, requests: Union[Iterable[RentalRequest], AsyncIterable[RentalRequest]]) -> List[Union[Dict[str, Any], Exception]]:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        results: Dict[int, Union[Dict[str, Any], Exception]] = {}
+
+        async def worker() -> None:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                index, request = item
+                # неверный запрос — ошибка этой аренды, а не всего прогона
+                try:
+                    scooter_id, customer_id, hours = request
+                    results[index] = await self.process.rent_scooter(scooter_id, customer_id, hours)
+                except Exception as exc:
+                    results[index] = exc
+
+        workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+        try:
+            count = 0
+            # put ждет свободного места в очереди — источник не убегает вперед
+            if hasattr(requests, "__aiter__"):
+                async for request in requests:
+                    await queue.put((count, request))
+                    count += 1
+            else:
+                for request in requests:
+                    await queue.put((count, request))
+                    count += 1
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                task.cancel()
+        return [results[i] for i in range(count)]
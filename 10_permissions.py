@@ -1,10 +1,32 @@
 from __future__ import annotations
+import weakref
 from functools import wraps
+from typing import Any, Callable, Dict, Iterable, List, Optional
 
 class PermissionDeniedError(PermissionError):
     # нет прав на выполнение операции
     pass
 
+# подписчики на отказы: вызываются с требуемой ролью и пользователем
+# (None, если пользователь не передан); на успешный вызов не влияют
+DenialListener = Callable[[str, Any], None]
+_denial_listeners: List[DenialListener] = []
+
+def add_denial_listener(listener: DenialListener) -> None:
+    _denial_listeners.append(listener)
+
+def remove_denial_listener(listener: DenialListener) -> None:
+    try:
+        _denial_listeners.remove(listener)
+    except ValueError:
+        pass
+
+def _denied(required: str, user: Any, message: str) -> PermissionDeniedError:
+    # уведомляем подписчиков и возвращаем исключение для raise
+    for listener in tuple(_denial_listeners):
+        listener(required, user)
+    return PermissionDeniedError(message)
+
 def check_permissions(required: str):
     """
     Декоратор проверки прав. Ожидается, что self.user или именованный аргумент user
@@ -25,13 +47,129 @@ def check_permissions(required: str):
                 user = kwargs.get("user")
             if user is None:
                 # не найден контекст пользователя
-                raise PermissionDeniedError("Пользователь не передан.")
+                raise _denied(required, None, "Пользователь не передан.")
             roles = getattr(user, "roles", set())
             # проверяем наличие требуемой роли
             if required not in roles:
                 # недостаточно прав — ошибка
-                raise PermissionDeniedError(f"Недостаточно прав: требуется роль '{required}'.")
+                raise _denied(required, user, f"Недостаточно прав: требуется роль '{required}'.")
             # если все ок — вызываем функцию
             return fn(*args, **kwargs)
         return wrapper
     return decorator
+
+class RoleBits:
+    """
+    Назначение битов ролям: каждая роль получает свой бит при первом обращении.
+    Методы:
+      - bit(role): бит роли
+      - mask(roles): битовая маска набора ролей
+    """
+    def __init__(self, roles: Iterable[str] = ()):
+        self._bits: Dict[str, int] = {}
+        for role in roles:
+            self.bit(role)
+
+    def __len__(self) -> int:
+        return len(self._bits)
+
+    def bit(self, role: str) -> int:
+        bit = self._bits.get(role)
+        if bit is None:
+            bit = self._bits[role] = 1 << len(self._bits)
+        return bit
+
+    def mask(self, roles: Iterable[str]) -> int:
+        result = 0
+        for role in roles:
+            result |= self.bit(role)
+        return result
+
+class PermissionCache:
+    """
+    Кеш масок ролей пользователей: roles переводится в маску один раз,
+    дальше проверка прав — одна битовая операция.
+    Запись удаляется вместе с пользователем (weakref), поэтому id(user)
+    не переиспользуется для чужой маски; объекты без поддержки weakref
+    не кешируются (маска считается при каждом вызове).
+    После изменения user.roles вызывайте invalidate(user) или set_roles.
+    """
+    def __init__(self, bits: Optional[RoleBits] = None):
+        self.bits = bits if bits is not None else RoleBits()
+        # id(user) -> маска; слабые ссылки держат обратный вызов очистки
+        self.masks: Dict[int, int] = {}
+        self._refs: Dict[int, Any] = {}
+
+    def __len__(self) -> int:
+        return len(self.masks)
+
+    def mask_of(self, user: Any) -> int:
+        key = id(user)
+        mask = self.masks.get(key)
+        if mask is not None:
+            return mask
+        mask = self.bits.mask(getattr(user, "roles", ()))
+        try:
+            ref = weakref.ref(user, lambda dead, key=key: self._forget(key, dead))
+        except TypeError:
+            return mask
+        self._refs[key] = ref
+        self.masks[key] = mask
+        return mask
+
+    def _forget(self, key: int, ref: Any) -> None:
+        # пользователь удален — убираем его маску (если запись еще его)
+        if self._refs.get(key) is ref:
+            del self._refs[key]
+            self.masks.pop(key, None)
+
+    def has_role(self, user: Any, role: str) -> bool:
+        return bool(self.mask_of(user) & self.bits.bit(role))
+
+    def invalidate(self, user: Any = None) -> None:
+        # сброс маски пользователя; без аргумента — всего кеша
+        if user is None:
+            self.masks.clear()
+            self._refs.clear()
+        else:
+            self.masks.pop(id(user), None)
+            self._refs.pop(id(user), None)
+
+    def set_roles(self, user: Any, roles: Iterable[str]) -> None:
+        # замена ролей с одновременным сбросом кеша
+        user.roles = set(roles)
+        self.invalidate(user)
+
+# общий кеш для require_role по умолчанию
+permission_cache = PermissionCache()
+
+def require_role(required: str, cache: Optional[PermissionCache] = None):
+    """
+    Быстрый аналог check_permissions: пользователь ищется так же
+    (self.user, затем именованный аргумент user), но роли берутся из
+    закешированной маски, а бит требуемой роли вычисляется при декорировании.
+    """
+    cache = cache if cache is not None else permission_cache
+    bit = cache.bits.bit(required)
+    masks = cache.masks
+    mask_of = cache.mask_of
+
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            try:
+                user = args[0].user
+            except (IndexError, AttributeError):
+                user = None
+            if user is None:
+                user = kwargs.get("user")
+                if user is None:
+                    raise _denied(required, None, "Пользователь не передан.")
+            mask = masks.get(id(user))
+            if mask is None:
+                mask = mask_of(user)
+            if mask & bit:
+                return fn(*args, **kwargs)
+            raise _denied(required, user, f"Недостаточно прав: требуется роль '{required}'.")
+        return wrapper
+    return decorator
@@ -1,17 +1,46 @@
 from __future__ import annotations
+import gc
+import inspect
 import json
+import mmap
+import os
+import re
+import struct
+import sys
+import warnings
+import zlib
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List
+from array import array
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, TextIO, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy нужен только для пакетного расчета стоимости
+    np = None
+
+# подписчик на изменения: (самокат, имя поля, старое значение, новое значение)
+ChangeListener = Callable[["Scooter", str, Any, Any], None]
 
 # локальные исключения
 class InvalidScooterError(ValueError):
     # ошибка при валидации/загрузке самоката
     pass
 
+class ScooterRecordError(InvalidScooterError):
+    # ошибка отдельной записи при потоковой загрузке (с номером строки)
+    def __init__(self, lineno: int, message: str):
+        super().__init__(f"Строка {lineno}: {message}")
+        self.lineno = lineno
+
 # базовая модель с to_dict/from_dict
 class Scooter(ABC):
     # базовый класс с сериализацией
     TYPE: str = "base"
+    # фиксированный набор полей вместо __dict__ (экономия памяти)
+    __slots__ = ("__scooter_id", "__model", "__battery_level", "__hourly_rate", "__is_available", "__listeners")
+    # дополнительное поле подтипа (для бинарного снимка)
+    EXTRA_FIELD: Optional[str] = None
 
     def __init__(self, scooter_id: str, model: str, battery_level: int, hourly_rate: float, is_available: bool = True):
         # приватные атрибуты
@@ -20,6 +49,8 @@ class Scooter(ABC):
         self.__battery_level = battery_level
         self.__hourly_rate = hourly_rate
         self.__is_available = is_available
+        # подписчики на изменения свойств; список создается при первой подписке
+        self.__listeners: Optional[List[ChangeListener]] = None
 
         # базовая валидация
         if not (0 <= self.__battery_level <= 100):
@@ -41,11 +72,61 @@ class Scooter(ABC):
     @property
     def is_available(self) -> bool: return self.__is_available
 
+    # сеттеры с теми же проверками, что в __init__; подписчики узнают об изменении
+    @model.setter
+    def model(self, value: str) -> None:
+        if not value:
+            raise InvalidScooterError("Модель не может быть пустой.")
+        old, self.__model = self.__model, value
+        self._notify("model", old, value)
+
+    @battery_level.setter
+    def battery_level(self, value: int) -> None:
+        if not (0 <= value <= 100):
+            raise InvalidScooterError("Уровень заряда должен быть 0..100.")
+        old, self.__battery_level = self.__battery_level, value
+        self._notify("battery_level", old, value)
+
+    @hourly_rate.setter
+    def hourly_rate(self, value: float) -> None:
+        if value <= 0:
+            raise InvalidScooterError("hourly_rate должен быть > 0.")
+        old, self.__hourly_rate = self.__hourly_rate, value
+        self._notify("hourly_rate", old, value)
+
+    @is_available.setter
+    def is_available(self, value: bool) -> None:
+        old, self.__is_available = self.__is_available, bool(value)
+        self._notify("is_available", old, self.__is_available)
+
+    # подписка на изменения свойств (DirtyTracker из 01_scooter, индексы и т.п.)
+    def add_listener(self, listener: ChangeListener) -> None:
+        if self.__listeners is None:
+            self.__listeners = []
+        self.__listeners.append(listener)
+
+    def remove_listener(self, listener: ChangeListener) -> None:
+        # отписка; неизвестного подписчика молча игнорируем
+        if self.__listeners and listener in self.__listeners:
+            self.__listeners.remove(listener)
+
+    def _notify(self, field: str, old: Any, new: Any) -> None:
+        # уведомляем только о реальных изменениях
+        if old == new or not self.__listeners:
+            return
+        for listener in tuple(self.__listeners):
+            listener(self, field, old, new)
+
     @abstractmethod
     def calculate_rental_cost(self, hours: float) -> float:
         # абстрактный метод расчета стоимости
         raise NotImplementedError
 
+    @classmethod
+    def batch_rental_cost(cls, rates: "np.ndarray", hours: "np.ndarray") -> "np.ndarray":
+        # векторный вариант calculate_rental_cost; подкласс объявляет его рядом со скалярным
+        raise NotImplementedError(f"Для типа {cls.TYPE!r} нет пакетного расчета стоимости.")
+
     def to_dict(self) -> Dict[str, Any]:
         # базовая сериализация + тип
         return {
@@ -60,18 +141,25 @@ class Scooter(ABC):
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "Scooter":
         # фабрика по type с маппингом на конкретные классы
-        t = (data.get("type") or "").lower()
-        # ищем подходящий класс
-        klass = _TYPE_MAP.get(t)
+        t = data.get("type")
+        # ищем подходящий класс; нестроковый type — неизвестный тип, как в decode_scooters
+        klass = _TYPE_MAP.get(t.lower() if isinstance(t, str) else "")
         if klass is None:
             # неизвестный тип — ошибка
-            raise InvalidScooterError(f"Неизвестный тип самоката: {data.get('type')!r}")
+            raise InvalidScooterError(f"Неизвестный тип самоката: {t!r}")
         # создаем экземпляр, пробрасывая доп. поля
         return klass._from_record(data)
 
+    @classmethod
+    def from_dicts(cls, records: Iterable[Dict[str, Any]]) -> "BulkDecodeResult":
+        # пакетная десериализация через скомпилированные декодеры типов
+        return decode_scooters(records)
+
 class CityScooter(Scooter):
     # городской самокат
+    __slots__ = ("max_speed",)
     TYPE = "city"
+    EXTRA_FIELD = "max_speed"
 
     def __init__(self, scooter_id: str, model: str, battery_level: int, hourly_rate: float, is_available: bool = True, max_speed: int = 25):
         super().__init__(scooter_id, model, battery_level, hourly_rate, is_available)
@@ -81,6 +169,10 @@ class CityScooter(Scooter):
         # линейная стоимость без скидок
         return self.hourly_rate * hours
 
+    @classmethod
+    def batch_rental_cost(cls, rates: "np.ndarray", hours: "np.ndarray") -> "np.ndarray":
+        return rates * hours
+
     def to_dict(self) -> Dict[str, Any]:
         # расширяем базовую сериализацию
         d = super().to_dict()
@@ -101,7 +193,9 @@ class CityScooter(Scooter):
 
 class OffRoadScooter(Scooter):
     # внедорожный самокат
+    __slots__ = ("tire_type",)
     TYPE = "off_road"
+    EXTRA_FIELD = "tire_type"
 
     def __init__(self, scooter_id: str, model: str, battery_level: int, hourly_rate: float, is_available: bool = True, tire_type: str = "all-terrain"):
         super().__init__(scooter_id, model, battery_level, hourly_rate, is_available)
@@ -111,6 +205,11 @@ class OffRoadScooter(Scooter):
         # коэффициент 1.2 за внедорожность
         return self.hourly_rate * 1.2 * hours
 
+    @classmethod
+    def batch_rental_cost(cls, rates: "np.ndarray", hours: "np.ndarray") -> "np.ndarray":
+        # тот же порядок операций, что и в скалярной формуле
+        return rates * 1.2 * hours
+
     def to_dict(self) -> Dict[str, Any]:
         # расширяем базовую сериализацию
         d = super().to_dict()
@@ -131,7 +230,9 @@ class OffRoadScooter(Scooter):
 
 class FoldableScooter(Scooter):
     # складной самокат
+    __slots__ = ("weight",)
     TYPE = "foldable"
+    EXTRA_FIELD = "weight"
 
     def __init__(self, scooter_id: str, model: str, battery_level: int, hourly_rate: float, is_available: bool = True, weight: float = 12.0):
         super().__init__(scooter_id, model, battery_level, hourly_rate, is_available)
@@ -143,6 +244,11 @@ class FoldableScooter(Scooter):
         # если длительная аренда, применяем скидку
         return base * 0.9 if hours >= 4 else base
 
+    @classmethod
+    def batch_rental_cost(cls, rates: "np.ndarray", hours: "np.ndarray") -> "np.ndarray":
+        base = rates * hours
+        return np.where(hours >= 4, base * 0.9, base)
+
     def to_dict(self) -> Dict[str, Any]:
         # расширяем базовую сериализацию
         d = super().to_dict()
@@ -168,6 +274,145 @@ _TYPE_MAP = {
     FoldableScooter.TYPE: FoldableScooter,
 }
 
+def calculate_rental_costs(rates: Any, type_tags: Any, hours: Any) -> "np.ndarray":
+    """
+    Пакетный расчет стоимости аренды.
+    Аргументы — массивы одинаковой длины (hours может быть скаляром):
+      - rates: почасовые ставки
+      - type_tags: ключи типов из _TYPE_MAP
+      - hours: длительности
+    Строки группируются по типу, для каждой группы вызывается
+    batch_rental_cost класса; результат совпадает с calculate_rental_cost.
+    """
+    if np is None:
+        raise RuntimeError("Для пакетного расчета нужен numpy.")
+    rates = np.asarray(rates, dtype=np.float64)
+    hours = np.broadcast_to(np.asarray(hours, dtype=np.float64), rates.shape)
+    tags, groups = np.unique(np.char.lower(np.asarray(type_tags, dtype=str)), return_inverse=True)
+    if groups.shape != rates.shape:
+        raise InvalidScooterError("rates и type_tags должны быть одной длины.")
+    costs = np.empty_like(rates)
+    for i, tag in enumerate(tags.tolist()):
+        klass = _TYPE_MAP.get(tag)
+        if klass is None:
+            raise InvalidScooterError(f"Неизвестный тип самоката: {tag!r}")
+        rows = groups == i
+        costs[rows] = klass.batch_rental_cost(rates[rows], hours[rows])
+    return costs
+
+# --- пакетная десериализация ---
+
+@dataclass
+class BulkDecodeResult:
+    """
+    Результат пакетной десериализации.
+    Поля:
+      - scooters: успешно созданные самокаты в исходном порядке
+      - errors: пары (индекс записи, исключение), отсортированные по индексу;
+        исключения те же, что бросил бы from_dict
+    """
+    scooters: List[Scooter] = field(default_factory=list)
+    errors: List[Tuple[int, Exception]] = field(default_factory=list)
+
+# шаблон цикла декодера; поля и значения по умолчанию подставляются по сигнатуре __init__
+_DECODER_TEMPLATE = """
+def decode(items, out, errors):
+    for i, d in items:
+        try:
+{extract}
+            if not (0 <= battery_level <= 100):
+                raise _Error("Уровень заряда должен быть 0..100.")
+            if hourly_rate <= 0:
+                raise _Error("hourly_rate должен быть > 0.")
+        except (KeyError, TypeError, ValueError) as exc:
+            errors.append((i, exc))
+            continue
+        obj = _new(_cls)
+{assign}
+        obj._Scooter__listeners = None
+        out[i] = obj
+"""
+
+_DECODERS: Dict[type, Callable[..., None]] = {}
+
+def compile_decoder(klass: type) -> Callable[..., None]:
+    """
+    Компилирует декодер для класса из _TYPE_MAP по сигнатуре его __init__.
+    Декодер проверяет те же условия, что и Scooter.__init__, и создает
+    объекты без вызова конструкторов: базовые поля пишутся в приватные
+    атрибуты Scooter, дополнительные параметры подкласса — в одноименные
+    атрибуты (как это делают конструкторы подтипов), подписчиков нет.
+    """
+    decoder = _DECODERS.get(klass)
+    if decoder is not None:
+        return decoder
+    base = list(inspect.signature(Scooter.__init__).parameters)[1:]
+    params = list(inspect.signature(klass.__init__).parameters.values())[1:]
+    if [p.name for p in params[:len(base)]] != base:
+        raise InvalidScooterError(f"Нельзя скомпилировать декодер для {klass.__name__}.")
+    namespace: Dict[str, Any] = {"_Error": InvalidScooterError, "_new": object.__new__, "_cls": klass}
+    extract, assign = [], []
+    for p in params:
+        if p.default is inspect.Parameter.empty:
+            extract.append(f"            {p.name} = d[{p.name!r}]")
+        else:
+            namespace[f"_default_{p.name}"] = p.default
+            extract.append(f"            {p.name} = d.get({p.name!r}, _default_{p.name})")
+        target = f"_Scooter__{p.name}" if p.name in base else p.name
+        assign.append(f"        obj.{target} = {p.name}")
+    source = _DECODER_TEMPLATE.format(extract="\n".join(extract), assign="\n".join(assign))
+    exec(compile(source, f"<decoder {klass.__name__}>", "exec"), namespace)
+    decoder = _DECODERS[klass] = namespace["decode"]
+    return decoder
+
+def decode_scooters(records: Iterable[Dict[str, Any]]) -> BulkDecodeResult:
+    """
+    Пакетная замена [Scooter.from_dict(r) for r in records].
+    Записи группируются по типу, каждая группа проходит через
+    скомпилированный декодер своего класса; ошибки не прерывают пакет.
+    На время пакета циклический сборщик мусора приостанавливается:
+    новые объекты не образуют циклов, а его проходы по растущей куче
+    занимали бы заметную долю времени.
+    """
+    groups: Dict[type, List[Tuple[int, Dict[str, Any]]]] = {}
+    # строка type -> список группы ее класса ("city" и "City" делят список)
+    buckets: Dict[Any, List[Tuple[int, Dict[str, Any]]]] = {}
+    errors: List[Tuple[int, Exception]] = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        n = 0
+        for n, d in enumerate(records, 1):
+            try:
+                buckets[d.get("type")].append((n - 1, d))
+                continue
+            except KeyError:
+                t = d.get("type")
+            except (AttributeError, TypeError):
+                # не словарь или нехешируемое значение type
+                if not isinstance(d, dict):
+                    errors.append((n - 1, InvalidScooterError("Запись должна быть объектом JSON.")))
+                    continue
+                t = d.get("type")
+            klass = _TYPE_MAP.get(t.lower() if isinstance(t, str) else "")
+            if klass is None:
+                errors.append((n - 1, InvalidScooterError(f"Неизвестный тип самоката: {t!r}")))
+                continue
+            bucket = groups.setdefault(klass, [])
+            try:
+                buckets[t] = bucket
+            except TypeError:
+                pass
+            bucket.append((n - 1, d))
+        out: List[Optional[Scooter]] = [None] * n
+        for klass, items in groups.items():
+            compile_decoder(klass)(items, out, errors)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    errors.sort(key=lambda pair: pair[0])
+    return BulkDecodeResult([s for s in out if s is not None], errors)
+
 def save_scooters_to_json(scooters: List[Scooter], path: str) -> None:
     # сериализуем список самокатов в JSON
     with open(path, "w", encoding="utf-8") as f:
@@ -179,3 +424,648 @@ def load_scooters_from_json(path: str) -> List[Scooter]:
         raw = json.load(f)
     # конструируем объекты из словарей
     return [Scooter.from_dict(item) for item in raw]
+
+# обработчик ошибок потоковой загрузки; по умолчанию — предупреждение
+RecordErrorHandler = Callable[[ScooterRecordError], None]
+
+def _warn_record_error(error: ScooterRecordError) -> None:
+    warnings.warn(str(error), stacklevel=3)
+
+def _decode_record(item: Any, lineno: int, on_error: RecordErrorHandler) -> Optional[Scooter]:
+    # одна запись -> самокат; ошибка сообщается, поток не прерывается
+    try:
+        if not isinstance(item, dict):
+            raise InvalidScooterError("Запись должна быть объектом JSON.")
+        return Scooter.from_dict(item)
+    except (ValueError, KeyError, TypeError) as exc:
+        on_error(ScooterRecordError(lineno, f"{type(exc).__name__}: {exc}"))
+        return None
+
+def save_scooters_to_jsonl(scooters: Iterable[Scooter], path: str) -> int:
+    # потоковая запись в JSON Lines: по объекту на строку; возвращает число записей
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for s in scooters:
+            f.write(json.dumps(s.to_dict(), ensure_ascii=False))
+            f.write("\n")
+            count += 1
+    return count
+
+def iter_scooters_from_jsonl(path: str, on_error: Optional[RecordErrorHandler] = None) -> Iterator[Scooter]:
+    """
+    Потоковая загрузка самокатов из JSON Lines.
+    Пустые строки пропускаются; битые записи передаются в on_error
+    (ScooterRecordError с номером строки) и не прерывают чтение.
+    """
+    on_error = on_error or _warn_record_error
+    with open(path, "r", encoding="utf-8") as f:
+        for lineno, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                item = json.loads(line)
+            except ValueError as exc:
+                on_error(ScooterRecordError(lineno, f"некорректный JSON: {exc}"))
+                continue
+            scooter = _decode_record(item, lineno, on_error)
+            if scooter is not None:
+                yield scooter
+
+def iter_scooter_chunks(scooters: Iterable[Scooter], chunk_size: int = 1000) -> Iterator[List[Scooter]]:
+    # группировка потока самокатов в списки по chunk_size
+    if chunk_size <= 0:
+        raise ValueError("chunk_size должен быть > 0.")
+    chunk: List[Scooter] = []
+    for s in scooters:
+        chunk.append(s)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def load_scooters_from_jsonl(path: str, chunk_size: int = 1000,
+                             on_error: Optional[RecordErrorHandler] = None) -> Iterator[List[Scooter]]:
+    # генератор пачек самокатов из JSON Lines
+    return iter_scooter_chunks(iter_scooters_from_jsonl(path, on_error), chunk_size)
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+def _iter_json_array(f: TextIO, buffer_size: int = 1 << 16) -> Iterator[Tuple[int, Any]]:
+    # инкрементальный разбор JSON-массива: (номер строки, элемент) без чтения файла целиком
+    decoder = json.JSONDecoder()
+    buf, pos, lineno, eof = "", 0, 1, False
+    # start: ждем "[", first: элемент или "]", value: элемент, after: "," или "]"
+    state = "start"
+
+    def refill() -> None:
+        nonlocal buf, pos, eof
+        chunk = f.read(buffer_size)
+        if not chunk:
+            eof = True
+        buf, pos = buf[pos:] + chunk, 0
+
+    while True:
+        # пропускаем пробельные символы, подчитывая файл по мере надобности
+        while True:
+            end = _WHITESPACE.match(buf, pos).end()
+            lineno += buf.count("\n", pos, end)
+            pos = end
+            if pos < len(buf) or eof:
+                break
+            refill()
+        if pos >= len(buf):
+            raise ScooterRecordError(lineno, "неожиданный конец файла.")
+        ch = buf[pos]
+        if state == "start":
+            if ch != "[":
+                raise ScooterRecordError(lineno, "ожидался JSON-массив.")
+            pos += 1
+            state = "first"
+            continue
+        if state in ("first", "after") and ch == "]":
+            return
+        if state == "after":
+            if ch != ",":
+                raise ScooterRecordError(lineno, "ожидалась ',' или ']'.")
+            pos += 1
+            state = "value"
+            continue
+        # разбираем очередной элемент; если он обрезан границей буфера — дочитываем
+        while True:
+            try:
+                item, end = decoder.raw_decode(buf, pos)
+                if end < len(buf) or eof:
+                    break
+            except json.JSONDecodeError as exc:
+                if eof:
+                    raise ScooterRecordError(lineno, f"некорректный JSON: {exc.msg}") from exc
+            refill()
+        yield lineno, item
+        lineno += buf.count("\n", pos, end)
+        pos = end
+        state = "after"
+
+def iter_scooters_from_json(path: str, on_error: Optional[RecordErrorHandler] = None,
+                            buffer_size: int = 1 << 16) -> Iterator[Scooter]:
+    """
+    Потоковое чтение существующего формата (JSON-массив).
+    Некорректные записи передаются в on_error; нарушение синтаксиса
+    самого массива прерывает чтение с ScooterRecordError.
+    """
+    on_error = on_error or _warn_record_error
+    with open(path, "r", encoding="utf-8") as f:
+        for lineno, item in _iter_json_array(f, buffer_size):
+            scooter = _decode_record(item, lineno, on_error)
+            if scooter is not None:
+                yield scooter
+
+def convert_json_to_jsonl(src_path: str, dst_path: str, on_error: Optional[RecordErrorHandler] = None) -> int:
+    # перевод файла-массива в JSON Lines без загрузки в память целиком
+    return save_scooters_to_jsonl(iter_scooters_from_json(src_path, on_error), dst_path)
+
+# --- бинарный снимок парка ---
+#
+# Формат (little-endian):
+#   заголовок: magic "SCSN", version u16, header_size u16, count u32, crc32 u32, reserved u32
+#   таблица секций: (offset u64, size u64) в порядке _SNAPSHOT_SECTIONS
+#   секции: упакованные колонки, выровненные по 8 байт; строки (id, модели,
+#   строковые доп. поля) лежат в общей таблице strings в UTF-8, имена типов —
+#   в секции types через "\n".
+# crc32 считается по заголовку без поля crc и по всему, что после заголовка.
+
+SNAPSHOT_MAGIC = b"SCSN"
+SNAPSHOT_VERSION = 1
+
+_SNAPSHOT_HEADER = struct.Struct("<4sHHIII")
+_SNAPSHOT_SECTIONS = (
+    ("rates", "d"), ("extra_num", "d"),
+    ("id_off", "I"), ("id_len", "I"),
+    ("model_off", "I"), ("model_len", "I"),
+    ("extra_off", "I"), ("extra_len", "I"),
+    ("order", "I"),
+    ("battery", "B"), ("flags", "B"), ("type_codes", "B"),
+    ("types", "B"), ("strings", "B"),
+)
+_SNAPSHOT_TABLE = struct.Struct("<" + "QQ" * len(_SNAPSHOT_SECTIONS))
+
+# биты колонки flags
+_FLAG_AVAILABLE = 1
+_FLAG_EXTRA = 2
+_FLAG_EXTRA_STR = 4
+_FLAG_EXTRA_INT = 8
+
+class SnapshotError(InvalidScooterError):
+    # поврежденный или несовместимый снимок
+    pass
+
+def _native(column: array) -> array:
+    # колонки хранятся в little-endian
+    if sys.byteorder != "little" and column.itemsize > 1:
+        column.byteswap()
+    return column
+
+def save_scooters_snapshot(scooters: Iterable[Scooter], path: str) -> int:
+    # запись бинарного снимка; возвращает число записей
+    cols = {name: array(code) for name, code in _SNAPSHOT_SECTIONS}
+    strings = bytearray()
+    interned: Dict[str, Tuple[int, int]] = {}
+    type_codes: Dict[str, int] = {}
+    ids: List[str] = []
+
+    def put(value: str, dedup: bool) -> Tuple[int, int]:
+        # модели и строковые поля повторяются — храним их один раз
+        if dedup and value in interned:
+            return interned[value]
+        raw = value.encode("utf-8")
+        ref = (len(strings), len(raw))
+        strings.extend(raw)
+        if dedup:
+            interned[value] = ref
+        return ref
+
+    for s in scooters:
+        if s.TYPE not in type_codes:
+            if len(type_codes) > 255:
+                raise SnapshotError("Слишком много типов самокатов.")
+            type_codes[s.TYPE] = len(type_codes)
+        ids.append(s.scooter_id)
+        off, size = put(s.scooter_id, dedup=False)
+        cols["id_off"].append(off)
+        cols["id_len"].append(size)
+        off, size = put(s.model, dedup=True)
+        cols["model_off"].append(off)
+        cols["model_len"].append(size)
+        cols["rates"].append(float(s.hourly_rate))
+        cols["battery"].append(s.battery_level)
+        cols["type_codes"].append(type_codes[s.TYPE])
+        flags = _FLAG_AVAILABLE if s.is_available else 0
+        extra = getattr(s, s.EXTRA_FIELD) if s.EXTRA_FIELD else None
+        num, off, size = 0.0, 0, 0
+        if isinstance(extra, str):
+            flags |= _FLAG_EXTRA | _FLAG_EXTRA_STR
+            off, size = put(extra, dedup=True)
+        elif extra is not None:
+            flags |= _FLAG_EXTRA | (_FLAG_EXTRA_INT if isinstance(extra, int) else 0)
+            num = float(extra)
+        cols["extra_num"].append(num)
+        cols["extra_off"].append(off)
+        cols["extra_len"].append(size)
+        cols["flags"].append(flags)
+
+    count = len(ids)
+    # порядок строк по scooter_id для бинарного поиска
+    cols["order"].extend(sorted(range(count), key=ids.__getitem__))
+    cols["types"].frombytes("\n".join(type_codes).encode("utf-8"))
+    cols["strings"].frombytes(bytes(strings))
+
+    header_size = _SNAPSHOT_HEADER.size + _SNAPSHOT_TABLE.size
+    body = bytearray()
+    table: List[int] = []
+    for name, _ in _SNAPSHOT_SECTIONS:
+        # выравнивание секций по 8 байт относительно начала файла
+        body.extend(b"\0" * (-(header_size + len(body)) % 8))
+        raw = _native(cols[name]).tobytes()
+        table.extend((header_size + len(body), len(raw)))
+        body.extend(raw)
+    head = _SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, header_size, count, 0, 0)
+    rest = _SNAPSHOT_TABLE.pack(*table) + bytes(body)
+    crc = zlib.crc32(rest, zlib.crc32(head[16:], zlib.crc32(head[:12])))
+    head = _SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, header_size, count, crc, 0)
+    with open(path, "wb") as f:
+        f.write(head)
+        f.write(rest)
+    return count
+
+class ScooterSnapshot:
+    """
+    Снимок парка, открытый через mmap без копирования.
+    Колонки читаются напрямую из отображенного файла; объекты Scooter
+    создаются только при обращении (get, [i], итерация) и кешируются.
+    Методы:
+      - get(scooter_id) / in: поиск по id бинарным поиском по колонке order
+      - battery_level / hourly_rate / is_available / type_of: поля без создания объектов
+      - close (или with ... as snap)
+    """
+    def __init__(self, path: str, verify: bool = True):
+        self._file = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # пустой файл не отображается
+            self._file.close()
+            raise SnapshotError("Файл снимка пуст.") from None
+        try:
+            self._open(verify)
+        except Exception:
+            self.close()
+            raise
+        self._cache: Dict[int, Scooter] = {}
+
+    def _open(self, verify: bool) -> None:
+        buf = memoryview(self._mm)
+        try:
+            # сначала все проверки, затем представления колонок
+            # (иначе при ошибке mmap нельзя будет закрыть)
+            if len(buf) < _SNAPSHOT_HEADER.size:
+                raise SnapshotError("Файл слишком короткий для снимка.")
+            magic, version, header_size, count, crc, _ = _SNAPSHOT_HEADER.unpack_from(buf)
+            if magic != SNAPSHOT_MAGIC:
+                raise SnapshotError("Это не снимок парка самокатов.")
+            if version != SNAPSHOT_VERSION:
+                raise SnapshotError(f"Неподдерживаемая версия снимка: {version}.")
+            if header_size != _SNAPSHOT_HEADER.size + _SNAPSHOT_TABLE.size or len(buf) < header_size:
+                raise SnapshotError("Поврежденный заголовок снимка.")
+            if verify and zlib.crc32(buf[16:], zlib.crc32(buf[:12])) != crc:
+                raise SnapshotError("Контрольная сумма снимка не совпадает.")
+            table = _SNAPSHOT_TABLE.unpack_from(buf, _SNAPSHOT_HEADER.size)
+            for i, (name, code) in enumerate(_SNAPSHOT_SECTIONS):
+                offset, size = table[2 * i], table[2 * i + 1]
+                if offset + size > len(buf):
+                    raise SnapshotError(f"Секция {name} выходит за пределы файла.")
+                if name not in ("types", "strings") and size != count * array(code).itemsize:
+                    raise SnapshotError(f"Неверная длина секции {name}.")
+            self._count = count
+            for i, (name, code) in enumerate(_SNAPSHOT_SECTIONS):
+                offset, size = table[2 * i], table[2 * i + 1]
+                raw = buf[offset:offset + size]
+                if sys.byteorder == "little" or code == "B":
+                    column = raw.cast(code)
+                else:
+                    column = array(code)
+                    column.frombytes(raw)
+                    _native(column)
+                setattr(self, "_" + name, column)
+        finally:
+            buf.release()
+        types = bytes(self._types).decode("utf-8")
+        self._type_names = types.split("\n") if types else []
+
+    def close(self) -> None:
+        # освобождаем представления до закрытия mmap
+        for name, _ in _SNAPSHOT_SECTIONS:
+            column = self.__dict__.pop("_" + name, None)
+            if isinstance(column, memoryview):
+                column.release()
+        self._mm.close()
+        self._file.close()
+
+    def __enter__(self) -> "ScooterSnapshot":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _string(self, off: int, size: int) -> str:
+        return str(self._strings[off:off + size], "utf-8")
+
+    def scooter_id(self, i: int) -> str:
+        return self._string(self._id_off[i], self._id_len[i])
+
+    def battery_level(self, i: int) -> int:
+        return self._battery[i]
+
+    def hourly_rate(self, i: int) -> float:
+        return self._rates[i]
+
+    def is_available(self, i: int) -> bool:
+        return bool(self._flags[i] & _FLAG_AVAILABLE)
+
+    def type_of(self, i: int) -> str:
+        return self._type_names[self._type_codes[i]]
+
+    def find(self, scooter_id: str) -> int:
+        # номер записи по id или -1 (бинарный поиск по отсортированному порядку)
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            row = self._order[mid]
+            current = self.scooter_id(row)
+            if current < scooter_id:
+                lo = mid + 1
+            elif current > scooter_id:
+                hi = mid
+            else:
+                return row
+        return -1
+
+    def __contains__(self, scooter_id: object) -> bool:
+        return isinstance(scooter_id, str) and self.find(scooter_id) >= 0
+
+    def get(self, scooter_id: str) -> Optional[Scooter]:
+        row = self.find(scooter_id)
+        return None if row < 0 else self[row]
+
+    def record(self, i: int) -> Dict[str, Any]:
+        # запись в формате to_dict без создания объекта
+        kind = self.type_of(i)
+        flags = self._flags[i]
+        d: Dict[str, Any] = {
+            "type": kind,
+            "scooter_id": self.scooter_id(i),
+            "model": self._string(self._model_off[i], self._model_len[i]),
+            "battery_level": self._battery[i],
+            "hourly_rate": self._rates[i],
+            "is_available": bool(flags & _FLAG_AVAILABLE),
+        }
+        klass = _TYPE_MAP.get(kind)
+        if flags & _FLAG_EXTRA and klass is not None and klass.EXTRA_FIELD:
+            if flags & _FLAG_EXTRA_STR:
+                value: Any = self._string(self._extra_off[i], self._extra_len[i])
+            elif flags & _FLAG_EXTRA_INT:
+                value = int(self._extra_num[i])
+            else:
+                value = self._extra_num[i]
+            d[klass.EXTRA_FIELD] = value
+        return d
+
+    def __getitem__(self, i: int) -> Scooter:
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError(i)
+        scooter = self._cache.get(i)
+        if scooter is None:
+            scooter = self._cache[i] = Scooter.from_dict(self.record(i))
+        return scooter
+
+    def __iter__(self) -> Iterator[Scooter]:
+        for i in range(self._count):
+            yield self[i]
+
+# --- инкрементальное сохранение ---
+#
+# Дельта — JSON-объект {"seq": номер, "changes": {scooter_id: изменение}}.
+# Изменение — одно из трех:
+#   - {поле: значение} только с измененными полями (например, из
+#     DirtyTracker.peek в 01_scooter) — для самоката, который уже есть;
+#   - полная запись to_dict (с полем "type") — новый самокат или замена;
+#   - null — самокат удален.
+# Значения в дельте абсолютные, поэтому повторное применение той же дельты
+# ничего не меняет, а файлы пишутся с fsync файла и каталога — слияние и
+# перезапись базы безопасны при падении на любом шаге.
+
+DELTA_PREFIX = "delta-"
+DELTA_SUFFIX = ".json"
+BASE_FILE = "base.json"
+
+ScooterChange = Optional[Dict[str, Any]]
+
+def _fsync_dir(directory: str) -> None:
+    # переименование переживает падение только после fsync каталога
+    if os.name == "nt":
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def _write_atomic(path: str, data: Any) -> None:
+    # запись во временный файл, fsync и переименование
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    _fsync_dir(os.path.dirname(path) or ".")
+
+def _is_full_record(change: ScooterChange) -> bool:
+    return change is not None and "type" in change
+
+def save_scooters_delta(changes: Dict[str, ScooterChange], path: str, seq: int = 0) -> int:
+    # запись дельты; возвращает число измененных самокатов
+    _write_atomic(path, {"seq": seq, "changes": changes})
+    return len(changes)
+
+def read_scooters_delta(path: str) -> Dict[str, ScooterChange]:
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, dict) or not isinstance(data.get("changes"), dict):
+        raise InvalidScooterError(f"{path}: это не файл дельты.")
+    return data["changes"]
+
+def merge_scooter_deltas(deltas: Iterable[Dict[str, ScooterChange]]) -> Dict[str, ScooterChange]:
+    # цепочка дельт -> одна; более поздние значения перекрывают ранние,
+    # удаление и полная запись заменяют все предыдущее
+    merged: Dict[str, ScooterChange] = {}
+    for delta in deltas:
+        for sid, fields in delta.items():
+            current = merged.get(sid)
+            if current is None or fields is None or _is_full_record(fields):
+                merged[sid] = None if fields is None else dict(fields)
+            else:
+                current.update(fields)
+    return merged
+
+def apply_scooter_deltas(records: List[Dict[str, Any]], deltas: Iterable[Dict[str, ScooterChange]]) -> List[Dict[str, Any]]:
+    # применение дельт к записям to_dict на месте; новые самокаты — в конец
+    by_id = {r["scooter_id"]: r for r in records}
+    for delta in deltas:
+        for sid, fields in delta.items():
+            if fields is None:
+                by_id.pop(sid, None)
+                continue
+            record = by_id.get(sid)
+            if _is_full_record(fields):
+                by_id[sid] = dict(fields)
+            elif record is None:
+                raise InvalidScooterError(f"В базе нет самоката {sid!r} из дельты.")
+            else:
+                record.update(fields)
+    records[:] = by_id.values()
+    return records
+
+def load_scooters_with_deltas(base_path: str, delta_paths: Iterable[str]) -> List[Scooter]:
+    # база + цепочка дельт по порядку
+    with open(base_path, "r", encoding="utf-8") as f:
+        records = json.load(f)
+    apply_scooter_deltas(records, (read_scooters_delta(p) for p in delta_paths))
+    return [Scooter.from_dict(r) for r in records]
+
+class FleetDeltaStore:
+    """
+    Каталог с базовым файлом парка (base.json) и цепочкой дельт.
+    save_delta пишет только изменения — стоимость зависит от их числа,
+    а не от размера парка. Когда дельт становится больше max_deltas,
+    они сливаются в одну; когда слитая дельта затрагивает больше
+    rebase_ratio парка, база переписывается с ней и дельты удаляются.
+    Методы:
+      - save_base: полная запись парка (сбрасывает цепочку дельт)
+      - save_delta: запись изменений (словарь или объект с peek/mark_saved,
+        например DirtyTracker), новых (added) и удаленных (removed) самокатов
+      - load: база + дельты -> список Scooter
+      - merge / rebase: слияние дельт / перезапись базы вручную
+      - delta_paths: файлы дельт по порядку
+    Рабочий цикл: scooters = store.load(); tracker = DirtyTracker(scooters)
+    (01_scooter) — самокаты этого модуля уведомляют об изменениях через
+    add_listener; после изменений store.save_delta(tracker, added=..., removed=...).
+    """
+    def __init__(self, directory: str, max_deltas: int = 16, rebase_ratio: float = 0.25):
+        if max_deltas <= 0:
+            raise ValueError("max_deltas должен быть > 0.")
+        self.directory = directory
+        self.max_deltas = max_deltas
+        self.rebase_ratio = rebase_ratio
+        os.makedirs(directory, exist_ok=True)
+        self.base_path = os.path.join(directory, BASE_FILE)
+        # размер парка в базе; None — база еще не читалась и не писалась
+        self.fleet_size: Optional[int] = None
+        # идентификаторы парка с учетом дельт; None — еще не известны
+        self._ids: Optional[Set[str]] = None
+
+    def delta_paths(self) -> List[str]:
+        names = []
+        for name in os.listdir(self.directory):
+            stem = name[len(DELTA_PREFIX):-len(DELTA_SUFFIX)]
+            if name.startswith(DELTA_PREFIX) and name.endswith(DELTA_SUFFIX) and stem.isdigit():
+                names.append((int(stem), name))
+        names.sort()
+        return [os.path.join(self.directory, name) for _, name in names]
+
+    def _delta_path(self, seq: int) -> str:
+        return os.path.join(self.directory, f"{DELTA_PREFIX}{seq:08d}{DELTA_SUFFIX}")
+
+    def _seq(self, path: str) -> int:
+        return int(os.path.basename(path)[len(DELTA_PREFIX):-len(DELTA_SUFFIX)])
+
+    def _known_ids(self) -> Set[str]:
+        # состав парка читается с диска один раз, дальше ведется на save_delta
+        if self._ids is None:
+            with open(self.base_path, "r", encoding="utf-8") as f:
+                records = json.load(f)
+            apply_scooter_deltas(records, (read_scooters_delta(p) for p in self.delta_paths()))
+            self._ids = {r["scooter_id"] for r in records}
+        return self._ids
+
+    def save_base(self, scooters: List[Scooter]) -> None:
+        _write_atomic(self.base_path, [s.to_dict() for s in scooters])
+        self.fleet_size = len(scooters)
+        self._ids = {s.scooter_id for s in scooters}
+        for path in self.delta_paths():
+            os.remove(path)
+
+    def save_delta(self, changes: Any, added: Iterable[Scooter] = (),
+                   removed: Iterable[str] = ()) -> Optional[str]:
+        """
+        Запись дельты: изменения полей существующих самокатов, полные записи
+        added и удаления removed. Изменения самоката, которого нет в парке
+        и нет в added, отклоняются до записи (InvalidScooterError) — иначе
+        дельта сломала бы все последующие load. Объект с peek/mark_saved
+        снимает изменения с учета только после записи файла; объект только
+        с take — как раньше. Пустые изменения файла не создают.
+        """
+        tracker = None
+        if hasattr(changes, "peek") and hasattr(changes, "mark_saved"):
+            tracker, changes = changes, changes.peek()
+        elif hasattr(changes, "take"):
+            changes = changes.take()
+        delta: Dict[str, ScooterChange] = dict(changes)
+        added_ids = set()
+        for scooter in added:
+            delta[scooter.scooter_id] = scooter.to_dict()
+            added_ids.add(scooter.scooter_id)
+        removed = list(removed)
+        known = self._known_ids()
+        for sid, fields in changes.items():
+            if sid not in known and sid not in added_ids and not _is_full_record(fields):
+                raise InvalidScooterError(f"В парке нет самоката {sid!r}; передайте его в added.")
+        for sid in removed:
+            if sid not in known and sid not in added_ids:
+                raise InvalidScooterError(f"В парке нет самоката {sid!r} для удаления.")
+            delta[sid] = None
+        if not delta:
+            return None
+        paths = self.delta_paths()
+        seq = self._seq(paths[-1]) + 1 if paths else 1
+        path = self._delta_path(seq)
+        save_scooters_delta(delta, path, seq)
+        if tracker is not None:
+            tracker.mark_saved(changes)
+        for sid, fields in delta.items():
+            if fields is None:
+                known.discard(sid)
+            else:
+                known.add(sid)
+        self.fleet_size = len(known)
+        if len(paths) + 1 > self.max_deltas:
+            self.merge()
+        return path
+
+    def merge(self) -> int:
+        # слитая дельта занимает место последней; старые удаляются после
+        paths = self.delta_paths()
+        if len(paths) < 2:
+            return len(paths)
+        merged = merge_scooter_deltas(read_scooters_delta(p) for p in paths)
+        if self.fleet_size and len(merged) > self.rebase_ratio * self.fleet_size:
+            self._rebase(merged, paths)
+            return 0
+        save_scooters_delta(merged, paths[-1], self._seq(paths[-1]))
+        for path in paths[:-1]:
+            os.remove(path)
+        return 1
+
+    def rebase(self) -> None:
+        paths = self.delta_paths()
+        self._rebase(merge_scooter_deltas(read_scooters_delta(p) for p in paths), paths)
+
+    def _rebase(self, merged: Dict[str, ScooterChange], paths: List[str]) -> None:
+        with open(self.base_path, "r", encoding="utf-8") as f:
+            records = json.load(f)
+        _write_atomic(self.base_path, apply_scooter_deltas(records, [merged]))
+        self.fleet_size = len(records)
+        self._ids = {r["scooter_id"] for r in records}
+        for path in paths:
+            os.remove(path)
+
+    def load(self) -> List[Scooter]:
+        scooters = load_scooters_with_deltas(self.base_path, self.delta_paths())
+        self.fleet_size = len(scooters)
+        self._ids = {s.scooter_id for s in scooters}
+        return scooters
@@ -2,7 +2,7 @@ from __future__ import annotations
 from dataclasses import dataclass
 from datetime import datetime
 
-@dataclass(order=False)
+@dataclass(order=False, slots=True)
 class Rental:
     """
     Модель аренды с методами сравнения.
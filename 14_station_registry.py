@@ -0,0 +1,186 @@
+from __future__ import annotations
+import math
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# средний радиус Земли в метрах
+EARTH_RADIUS_M = 6_371_008.8
+
+# половина длины экватора — дальше искать бессмысленно
+MAX_DISTANCE_M = math.pi * EARTH_RADIUS_M
+
+def haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    # расстояние по большому кругу в метрах
+    p1 = math.radians(lat1)
+    p2 = math.radians(lat2)
+    dp = p2 - p1
+    dl = math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+def station_coordinates(station: object) -> Optional[Tuple[float, float]]:
+    # координаты станции из location_info или None, если их нет
+    location = getattr(station, "location_info", None)
+    lat = getattr(location, "latitude", None)
+    lon = getattr(location, "longitude", None)
+    if lat is None or lon is None:
+        return None
+    return float(lat), float(lon)
+
+def station_has_available(station: object) -> bool:
+    # есть ли на станции свободные самокаты
+    count = getattr(station, "available_count", None)
+    if count is not None:
+        return count() > 0
+    return bool(station.get_available_scooters())
+
+class StationRegistry:
+    """
+    Реестр станций с пространственным индексом (сетка по широте/долготе).
+    Параметры:
+      - cell_deg: размер ячейки в градусах (0.01 ~ 1.1 км по широте)
+    Методы:
+      - add / remove / get / update_location
+      - within_radius: станции в радиусе, отсортированные по расстоянию
+      - nearest: k ближайших станций
+      - unlocated: станции без координат (в геозапросы не попадают)
+    Результаты запросов — списки пар (расстояние в метрах, станция).
+    """
+    def __init__(self, cell_deg: float = 0.01):
+        if cell_deg <= 0 or cell_deg > 180:
+            raise ValueError("cell_deg должен быть в диапазоне (0, 180].")
+        self.cell_deg = cell_deg
+        # количество ячеек по долготе (для перехода через 180-й меридиан);
+        # шаг по долготе подгоняем, чтобы ячейки ровно покрывали 360 градусов
+        self._lon_cells = max(1, math.ceil(360.0 / cell_deg))
+        self._lon_step = 360.0 / self._lon_cells
+        self._stations: Dict[str, object] = {}
+        self._coords: Dict[str, Tuple[float, float]] = {}
+        self._cells: Dict[Tuple[int, int], Dict[str, object]] = {}
+        self._unlocated: Dict[str, object] = {}
+
+    def __len__(self) -> int:
+        return len(self._stations)
+
+    def __contains__(self, station_id: object) -> bool:
+        return station_id in self._stations
+
+    def __iter__(self):
+        return iter(self._stations.values())
+
+    def get(self, station_id: str) -> Optional[object]:
+        return self._stations.get(station_id)
+
+    def add(self, station: object) -> None:
+        # регистрируем станцию; повторная регистрация обновляет координаты
+        sid = station.station_id
+        if sid in self._stations:
+            self.remove(sid)
+        self._stations[sid] = station
+        coords = station_coordinates(station)
+        if coords is None:
+            self._unlocated[sid] = station
+            return
+        self._coords[sid] = coords
+        self._cells.setdefault(self._cell_of(*coords), {})[sid] = station
+
+    def add_many(self, stations: Iterable[object]) -> None:
+        for station in stations:
+            self.add(station)
+
+    def remove(self, station_id: str) -> bool:
+        station = self._stations.pop(station_id, None)
+        if station is None:
+            return False
+        self._unlocated.pop(station_id, None)
+        coords = self._coords.pop(station_id, None)
+        if coords is not None:
+            key = self._cell_of(*coords)
+            cell = self._cells[key]
+            del cell[station_id]
+            if not cell:
+                # пустые ячейки не храним
+                del self._cells[key]
+        return True
+
+    def update_location(self, station: object) -> None:
+        # переиндексация после изменения location_info
+        self.add(station)
+
+    def unlocated(self) -> List[object]:
+        return list(self._unlocated.values())
+
+    def within_radius(self, latitude: float, longitude: float, radius_m: float,
+                      only_available: bool = False) -> List[Tuple[float, object]]:
+        # станции в радиусе radius_m, ближайшие первыми
+        if radius_m < 0:
+            raise ValueError("radius_m не может быть отрицательным.")
+        result = []
+        for sid, station in self._candidates(latitude, longitude, radius_m):
+            lat, lon = self._coords[sid]
+            dist = haversine_m(latitude, longitude, lat, lon)
+            if dist > radius_m:
+                continue
+            if only_available and not station_has_available(station):
+                continue
+            result.append((dist, station))
+        result.sort(key=lambda pair: (pair[0], pair[1].station_id))
+        return result
+
+    def nearest(self, latitude: float, longitude: float, k: int = 1,
+                only_available: bool = False,
+                max_radius_m: Optional[float] = None) -> List[Tuple[float, object]]:
+        # k ближайших станций: расширяем радиус, пока не наберем k
+        if k <= 0:
+            return []
+        limit = MAX_DISTANCE_M if max_radius_m is None else min(max_radius_m, MAX_DISTANCE_M)
+        radius = min(self._cell_size_m(), limit)
+        while True:
+            found = self.within_radius(latitude, longitude, radius, only_available)
+            # все станции ближе radius уже найдены, поэтому первые k точны
+            if len(found) >= k or radius >= limit:
+                return found[:k]
+            radius = min(radius * 2, limit)
+
+    def _cell_size_m(self) -> float:
+        return math.radians(self.cell_deg) * EARTH_RADIUS_M
+
+    def _cell_of(self, latitude: float, longitude: float) -> Tuple[int, int]:
+        row = math.floor((latitude + 90.0) / self.cell_deg)
+        col = math.floor((longitude + 180.0) / self._lon_step) % self._lon_cells
+        return row, col
+
+    def _candidates(self, latitude: float, longitude: float, radius_m: float):
+        # станции из ячеек, пересекающих ограничивающий прямоугольник круга
+        angular = radius_m / EARTH_RADIUS_M
+        dlat = math.degrees(angular)
+        lat_lo = max(-90.0, latitude - dlat)
+        lat_hi = min(90.0, latitude + dlat)
+        # максимальное отклонение по долготе для круга на сфере;
+        # если круг накрывает полюс — берем все долготы
+        cos_lat = math.cos(math.radians(latitude))
+        if lat_lo <= -90.0 or lat_hi >= 90.0 or math.sin(angular) >= cos_lat:
+            dlon = 180.0
+        else:
+            # небольшой запас на погрешность округления
+            dlon = min(180.0, math.degrees(math.asin(math.sin(angular) / cos_lat)) + 1e-9)
+        row_lo = self._cell_of(lat_lo, longitude)[0]
+        row_hi = self._cell_of(lat_hi, longitude)[0]
+        if dlon >= 180.0:
+            cols: Optional[Set[int]] = None
+            n_cols = self._lon_cells
+        else:
+            col_lo = math.floor((longitude - dlon + 180.0) / self._lon_step)
+            col_hi = math.floor((longitude + dlon + 180.0) / self._lon_step)
+            n_cols = min(self._lon_cells, col_hi - col_lo + 1)
+            cols = {c % self._lon_cells for c in range(col_lo, col_lo + n_cols)}
+        # если ячеек в прямоугольнике больше, чем непустых, обходим непустые
+        if (row_hi - row_lo + 1) * n_cols > len(self._cells):
+            for (row, col), cell in self._cells.items():
+                if row_lo <= row <= row_hi and (cols is None or col in cols):
+                    yield from cell.items()
+            return
+        for row in range(row_lo, row_hi + 1):
+            for col in (cols if cols is not None else range(self._lon_cells)):
+                cell = self._cells.get((row, col))
+                if cell:
+                    yield from cell.items()
@@ -0,0 +1,491 @@
+from __future__ import annotations
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+
+# локальные исключения, чтобы файл был автономным
+class InvalidScooterError(ValueError):
+    # ошибка некорректных данных самоката
+    pass
+
+# коды типов (совпадают с Scooter.TYPE из сериализации)
+TYPE_CODES: Dict[str, int] = {"city": 0, "off_road": 1, "foldable": 2}
+TYPE_NAMES: List[str] = sorted(TYPE_CODES, key=TYPE_CODES.get)
+
+# значения по умолчанию для полей подтипов
+DEFAULT_MAX_SPEED = 25
+DEFAULT_TIRE_TYPE = "all-terrain"
+DEFAULT_WEIGHT = 12.0
+
+RowsLike = Union[int, Sequence[int], np.ndarray]
+
+class _Categories:
+    # словарь строк: строка <-> целочисленный код
+    def __init__(self) -> None:
+        self.values: List[str] = []
+        self.codes: Dict[str, int] = {}
+
+    def code(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.codes[value] = code
+            self.values.append(value)
+        return code
+
+    def encode(self, values: Iterable[str]) -> np.ndarray:
+        return np.fromiter((self.code(v) for v in values), dtype=np.int32)
+
+class FleetStore:
+    """
+    Колоночное хранилище парка самокатов на массивах NumPy.
+    Колонки (по строке на самокат):
+      - ids: идентификаторы (строки фиксированной ширины)
+      - model_codes: коды моделей (справочник models)
+      - battery_levels: заряд 0..100 (uint8)
+      - hourly_rates: почасовая ставка (float64)
+      - availability: доступность (bool)
+      - type_codes: тип самоката (TYPE_CODES)
+      - max_speed / tire_type / weight: поля подтипов
+    Методы:
+      - append / extend / from_scooters / remove
+      - mask / select / ids_where: векторные фильтры
+      - mean_battery_by_model / count_by_type: агрегаты
+      - set_battery / set_hourly_rate / set_available: массовые обновления с валидацией
+      - rental_costs: стоимость аренды по формулам типов
+      - view / views: объекты ScooterView, совместимые со Scooter
+    Удаление переносит последнюю строку на место удаленной, номера строк
+    после remove не стабильны — для долгоживущих ссылок используйте view.
+    """
+    def __init__(self, capacity: int = 1024):
+        capacity = max(1, capacity)
+        self._size = 0
+        self._ids = np.empty(capacity, dtype="U8")
+        self._model_codes = np.empty(capacity, dtype=np.int32)
+        self._battery = np.empty(capacity, dtype=np.uint8)
+        self._rates = np.empty(capacity, dtype=np.float64)
+        self._available = np.empty(capacity, dtype=np.bool_)
+        self._types = np.empty(capacity, dtype=np.uint8)
+        self._max_speed = np.empty(capacity, dtype=np.int32)
+        self._tire_codes = np.empty(capacity, dtype=np.int32)
+        self._weight = np.empty(capacity, dtype=np.float64)
+        self._models = _Categories()
+        self._tires = _Categories()
+        self._row_of: Dict[str, int] = {}
+
+    # --- размер и доступ к колонкам ---
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, scooter_id: object) -> bool:
+        return scooter_id in self._row_of
+
+    def __iter__(self) -> Iterator["ScooterView"]:
+        return iter(self.views())
+
+    def row_of(self, scooter_id: str) -> int:
+        row = self._row_of.get(scooter_id)
+        if row is None:
+            raise KeyError(scooter_id)
+        return row
+
+    @property
+    def models(self) -> List[str]:
+        # справочник моделей: индекс = код модели
+        return list(self._models.values)
+
+    @property
+    def ids(self) -> np.ndarray:
+        return self._column(self._ids)
+
+    @property
+    def model_codes(self) -> np.ndarray:
+        return self._column(self._model_codes)
+
+    @property
+    def battery_levels(self) -> np.ndarray:
+        return self._column(self._battery)
+
+    @property
+    def hourly_rates(self) -> np.ndarray:
+        return self._column(self._rates)
+
+    @property
+    def availability(self) -> np.ndarray:
+        return self._column(self._available)
+
+    @property
+    def type_codes(self) -> np.ndarray:
+        return self._column(self._types)
+
+    def _column(self, array: np.ndarray) -> np.ndarray:
+        # представление только для чтения, без копирования
+        view = array[:self._size]
+        view.flags.writeable = False
+        return view
+
+    # --- добавление и удаление ---
+
+    def append(self, scooter_type: str, scooter_id: str, model: str, battery_level: int,
+               hourly_rate: float, is_available: bool = True, max_speed: int = DEFAULT_MAX_SPEED,
+               tire_type: str = DEFAULT_TIRE_TYPE, weight: float = DEFAULT_WEIGHT) -> int:
+        # добавление одного самоката, возвращает номер строки
+        return int(self.extend(
+            [scooter_type], [scooter_id], [model], [battery_level], [hourly_rate], [is_available],
+            max_speed=[max_speed], tire_type=[tire_type], weight=[weight],
+        )[0])
+
+    def extend(self, types: Sequence[str], scooter_ids: Sequence[str], models: Sequence[str],
+               battery_levels: Sequence[int], hourly_rates: Sequence[float],
+               availability: Optional[Sequence[bool]] = None,
+               max_speed: Optional[Sequence[int]] = None,
+               tire_type: Optional[Sequence[str]] = None,
+               weight: Optional[Sequence[float]] = None) -> np.ndarray:
+        # пакетное добавление по колонкам; либо добавляется всё, либо ничего
+        n = len(scooter_ids)
+        type_codes = self._encode_types(types)
+        battery = np.asarray(battery_levels)
+        rates = np.asarray(hourly_rates, dtype=np.float64)
+        if not (len(type_codes) == len(models) == len(battery) == len(rates) == n):
+            raise InvalidScooterError("Колонки должны быть одинаковой длины.")
+        # необязательные колонки приводятся и проверяются до первой записи:
+        # иначе короткая колонка оставила бы хранилище расширенным наполовину
+        available = np.True_ if availability is None else np.asarray(availability, dtype=np.bool_)
+        speeds = np.int32(DEFAULT_MAX_SPEED) if max_speed is None else np.asarray(max_speed, dtype=np.int32)
+        weights = np.float64(DEFAULT_WEIGHT) if weight is None else np.asarray(weight, dtype=np.float64)
+        tires = None if tire_type is None else list(tire_type)
+        for name, column in (("availability", available), ("max_speed", speeds), ("weight", weights)):
+            if np.ndim(column) != 0 and len(column) != n:
+                raise InvalidScooterError(f"Колонка {name} должна быть длины {n}.")
+        if tires is not None and len(tires) != n:
+            raise InvalidScooterError(f"Колонка tire_type должна быть длины {n}.")
+        _validate_battery(battery)
+        _validate_rates(rates)
+        ids = [str(sid) for sid in scooter_ids]
+        seen = set()
+        for sid in ids:
+            if sid in self._row_of or sid in seen:
+                raise InvalidScooterError(f"Самокат {sid!r} уже есть в хранилище.")
+            seen.add(sid)
+
+        start = self._size
+        self._reserve(start + n, max((len(sid) for sid in ids), default=0))
+        stop = start + n
+        self._ids[start:stop] = ids
+        self._model_codes[start:stop] = self._models.encode(models)
+        self._battery[start:stop] = battery
+        self._rates[start:stop] = rates
+        self._available[start:stop] = available
+        self._types[start:stop] = type_codes
+        self._max_speed[start:stop] = speeds
+        self._tire_codes[start:stop] = self._tires.code(DEFAULT_TIRE_TYPE) if tires is None else self._tires.encode(tires)
+        self._weight[start:stop] = weights
+        for offset, sid in enumerate(ids):
+            self._row_of[sid] = start + offset
+        self._size = stop
+        return np.arange(start, stop)
+
+    @classmethod
+    def from_scooters(cls, scooters: Iterable[Any]) -> "FleetStore":
+        # перенос объектов Scooter (по их to_dict) в колонки
+        records = [s.to_dict() for s in scooters]
+        store = cls(capacity=len(records))
+        store.extend(
+            [r["type"] for r in records],
+            [r["scooter_id"] for r in records],
+            [r["model"] for r in records],
+            [r["battery_level"] for r in records],
+            [r["hourly_rate"] for r in records],
+            [r.get("is_available", True) for r in records],
+            max_speed=[r.get("max_speed", DEFAULT_MAX_SPEED) for r in records],
+            tire_type=[r.get("tire_type", DEFAULT_TIRE_TYPE) for r in records],
+            weight=[r.get("weight", DEFAULT_WEIGHT) for r in records],
+        )
+        return store
+
+    def remove(self, scooter_id: str) -> bool:
+        # удаление за O(1): последняя строка переезжает на место удаленной
+        row = self._row_of.pop(scooter_id, None)
+        if row is None:
+            return False
+        last = self._size - 1
+        if row != last:
+            for column in self._columns():
+                column[row] = column[last]
+            self._row_of[str(self._ids[row])] = row
+        self._size = last
+        return True
+
+    def _columns(self) -> List[np.ndarray]:
+        return [self._ids, self._model_codes, self._battery, self._rates, self._available,
+                self._types, self._max_speed, self._tire_codes, self._weight]
+
+    def _reserve(self, size: int, id_width: int) -> None:
+        # рост емкости удвоением, расширение ширины строк id при необходимости
+        capacity = len(self._ids)
+        width = self._ids.dtype.itemsize // np.dtype("U1").itemsize
+        if size <= capacity and id_width <= width:
+            return
+        new_capacity = capacity
+        while new_capacity < size:
+            new_capacity *= 2
+        new_width = max(width, id_width)
+        names = ["_ids", "_model_codes", "_battery", "_rates", "_available",
+                 "_types", "_max_speed", "_tire_codes", "_weight"]
+        for name in names:
+            old = getattr(self, name)
+            dtype = np.dtype(f"U{new_width}") if name == "_ids" else old.dtype
+            new = np.empty(new_capacity, dtype=dtype)
+            new[:self._size] = old[:self._size]
+            setattr(self, name, new)
+
+    def _encode_types(self, types: Sequence[str]) -> np.ndarray:
+        codes = np.empty(len(types), dtype=np.uint8)
+        for i, t in enumerate(types):
+            code = TYPE_CODES.get(str(t).lower())
+            if code is None:
+                raise InvalidScooterError(f"Неизвестный тип самоката: {t!r}")
+            codes[i] = code
+        return codes
+
+    # --- фильтры ---
+
+    def mask(self, scooter_type: Optional[str] = None, model: Optional[str] = None,
+             min_battery: Optional[int] = None, max_battery: Optional[int] = None,
+             max_rate: Optional[float] = None, available: Optional[bool] = None) -> np.ndarray:
+        # булева маска по сочетанию условий (None — условие не задано)
+        n = self._size
+        result = np.ones(n, dtype=np.bool_)
+        if scooter_type is not None:
+            code = TYPE_CODES.get(scooter_type.lower())
+            if code is None:
+                raise InvalidScooterError(f"Неизвестный тип самоката: {scooter_type!r}")
+            result &= self._types[:n] == code
+        if model is not None:
+            code = self._models.codes.get(model)
+            if code is None:
+                return np.zeros(n, dtype=np.bool_)
+            result &= self._model_codes[:n] == code
+        if min_battery is not None:
+            result &= self._battery[:n] >= min_battery
+        if max_battery is not None:
+            result &= self._battery[:n] <= max_battery
+        if max_rate is not None:
+            result &= self._rates[:n] <= max_rate
+        if available is not None:
+            result &= self._available[:n] == bool(available)
+        return result
+
+    def select(self, **criteria: Any) -> np.ndarray:
+        # номера строк, удовлетворяющих условиям mask
+        return np.flatnonzero(self.mask(**criteria))
+
+    def ids_where(self, **criteria: Any) -> List[str]:
+        return self._ids[:self._size][self.mask(**criteria)].tolist()
+
+    # --- агрегаты ---
+
+    def mean_battery_by_model(self) -> Dict[str, float]:
+        # средний заряд по моделям одним проходом bincount
+        n = self._size
+        codes = self._model_codes[:n]
+        k = len(self._models.values)
+        counts = np.bincount(codes, minlength=k)
+        sums = np.bincount(codes, weights=self._battery[:n], minlength=k)
+        return {
+            self._models.values[code]: float(sums[code] / counts[code])
+            for code in np.flatnonzero(counts)
+        }
+
+    def count_by_type(self, available: Optional[bool] = None) -> Dict[str, int]:
+        n = self._size
+        types = self._types[:n]
+        if available is not None:
+            types = types[self._available[:n] == bool(available)]
+        counts = np.bincount(types, minlength=len(TYPE_NAMES))
+        return {name: int(counts[code]) for code, name in enumerate(TYPE_NAMES)}
+
+    # --- массовые обновления ---
+
+    def set_battery(self, rows: RowsLike, values: Union[int, Sequence[int], np.ndarray]) -> None:
+        rows = self._check_rows(rows)
+        values = np.asarray(values)
+        _validate_battery(values)
+        self._battery[rows] = values
+
+    def set_hourly_rate(self, rows: RowsLike, values: Union[float, Sequence[float], np.ndarray]) -> None:
+        rows = self._check_rows(rows)
+        values = np.asarray(values, dtype=np.float64)
+        _validate_rates(values)
+        self._rates[rows] = values
+
+    def set_available(self, rows: RowsLike, value: Union[bool, Sequence[bool], np.ndarray]) -> None:
+        rows = self._check_rows(rows)
+        self._available[rows] = np.asarray(value, dtype=np.bool_)
+
+    def _check_rows(self, rows: RowsLike) -> np.ndarray:
+        rows = np.asarray(rows)
+        if rows.dtype == np.bool_:
+            if rows.shape != (self._size,):
+                raise IndexError("Маска должна совпадать по длине с хранилищем.")
+            return np.flatnonzero(rows)
+        rows = rows.astype(np.intp, copy=False)
+        if rows.size and (rows.min() < 0 or rows.max() >= self._size):
+            raise IndexError("Номер строки вне диапазона.")
+        return rows
+
+    # --- стоимость аренды ---
+
+    def rental_costs(self, hours: Union[float, np.ndarray], rows: Optional[RowsLike] = None) -> np.ndarray:
+        # те же формулы, что и calculate_rental_cost у подтипов
+        rows = np.arange(self._size) if rows is None else self._check_rows(rows)
+        rates = self._rates[rows]
+        types = self._types[rows]
+        hours = np.broadcast_to(np.asarray(hours, dtype=np.float64), rates.shape)
+        base = rates * hours
+        costs = base.copy()
+        off_road = types == TYPE_CODES["off_road"]
+        costs[off_road] = rates[off_road] * 1.2 * hours[off_road]
+        foldable = (types == TYPE_CODES["foldable"]) & (hours >= 4)
+        costs[foldable] = base[foldable] * 0.9
+        return costs
+
+    # --- объектные представления ---
+
+    def view(self, key: Union[int, str]) -> "ScooterView":
+        # представление по номеру строки или по scooter_id
+        if isinstance(key, str):
+            self.row_of(key)
+            return ScooterView(self, key)
+        if not 0 <= key < self._size:
+            raise IndexError(key)
+        return ScooterView(self, str(self._ids[key]))
+
+    def views(self, rows: Optional[RowsLike] = None) -> List["ScooterView"]:
+        ids = self._ids[:self._size] if rows is None else self._ids[self._check_rows(rows)]
+        return [ScooterView(self, sid) for sid in ids.tolist()]
+
+def _validate_battery(values: np.ndarray) -> None:
+    if values.size and (values.min() < 0 or values.max() > 100):
+        raise InvalidScooterError("Уровень заряда должен быть 0..100.")
+
+def _validate_rates(values: np.ndarray) -> None:
+    # not (> 0) отсекает и NaN
+    if values.size and not np.all(values > 0):
+        raise InvalidScooterError("hourly_rate должен быть > 0.")
+
+class ScooterView:
+    """
+    Легкое представление строки FleetStore с интерфейсом Scooter:
+    свойства с валидацией, calculate_rental_cost, to_dict и сравнения.
+    Хранит только ссылку на хранилище и scooter_id, поэтому остается
+    корректным после удаления других строк.
+    """
+    __slots__ = ("_store", "_scooter_id")
+
+    def __init__(self, store: FleetStore, scooter_id: str):
+        self._store = store
+        self._scooter_id = scooter_id
+
+    @property
+    def _row(self) -> int:
+        return self._store.row_of(self._scooter_id)
+
+    @property
+    def scooter_id(self) -> str:
+        return self._scooter_id
+
+    @property
+    def TYPE(self) -> str:
+        return TYPE_NAMES[self._store._types[self._row]]
+
+    @property
+    def model(self) -> str:
+        return self._store._models.values[self._store._model_codes[self._row]]
+
+    @model.setter
+    def model(self, value: str) -> None:
+        if not value:
+            raise InvalidScooterError("Модель не может быть пустой.")
+        self._store._model_codes[self._row] = self._store._models.code(value)
+
+    @property
+    def battery_level(self) -> int:
+        return int(self._store._battery[self._row])
+
+    @battery_level.setter
+    def battery_level(self, value: int) -> None:
+        if not (0 <= value <= 100):
+            raise InvalidScooterError("Уровень заряда должен быть 0..100.")
+        self._store._battery[self._row] = value
+
+    @property
+    def hourly_rate(self) -> float:
+        return float(self._store._rates[self._row])
+
+    @hourly_rate.setter
+    def hourly_rate(self, value: float) -> None:
+        if value <= 0:
+            raise InvalidScooterError("hourly_rate должен быть > 0.")
+        self._store._rates[self._row] = value
+
+    @property
+    def is_available(self) -> bool:
+        return bool(self._store._available[self._row])
+
+    @is_available.setter
+    def is_available(self, value: bool) -> None:
+        self._store._available[self._row] = bool(value)
+
+    def calculate_rental_cost(self, hours: float) -> float:
+        # скалярные формулы подтипов
+        kind = self.TYPE
+        if kind == "off_road":
+            return self.hourly_rate * 1.2 * hours
+        base = self.hourly_rate * hours
+        if kind == "foldable":
+            return base * 0.9 if hours >= 4 else base
+        return base
+
+    def to_dict(self) -> Dict[str, Any]:
+        # формат совпадает с Scooter.to_dict из сериализации
+        store, row = self._store, self._row
+        kind = TYPE_NAMES[store._types[row]]
+        d: Dict[str, Any] = {
+            "type": kind,
+            "scooter_id": self._scooter_id,
+            "model": store._models.values[store._model_codes[row]],
+            "battery_level": int(store._battery[row]),
+            "hourly_rate": float(store._rates[row]),
+            "is_available": bool(store._available[row]),
+        }
+        if kind == "city":
+            d["max_speed"] = int(store._max_speed[row])
+        elif kind == "off_road":
+            d["tire_type"] = store._tires.values[store._tire_codes[row]]
+        elif kind == "foldable":
+            d["weight"] = float(store._weight[row])
+        return d
+
+    def __str__(self) -> str:
+        return f"Самокат: {self.model}, Заряд: {self.battery_level}%"
+
+    def __repr__(self) -> str:
+        return f"ScooterView({self._scooter_id!r})"
+
+    def __eq__(self, other: object) -> bool:
+        # как у Scooter: по ставке, заряду и модели
+        if not hasattr(other, "hourly_rate") or not hasattr(other, "battery_level"):
+            return NotImplemented
+        return (self.hourly_rate, self.battery_level, self.model) == (other.hourly_rate, other.battery_level, other.model)
+
+    def __lt__(self, other: Any) -> bool:
+        if not hasattr(other, "hourly_rate") or not hasattr(other, "battery_level"):
+            return NotImplemented
+        return (self.hourly_rate, self.battery_level) < (other.hourly_rate, other.battery_level)
+
+    def __gt__(self, other: Any) -> bool:
+        if not hasattr(other, "hourly_rate") or not hasattr(other, "battery_level"):
+            return NotImplemented
+        return (self.hourly_rate, self.battery_level) > (other.hourly_rate, other.battery_level)
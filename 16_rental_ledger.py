@@ -0,0 +1,284 @@
+from __future__ import annotations
+import math
+import random
+from datetime import datetime
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+
+# локальные исключения, чтобы файл был автономным
+class RentalNotFoundError(LookupError):
+    # ошибка отсутствия записи об аренде
+    pass
+
+class _Node:
+    # узел декартова дерева с размером поддерева
+    __slots__ = ("key", "value", "priority", "left", "right", "size")
+
+    def __init__(self, key: Tuple, value: Any, priority: float):
+        self.key = key
+        self.value = value
+        self.priority = priority
+        self.left: Optional[_Node] = None
+        self.right: Optional[_Node] = None
+        self.size = 1
+
+def _size(node: Optional[_Node]) -> int:
+    return node.size if node is not None else 0
+
+def _update(node: _Node) -> _Node:
+    node.size = 1 + _size(node.left) + _size(node.right)
+    return node
+
+def _split(node: Optional[_Node], key: Tuple) -> Tuple[Optional[_Node], Optional[_Node]]:
+    # разрезаем на ключи < key и >= key
+    if node is None:
+        return None, None
+    if node.key < key:
+        node.right, right = _split(node.right, key)
+        return _update(node), right
+    left, node.left = _split(node.left, key)
+    return left, _update(node)
+
+def _merge(left: Optional[_Node], right: Optional[_Node]) -> Optional[_Node]:
+    # все ключи left меньше ключей right
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        return _update(left)
+    right.left = _merge(left, right.left)
+    return _update(right)
+
+def _insert(node: Optional[_Node], new: _Node) -> _Node:
+    # спускаемся до места по приоритету и там разрезаем поддерево
+    if node is None:
+        return new
+    if new.priority > node.priority:
+        new.left, new.right = _split(node, new.key)
+        return _update(new)
+    if new.key < node.key:
+        node.left = _insert(node.left, new)
+    else:
+        node.right = _insert(node.right, new)
+    node.size += 1
+    return node
+
+def _delete(node: Optional[_Node], key: Tuple) -> Tuple[Optional[_Node], bool]:
+    # удаляем узел, заменяя его слиянием детей
+    if node is None:
+        return None, False
+    if key < node.key:
+        node.left, found = _delete(node.left, key)
+    elif node.key < key:
+        node.right, found = _delete(node.right, key)
+    else:
+        return _merge(node.left, node.right), True
+    if found:
+        node.size -= 1
+    return node, found
+
+class OrderStatisticTree:
+    """
+    Декартово дерево (treap) с размерами поддеревьев.
+    Ключи уникальны; все операции — O(log n) в среднем,
+    обходы — O(log n + размер ответа).
+    """
+    def __init__(self, seed: Optional[int] = None):
+        self._root: Optional[_Node] = None
+        self._random = random.Random(seed)
+
+    def __len__(self) -> int:
+        return _size(self._root)
+
+    def insert(self, key: Tuple, value: Any) -> None:
+        # ключ должен отсутствовать в дереве
+        self._root = _insert(self._root, _Node(key, value, self._random.random()))
+
+    def delete(self, key: Tuple) -> bool:
+        self._root, found = _delete(self._root, key)
+        return found
+
+    def rank(self, key: Tuple) -> int:
+        # число ключей строго меньше key
+        node, result = self._root, 0
+        while node is not None:
+            if node.key < key:
+                result += _size(node.left) + 1
+                node = node.right
+            else:
+                node = node.left
+        return result
+
+    def kth(self, k: int) -> Tuple[Tuple, Any]:
+        # k-й по возрастанию элемент (с нуля)
+        if not 0 <= k < len(self):
+            raise IndexError(k)
+        node = self._root
+        while True:
+            left = _size(node.left)
+            if k < left:
+                node = node.left
+            elif k == left:
+                return node.key, node.value
+            else:
+                k -= left + 1
+                node = node.right
+
+    def ascending(self, lo: Optional[Tuple] = None, hi: Optional[Tuple] = None) -> Iterator[Tuple[Tuple, Any]]:
+        # обход по возрастанию ключей в [lo, hi), лениво
+        stack: List[_Node] = []
+        node = self._root
+        while stack or node is not None:
+            if node is not None:
+                if lo is not None and node.key < lo:
+                    # левое поддерево целиком меньше lo
+                    node = node.right
+                    continue
+                stack.append(node)
+                node = node.left
+                continue
+            node = stack.pop()
+            if hi is not None and not node.key < hi:
+                return
+            yield node.key, node.value
+            node = node.right
+
+    def descending(self) -> Iterator[Tuple[Tuple, Any]]:
+        # обход по убыванию ключей, лениво
+        stack: List[_Node] = []
+        node = self._root
+        while stack or node is not None:
+            if node is not None:
+                stack.append(node)
+                node = node.right
+                continue
+            node = stack.pop()
+            yield node.key, node.value
+            node = node.left
+
+def cost_key(rental: Any) -> Tuple:
+    # порядок Rental (__lt__/__gt__): cost, затем hours; rental_id делает ключ уникальным
+    return (rental.cost, rental.hours, rental.rental_id)
+
+def start_key(rental: Any) -> Tuple:
+    return (rental.start, rental.rental_id)
+
+class RentalLedger:
+    """
+    Журнал аренд с порядковой статистикой.
+    Хранит аренды в двух деревьях: по (cost, hours) — как сравнение Rental —
+    и по времени начала start.
+    Методы (O(log n), выдача — плюс размер ответа):
+      - add / remove / get: вставка (повторный rental_id заменяет запись) и удаление
+      - top(k): самые дорогие аренды, поток по убыванию стоимости
+      - rank / percentile / percentile_cost: ранг и процентили по стоимости
+      - between / count_between: срез по времени начала [start, end)
+      - group(name): вложенный журнал группы (например, города), если задан group_by
+    """
+    def __init__(self, group_by: Optional[Callable[[Any], Hashable]] = None, seed: Optional[int] = None):
+        self._by_cost = OrderStatisticTree(seed)
+        self._by_start = OrderStatisticTree(seed)
+        # rental_id -> (аренда, ключ по стоимости, ключ по началу, группа);
+        # ключи запоминаются при вставке, чтобы удаление не зависело от
+        # последующих изменений полей аренды
+        self._entries: Dict[str, Tuple[Any, Tuple, Tuple, Hashable]] = {}
+        self._group_by = group_by
+        self._groups: Dict[Hashable, "RentalLedger"] = {}
+        self._seed = seed
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, rental_id: object) -> bool:
+        return rental_id in self._entries
+
+    def get(self, rental_id: str) -> Optional[Any]:
+        entry = self._entries.get(rental_id)
+        return None if entry is None else entry[0]
+
+    def add(self, rental: Any) -> None:
+        # добавление; аренда с тем же rental_id заменяется (так же обновляют измененную аренду)
+        if rental.rental_id in self._entries:
+            self.remove(rental.rental_id)
+        by_cost, by_start = cost_key(rental), start_key(rental)
+        name = None if self._group_by is None else self._group_by(rental)
+        self._entries[rental.rental_id] = (rental, by_cost, by_start, name)
+        self._by_cost.insert(by_cost, rental)
+        self._by_start.insert(by_start, rental)
+        if self._group_by is not None:
+            group = self._groups.get(name)
+            if group is None:
+                group = self._groups[name] = RentalLedger(seed=self._seed)
+            group.add(rental)
+
+    def remove(self, rental_id: str) -> Any:
+        # удаление по идентификатору, возвращает удаленную аренду
+        entry = self._entries.pop(rental_id, None)
+        if entry is None:
+            raise RentalNotFoundError(f"Аренда {rental_id!r} не найдена.")
+        rental, by_cost, by_start, name = entry
+        self._by_cost.delete(by_cost)
+        self._by_start.delete(by_start)
+        if self._group_by is not None:
+            group = self._groups[name]
+            group.remove(rental_id)
+            if not group:
+                del self._groups[name]
+        return rental
+
+    def group(self, name: Hashable) -> "RentalLedger":
+        # журнал группы; пустой, если в группе нет аренд
+        if self._group_by is None:
+            raise ValueError("Журнал создан без group_by.")
+        return self._groups.get(name) or RentalLedger(seed=self._seed)
+
+    def groups(self) -> List[Hashable]:
+        return list(self._groups)
+
+    def top(self, k: Optional[int] = None) -> Iterator[Any]:
+        # самые дорогие аренды по убыванию; без k — весь поток
+        for i, (_, rental) in enumerate(self._by_cost.descending()):
+            if k is not None and i >= k:
+                return
+            yield rental
+
+    def bottom(self, k: Optional[int] = None) -> Iterator[Any]:
+        # самые дешевые аренды по возрастанию
+        for i, (_, rental) in enumerate(self._by_cost.ascending()):
+            if k is not None and i >= k:
+                return
+            yield rental
+
+    def rank(self, rental: Any) -> int:
+        # число аренд, которые меньше данной в порядке Rental
+        return self._by_cost.rank((rental.cost, rental.hours))
+
+    def nth(self, k: int) -> Any:
+        # k-я по возрастанию стоимости аренда (с нуля)
+        return self._by_cost.kth(k)[1]
+
+    def percentile(self, p: float) -> Any:
+        # аренда на p-м процентиле стоимости (метод ближайшего ранга)
+        n = len(self)
+        if n == 0:
+            raise RentalNotFoundError("Журнал пуст.")
+        if not 0 <= p <= 100:
+            raise ValueError("Процентиль должен быть в диапазоне 0..100.")
+        rank = max(1, math.ceil(p / 100.0 * n))
+        return self.nth(rank - 1)
+
+    def percentile_cost(self, p: float) -> float:
+        return self.percentile(p).cost
+
+    def between(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> Iterator[Any]:
+        # аренды с началом в [start, end), по времени начала
+        lo = None if start is None else (start,)
+        hi = None if end is None else (end,)
+        for _, rental in self._by_start.ascending(lo, hi):
+            yield rental
+
+    def count_between(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> int:
+        lo = 0 if start is None else self._by_start.rank((start,))
+        hi = len(self) if end is None else self._by_start.rank((end,))
+        return max(0, hi - lo)
@@ -0,0 +1,104 @@
+from __future__ import annotations
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+# ключ станции: как в RentalStation.__lt__ (заполненность, затем вместимость),
+# station_id делает ключ уникальным
+RankKey = Tuple[float, int, str]
+
+def station_key(station: object) -> RankKey:
+    return (station.utilization(), station.capacity, station.station_id)
+
+class StationRanking:
+    """
+    Рейтинг станций по заполненности с кешированными ключами.
+    Станции хранятся в отсортированном списке ключей; при add_scooter/
+    remove_scooter станция сама сообщает об изменении (add_listener),
+    и пересчитывается только ее позиция.
+    Методы:
+      - add / remove / update
+      - most_full(n) / most_empty(n): n самых заполненных / пустых станций
+      - utilization(station_id): закешированная заполненность
+      - rank(station_id): позиция по возрастанию заполненности
+    Изменение capacity не отслеживается — после него вызывайте update.
+    """
+    def __init__(self, stations: Iterable[object] = ()):
+        self._keys: List[RankKey] = []
+        self._stations: Dict[str, object] = {}
+        self._key_of: Dict[str, RankKey] = {}
+        for station in stations:
+            if station.station_id not in self._stations:
+                self._track(station)
+        # первичное построение одной сортировкой
+        self._keys = sorted(self._key_of.values())
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, station_id: object) -> bool:
+        return station_id in self._stations
+
+    def __iter__(self) -> Iterator[object]:
+        # станции по возрастанию заполненности
+        return (self._stations[key[2]] for key in self._keys)
+
+    def add(self, station: object) -> None:
+        if station.station_id in self._stations:
+            self.update(station)
+            return
+        insort(self._keys, self._track(station))
+
+    def remove(self, station_id: str) -> bool:
+        station = self._stations.pop(station_id, None)
+        if station is None:
+            return False
+        self._drop_key(self._key_of.pop(station_id))
+        remove_listener = getattr(station, "remove_listener", None)
+        if remove_listener is not None:
+            remove_listener(self.update)
+        return True
+
+    def update(self, station: object) -> None:
+        # пересчет позиции одной станции: O(log n) поиск + сдвиг списка
+        sid = station.station_id
+        old = self._key_of.get(sid)
+        if old is None:
+            return
+        new = station_key(station)
+        if new == old:
+            return
+        self._drop_key(old)
+        self._key_of[sid] = new
+        insort(self._keys, new)
+
+    def utilization(self, station_id: str) -> float:
+        return self._key_of[station_id][0]
+
+    def rank(self, station_id: str) -> int:
+        return bisect_left(self._keys, self._key_of[station_id])
+
+    def most_full(self, n: int) -> List[object]:
+        # n станций с наибольшей заполненностью, по убыванию
+        if n <= 0:
+            return []
+        return [self._stations[key[2]] for key in reversed(self._keys[-n:])]
+
+    def most_empty(self, n: int) -> List[object]:
+        # n станций с наименьшей заполненностью, по возрастанию
+        if n <= 0:
+            return []
+        return [self._stations[key[2]] for key in self._keys[:n]]
+
+    def _track(self, station: object) -> RankKey:
+        # запоминаем станцию и подписываемся на изменения заполненности
+        key = station_key(station)
+        self._stations[station.station_id] = station
+        self._key_of[station.station_id] = key
+        add_listener = getattr(station, "add_listener", None)
+        if add_listener is not None:
+            add_listener(self.update)
+        return key
+
+    def _drop_key(self, key: RankKey) -> None:
+        i = bisect_left(self._keys, key)
+        del self._keys[i]
@@ -0,0 +1,158 @@
+from __future__ import annotations
+import heapq
+import itertools
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+# локальные исключения, чтобы файл был автономным
+class InvalidScooterError(ValueError):
+    # ошибка некорректных данных самоката
+    pass
+
+class ScooterAlreadyReservedError(InvalidScooterError):
+    # самокат уже зарезервирован или недоступен
+    pass
+
+@dataclass(slots=True)
+class Reservation:
+    """
+    Резерв самоката за клиентом.
+    Поля:
+      - reservation_id: идентификатор резерва
+      - scooter_id / customer_id
+      - created_at: время создания (time.monotonic)
+      - expires_at: время истечения (None — бессрочно)
+    """
+    reservation_id: str
+    scooter_id: str
+    customer_id: str
+    created_at: float
+    expires_at: Optional[float] = None
+
+    def expired(self, now: float) -> bool:
+        return self.expires_at is not None and now >= self.expires_at
+
+class ReservationManager:
+    """
+    Резервирование самокатов без двойного бронирования.
+    Блокировки полосовые: scooter_id -> одна из stripes блокировок,
+    поэтому резервы разных самокатов идут параллельно, а проверка и
+    резервирование одного самоката атомарны.
+    Истекшие резервы снимаются лениво: у каждой полосы куча сроков,
+    try_reserve снимает истекшие резервы своей полосы (самокат снова
+    доступен), active и purge_expired — всех полос.
+    Методы:
+      - try_reserve: атомарно проверить и занять самокат (None, если занят)
+      - reserve: то же, но с исключением ScooterAlreadyReservedError
+      - release: снять резерв и вернуть самокат в доступные
+      - purge_expired: снять все истекшие резервы
+      - rent: резерв + процесс аренды (RentalProcess), резерв снимается при ошибке
+    """
+    def __init__(self, stripes: int = 64, clock=time.monotonic):
+        if stripes <= 0:
+            raise ValueError("stripes должен быть > 0.")
+        self._locks = [threading.Lock() for _ in range(stripes)]
+        # куча сроков полосы: (expires_at, reservation_id, scooter)
+        self._expiry: List[List[Tuple[float, str, Any]]] = [[] for _ in range(stripes)]
+        self._reservations: Dict[str, Reservation] = {}
+        self._ids = itertools.count(1)
+        self._clock = clock
+
+    def _lock_for(self, scooter_id: str) -> threading.Lock:
+        return self._locks[hash(scooter_id) % len(self._locks)]
+
+    def _purge_stripe(self, stripe: int, now: float) -> int:
+        # вызывается под блокировкой полосы; снятый ранее резерв пропускаем
+        heap = self._expiry[stripe]
+        purged = 0
+        while heap and heap[0][0] <= now:
+            _, reservation_id, scooter = heapq.heappop(heap)
+            current = self._reservations.get(scooter.scooter_id)
+            if current is not None and current.reservation_id == reservation_id:
+                del self._reservations[scooter.scooter_id]
+                scooter.is_available = True
+                purged += 1
+        return purged
+
+    def purge_expired(self) -> int:
+        # снять истекшие резервы всех полос, вернуть их число
+        purged = 0
+        for stripe, lock in enumerate(self._locks):
+            with lock:
+                purged += self._purge_stripe(stripe, self._clock())
+        return purged
+
+    def try_reserve(self, scooter: Any, customer_id: str, ttl: Optional[float] = None) -> Optional[Reservation]:
+        # атомарная проверка и резервирование одного самоката
+        scooter_id = scooter.scooter_id
+        stripe = hash(scooter_id) % len(self._locks)
+        with self._locks[stripe]:
+            now = self._clock()
+            self._purge_stripe(stripe, now)
+            current = self._reservations.get(scooter_id)
+            if current is not None:
+                if not current.expired(now):
+                    return None
+                # истекший резерв освобождает самокат
+                scooter.is_available = True
+            if not getattr(scooter, "is_available", True):
+                return None
+            reservation = Reservation(
+                reservation_id=f"RSV-{next(self._ids)}",
+                scooter_id=scooter_id,
+                customer_id=customer_id,
+                created_at=now,
+                expires_at=None if ttl is None else now + ttl,
+            )
+            scooter.is_available = False
+            self._reservations[scooter_id] = reservation
+            if reservation.expires_at is not None:
+                heapq.heappush(self._expiry[stripe], (reservation.expires_at, reservation.reservation_id, scooter))
+            return reservation
+
+    def reserve(self, scooter: Any, customer_id: str, ttl: Optional[float] = None) -> Reservation:
+        reservation = self.try_reserve(scooter, customer_id, ttl)
+        if reservation is None:
+            raise ScooterAlreadyReservedError(f"Самокат {scooter.scooter_id!r} уже занят.")
+        return reservation
+
+    def release(self, scooter: Any, reservation: Reservation) -> bool:
+        # снимаем резерв; чужой или уже снятый резерв не трогаем
+        scooter_id = scooter.scooter_id
+        with self._lock_for(scooter_id):
+            current = self._reservations.get(scooter_id)
+            if current is None or current.reservation_id != reservation.reservation_id:
+                return False
+            del self._reservations[scooter_id]
+            scooter.is_available = True
+            return True
+
+    def get(self, scooter_id: str) -> Optional[Reservation]:
+        # действующий резерв самоката
+        with self._lock_for(scooter_id):
+            current = self._reservations.get(scooter_id)
+            if current is None or current.expired(self._clock()):
+                return None
+            return current
+
+    def is_reserved(self, scooter_id: str) -> bool:
+        return self.get(scooter_id) is not None
+
+    def active(self) -> List[Reservation]:
+        # снимок действующих резервов; истекшие заодно снимаются
+        self.purge_expired()
+        now = self._clock()
+        return [r for r in list(self._reservations.values()) if not r.expired(now)]
+
+    def rent(self, process: Any, scooter: Any, customer_id: str, hours: float) -> Dict[str, Any]:
+        # резерв + шаблонный метод аренды; при ошибке резерв снимается
+        reservation = self.reserve(scooter, customer_id)
+        try:
+            rental = process.rent_scooter(scooter.scooter_id, customer_id, hours)
+        except BaseException:
+            self.release(scooter, reservation)
+            raise
+        rental["reservation_id"] = reservation.reservation_id
+        return rental
@@ -0,0 +1,349 @@
+from __future__ import annotations
+import json
+import math
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# границы гистограммы задержек в секундах: от микросекунды до секунды
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4,
+    1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0,
+)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+class Counter:
+    # монотонный счетчик
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        lock = self._lock
+        lock.acquire()
+        self.value += amount
+        lock.release()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.value = 0.0
+
+class Histogram:
+    """
+    Гистограмма с фиксированными границами (как в Prometheus):
+    наблюдение попадает в первую корзину с границей >= значения.
+    """
+    __slots__ = ("bounds", "counts", "sum", "count", "_lock")
+
+    def __init__(self, bounds: Sequence[float] = LATENCY_BUCKETS):
+        self.bounds = tuple(bounds)
+        # последняя корзина — +Inf
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        i = bisect_left(self.bounds, value)
+        # acquire/release дешевле with на горячем пути
+        lock = self._lock
+        lock.acquire()
+        self.counts[i] += 1
+        self.sum += value
+        self.count += 1
+        lock.release()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counts = [0] * len(self.counts)
+            self.sum = 0.0
+            self.count = 0
+
+    def cumulative(self) -> List[Tuple[float, int]]:
+        # пары (граница, число наблюдений <= границы), последняя граница — inf
+        result, total = [], 0
+        for bound, n in zip((*self.bounds, math.inf), self.counts):
+            total += n
+            result.append((bound, total))
+        return result
+
+    def quantile(self, q: float) -> float:
+        # оценка квантиля по верхней границе корзины
+        if self.count == 0:
+            return math.nan
+        rank = q * self.count
+        for bound, total in self.cumulative():
+            if total >= rank:
+                return bound
+        return math.inf
+
+class MetricsRegistry:
+    """
+    Набор метрик: семейства по имени, внутри — по значениям меток.
+    Методы:
+      - counter / histogram: метрика семейства с заданными метками (создается при первом обращении)
+      - to_prometheus: текстовый снимок в формате Prometheus
+      - to_dict / to_json: снимок для JSON
+      - reset: обнулить значения (сами метрики остаются, обертки продолжают в них писать)
+    """
+    def __init__(self):
+        # имя -> (тип, описание, границы, {метки: метрика})
+        self._families: Dict[str, Tuple[str, str, Optional[Tuple[float, ...]], Dict[LabelKey, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def _metric(self, kind: str, name: str, help: str, bounds: Optional[Sequence[float]], labels: Dict[str, Any]) -> Any:
+        key = tuple(sorted((k, str(v)) for k, v in labels.items()))
+        family = self._families.get(name)
+        if family is not None:
+            metric = family[3].get(key)
+            if metric is not None:
+                return metric
+        with self._lock:
+            family = self._families.get(name)
+            if family is None:
+                family = self._families[name] = (kind, help, None if bounds is None else tuple(bounds), {})
+            elif family[0] != kind:
+                raise ValueError(f"Метрика {name!r} уже объявлена как {family[0]}.")
+            metrics = family[3]
+            metric = metrics.get(key)
+            if metric is None:
+                metric = metrics[key] = Counter() if kind == "counter" else Histogram(family[2])
+            return metric
+
+    def counter(self, name: str, help: str = "", **labels: Any) -> Counter:
+        return self._metric("counter", name, help, None, labels)
+
+    def histogram(self, name: str, help: str = "", buckets: Sequence[float] = LATENCY_BUCKETS,
+                  **labels: Any) -> Histogram:
+        return self._metric("histogram", name, help, buckets, labels)
+
+    def reset(self) -> None:
+        with self._lock:
+            for _, _, _, metrics in self._families.values():
+                for metric in metrics.values():
+                    metric.reset()
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = {}
+        for name, (kind, help, _, metrics) in sorted(self._families.items()):
+            samples = []
+            for key, metric in sorted(metrics.items()):
+                sample: Dict[str, Any] = {"labels": dict(key)}
+                if kind == "counter":
+                    sample["value"] = metric.value
+                else:
+                    sample.update(
+                        count=metric.count,
+                        sum=metric.sum,
+                        buckets=[["+Inf" if math.isinf(b) else b, n] for b, n in metric.cumulative()],
+                    )
+                samples.append(sample)
+            result[name] = {"type": kind, "help": help, "samples": samples}
+        return result
+
+    def to_json(self, indent: Optional[int] = None) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False, indent=indent)
+
+    def to_prometheus(self) -> str:
+        lines = []
+        for name, (kind, help, _, metrics) in sorted(self._families.items()):
+            if help:
+                lines.append(f"# HELP {name} {_escape_help(help)}")
+            lines.append(f"# TYPE {name} {kind}")
+            for key, metric in sorted(metrics.items()):
+                if kind == "counter":
+                    lines.append(f"{name}{_labels(key)} {_number(metric.value)}")
+                    continue
+                for bound, total in metric.cumulative():
+                    le = "+Inf" if math.isinf(bound) else _number(bound)
+                    lines.append(f"{name}_bucket{_labels(key + (('le', le),))} {total}")
+                lines.append(f"{name}_sum{_labels(key)} {_number(metric.sum)}")
+                lines.append(f"{name}_count{_labels(key)} {metric.count}")
+        return "\n".join(lines) + "\n"
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _labels(key: LabelKey) -> str:
+    if not key:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape_label(v)}"' for k, v in key) + "}"
+
+def _number(value: float) -> str:
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+class Instrumentation:
+    """
+    Подключаемая инструментовка горячих путей. Пока ничего не установлено,
+    исходные методы не тронуты и накладных расходов нет; install-методы
+    подменяют методы оберткой с замером, uninstall возвращает исходные.
+    Методы:
+      - rental_processes(*classes, steps): rent_scooter и шаги шаблонного метода
+      - approval_chain(head): Handler.handle головы цепочки, метка — кто одобрил
+      - permissions(module): отказы check_permissions/require_role (через подписку)
+      - stations(cls): add_scooter/remove_scooter станции
+    Используется и как контекстный менеджер: при выходе все снимается.
+    """
+    STEPS = ("check_availability", "create_rental", "confirm_rental")
+
+    def __init__(self, registry: Optional[MetricsRegistry] = None, clock: Callable[[], float] = time.perf_counter):
+        self.registry = registry if registry is not None else MetricsRegistry()
+        self.clock = clock
+        # функции отката в обратном порядке установки
+        self._undo: List[Callable[[], None]] = []
+
+    def __enter__(self) -> "Instrumentation":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.uninstall()
+
+    def uninstall(self) -> None:
+        while self._undo:
+            self._undo.pop()()
+
+    def _patch(self, owner: Any, name: str, wrapper: Callable[..., Any]) -> None:
+        # подмена атрибута класса или объекта с запоминанием исходного состояния
+        had_own = name in vars(owner)
+        original = vars(owner).get(name)
+        setattr(owner, name, wrapper)
+
+        def undo() -> None:
+            if had_own:
+                setattr(owner, name, original)
+            else:
+                delattr(owner, name)
+        self._undo.append(undo)
+
+    def _timed(self, fn: Callable[..., Any], histogram: Callable[[Any], Histogram],
+               errors: Callable[[Any, BaseException], Counter]) -> Callable[..., Any]:
+        # обертка метода: задержка в гистограмму, исключения — в счетчик ошибок;
+        # гистограмма по классу объекта кешируется, чтобы не разбирать метки на каждом вызове
+        clock = self.clock
+        histograms: Dict[type, Histogram] = {}
+
+        @wraps(fn)
+        def wrapper(obj, *args, **kwargs):
+            t0 = clock()
+            try:
+                return fn(obj, *args, **kwargs)
+            except BaseException as exc:
+                errors(obj, exc).inc()
+                raise
+            finally:
+                elapsed = clock() - t0
+                h = histograms.get(type(obj))
+                if h is None:
+                    h = histograms[type(obj)] = histogram(obj)
+                h.observe(elapsed)
+        return wrapper
+
+    def rental_processes(self, *classes: type, steps: bool = True) -> None:
+        # шаги оборачиваются там, где объявлены, поэтому передавайте конкретные
+        # классы процессов (и базовый — для rent_scooter); steps=False — только
+        # rent_scooter целиком, без отдельных оберток на каждый шаг
+        registry = self.registry
+        names = ("rent_scooter", *self.STEPS) if steps else ("rent_scooter",)
+        for cls in classes:
+            for name in names:
+                fn = vars(cls).get(name)
+                if fn is None or getattr(fn, "__isabstractmethod__", False):
+                    continue
+                if name == "rent_scooter":
+                    wrapper = self._timed(
+                        fn,
+                        lambda obj: registry.histogram(
+                            "rental_rent_scooter_seconds", "Длительность rent_scooter",
+                            process=type(obj).__name__),
+                        lambda obj, exc: registry.counter(
+                            "rental_rent_scooter_errors_total", "Неудачные аренды",
+                            process=type(obj).__name__, error=type(exc).__name__),
+                    )
+                else:
+                    wrapper = self._timed(
+                        fn,
+                        lambda obj, step=name: registry.histogram(
+                            "rental_step_seconds", "Длительность шагов аренды",
+                            process=type(obj).__name__, step=step),
+                        lambda obj, exc, step=name: registry.counter(
+                            "rental_step_errors_total", "Ошибки шагов аренды",
+                            process=type(obj).__name__, step=step, error=type(exc).__name__),
+                    )
+                self._patch(cls, name, wrapper)
+
+    def approval_chain(self, head: Any) -> None:
+        # оборачиваем handle только у головы: вложенные вызовы по цепочке не
+        # дублируются, а итог содержит одобрившего
+        registry, clock = self.registry, self.clock
+        handle = head.handle
+        latency = registry.histogram("approval_handle_seconds", "Длительность Handler.handle",
+                                     chain=type(head).__name__)
+        decisions: Dict[Any, Counter] = {}
+
+        @wraps(handle)
+        def wrapper(request):
+            t0 = clock()
+            result = handle(request)
+            latency.observe(clock() - t0)
+            approver = result.get("by")
+            counter = decisions.get(approver)
+            if counter is None:
+                counter = decisions[approver] = registry.counter(
+                    "approval_decisions_total", "Решения цепочки по одобрившему", approver=approver or "none")
+            counter.inc()
+            return result
+        self._patch(head, "handle", wrapper)
+
+    def permissions(self, module: Any) -> None:
+        # отказы в правах: подписка на модуль прав, успешные вызовы не затрагиваются
+        registry = self.registry
+
+        def on_denied(required: str, user: Any) -> None:
+            registry.counter("permission_denials_total", "Отказы в правах",
+                             role=required, reason="no_user" if user is None else "missing_role").inc()
+        module.add_denial_listener(on_denied)
+        self._undo.append(lambda: module.remove_denial_listener(on_denied))
+
+    def stations(self, cls: type) -> None:
+        registry = self.registry
+        for name in ("add_scooter", "remove_scooter"):
+            fn = vars(cls).get(name)
+            if fn is None:
+                continue
+            op = name.split("_")[0]
+            self._patch(cls, name, self._station_wrapper(fn, op, registry))
+
+    def _station_wrapper(self, fn: Callable[..., Any], op: str, registry: MetricsRegistry) -> Callable[..., Any]:
+        clock = self.clock
+        latency = registry.histogram("station_operation_seconds", "Длительность операций станции", op=op)
+        outcomes: Dict[str, Counter] = {}
+
+        @wraps(fn)
+        def wrapper(station, *args, **kwargs):
+            t0 = clock()
+            outcome = "ok"
+            try:
+                result = fn(station, *args, **kwargs)
+                if result is False:
+                    # remove_scooter: самоката нет на станции
+                    outcome = "not_found"
+                return result
+            except BaseException as exc:
+                outcome = type(exc).__name__
+                raise
+            finally:
+                latency.observe(clock() - t0)
+                counter = outcomes.get(outcome)
+                if counter is None:
+                    counter = outcomes[outcome] = registry.counter(
+                        "station_operations_total", "Операции станции", op=op, outcome=outcome)
+                counter.inc()
+        return wrapper
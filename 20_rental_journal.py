@@ -0,0 +1,825 @@
+from __future__ import annotations
+import json
+import os
+import struct
+import threading
+import time
+import warnings
+import zlib
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+# локальные исключения, чтобы файл был автономным
+class JournalError(OSError):
+    # журнал закрыт или запись на диск не удалась
+    pass
+
+class JournalCorruptError(JournalError):
+    # поврежденная запись не в хвосте журнала
+    pass
+
+# --- формат сегмента ---
+#
+# Формат (little-endian):
+#   заголовок: magic "SCJL", version u16, reserved u16, first_lsn u64
+#   записи: length u32, crc32 u32, lsn u64, payload (JSON в UTF-8, length байт)
+# crc32 считается по lsn и payload. Запись, недописанная при падении
+# (короткий заголовок или payload, несовпадающий crc), в хвосте последнего
+# сегмента отбрасывается при открытии журнала.
+
+JOURNAL_MAGIC = b"SCJL"
+JOURNAL_VERSION = 1
+SEGMENT_SUFFIX = ".wal"
+# длиннее — значит, поле length испорчено
+MAX_RECORD_SIZE = 1 << 24
+
+_SEGMENT_HEADER = struct.Struct("<4sHHQ")
+_RECORD_HEADER = struct.Struct("<IIQ")
+_LSN = struct.Struct("<Q")
+
+# события жизненного цикла аренды
+EVENT_CREATED = "created"
+EVENT_CONFIRMED = "confirmed"
+EVENT_COST_APPROVED = "cost_approved"
+EVENT_RENTAL_CLOSED = "rental_closed"
+# события станций и самокатов (rental_id у них пустой)
+EVENT_STATION_ADDED = "station_added"
+EVENT_SCOOTER_ADDED = "scooter_added"
+EVENT_SCOOTER_REMOVED = "scooter_removed"
+EVENT_AVAILABILITY_CHANGED = "availability_changed"
+
+@dataclass(slots=True)
+class RentalEvent:
+    """
+    Событие аренды из журнала.
+    Поля:
+      - lsn: порядковый номер записи (с 1, без пропусков)
+      - kind: одно из EVENT_* (created, confirmed, cost_approved, ...)
+      - rental_id: идентификатор аренды (пустой у событий станций)
+      - data: поля события
+      - ts: время записи (unix, с)
+    """
+    lsn: int
+    kind: str
+    rental_id: str
+    data: Dict[str, Any] = field(default_factory=dict)
+    ts: float = 0.0
+
+def _payload(kind: str, rental_id: str, data: Dict[str, Any], ts: float) -> bytes:
+    return json.dumps(
+        {"kind": kind, "rental_id": rental_id, "data": data, "ts": ts},
+        ensure_ascii=False, separators=(",", ":"),
+    ).encode("utf-8")
+
+def _record(lsn: int, payload: bytes) -> bytes:
+    crc = zlib.crc32(payload, zlib.crc32(_LSN.pack(lsn)))
+    return _RECORD_HEADER.pack(len(payload), crc, lsn) + payload
+
+def _next_record(buf: bytes, pos: int) -> Optional[Tuple[int, bytes, int]]:
+    # (lsn, payload, конец записи) или None, если с pos нет целой записи
+    start = pos + _RECORD_HEADER.size
+    if start > len(buf):
+        return None
+    length, crc, lsn = _RECORD_HEADER.unpack_from(buf, pos)
+    end = start + length
+    if length > MAX_RECORD_SIZE or end > len(buf):
+        return None
+    payload = buf[start:end]
+    if zlib.crc32(payload, zlib.crc32(buf[pos + 8:start])) != crc:
+        return None
+    return lsn, payload, end
+
+def _decode(lsn: int, payload: bytes) -> RentalEvent:
+    item = json.loads(payload)
+    return RentalEvent(lsn, item["kind"], item["rental_id"], item["data"], item["ts"])
+
+def _read_segment(path: str) -> Tuple[Optional[int], bytes]:
+    # (first_lsn, содержимое); first_lsn None — заголовок недописан
+    with open(path, "rb") as f:
+        buf = f.read()
+    if len(buf) < _SEGMENT_HEADER.size:
+        return None, buf
+    magic, version, _, first_lsn = _SEGMENT_HEADER.unpack_from(buf)
+    if magic != JOURNAL_MAGIC:
+        raise JournalCorruptError(f"{path}: это не сегмент журнала аренд.")
+    if version != JOURNAL_VERSION:
+        raise JournalCorruptError(f"{path}: неподдерживаемая версия журнала: {version}.")
+    return first_lsn, buf
+
+def _fsync_dir(directory: str) -> None:
+    # новый файл переживает падение только после fsync каталога
+    if os.name == "nt":
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def list_segments(directory: str) -> List[Tuple[int, str]]:
+    # сегменты журнала (first_lsn, путь) по возрастанию
+    result = []
+    for name in os.listdir(directory):
+        stem, suffix = os.path.splitext(name)
+        if suffix == SEGMENT_SUFFIX and stem.isdigit():
+            result.append((int(stem), os.path.join(directory, name)))
+    result.sort()
+    return result
+
+def iter_journal(directory: str, from_lsn: int = 1, to_lsn: Optional[int] = None) -> Iterator[RentalEvent]:
+    """
+    События журнала с номерами from_lsn..to_lsn по порядку.
+    Недописанный хвост последнего сегмента пропускается, поврежденная
+    запись в середине журнала — JournalCorruptError.
+    """
+    segments = list_segments(directory)
+    # первый нужный сегмент — последний, начинающийся не позже from_lsn
+    start = 0
+    for i, (first_lsn, _) in enumerate(segments):
+        if first_lsn <= from_lsn:
+            start = i
+    for i in range(start, len(segments)):
+        path = segments[i][1]
+        is_last = i == len(segments) - 1
+        first_lsn, buf = _read_segment(path)
+        if first_lsn is None:
+            if is_last:
+                return
+            raise JournalCorruptError(f"{path}: недописанный заголовок сегмента.")
+        pos = _SEGMENT_HEADER.size
+        while True:
+            item = _next_record(buf, pos)
+            if item is None:
+                break
+            lsn, payload, pos = item
+            if to_lsn is not None and lsn > to_lsn:
+                return
+            if lsn >= from_lsn:
+                yield _decode(lsn, payload)
+        if pos != len(buf) and not is_last:
+            raise JournalCorruptError(f"{path}: поврежденная запись со смещения {pos}.")
+
+class RentalJournal:
+    """
+    Журнал событий аренды только на дозапись, с групповой фиксацией.
+    append кладет запись в буфер; фоновый поток пишет пачку одним write
+    и одним fsync. Если кто-то ждет записи (append(sync=True), wait, flush),
+    пачка пишется сразу: пока идет fsync, новые записи копятся и уходят
+    следующей пачкой, так что конкурентные аренды делят один fsync, а
+    одиночная аренда не ждет лишнего. Записи без ожидания (sync=False)
+    копятся не дольше flush_interval секунд или до max_batch записей.
+    Журнал — каталог сегментов <first_lsn>.wal; новый сегмент начинается,
+    когда текущий больше segment_size байт. При открытии недописанный
+    хвост последнего сегмента обрезается (recovered_bytes — сколько байт).
+    Методы:
+      - append: запись события, возвращает lsn; sync=False — без ожидания fsync
+      - wait(lsn) / flush: дождаться записи на диск
+      - replay(from_lsn): события по порядку (только уже записанные)
+      - compact(upto_lsn): удалить сегменты, целиком вошедшие в контрольную точку
+      - close (или with ... as journal)
+    """
+    def __init__(self, directory: str, flush_interval: float = 0.002, max_batch: int = 512,
+                 segment_size: int = 64 << 20, fsync: bool = True):
+        if flush_interval < 0:
+            raise ValueError("flush_interval должен быть >= 0.")
+        if max_batch <= 0:
+            raise ValueError("max_batch должен быть > 0.")
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.segment_size = segment_size
+        self.fsync = fsync
+        # число групповых фиксаций (write + fsync)
+        self.commits = 0
+        self.recovered_bytes = 0
+
+        self._lock = threading.Lock()
+        # писатель ждет записей, append(sync=True) — fsync своей записи
+        self._wake = threading.Condition(self._lock)
+        self._durable = threading.Condition(self._lock)
+        self._pending: List[bytes] = []
+        self._batch_started = 0.0
+        self._flush_now = False
+        # сколько потоков ждут fsync: писатель не откладывает их пачку
+        self._waiters = 0
+        self._closed = False
+        self._error: Optional[BaseException] = None
+
+        os.makedirs(directory, exist_ok=True)
+        last_lsn = self._recover()
+        self._next_lsn = last_lsn + 1
+        self._durable_lsn = last_lsn
+        self._writer = threading.Thread(target=self._run, name="rental-journal", daemon=True)
+        self._writer.start()
+
+    def __enter__(self) -> "RentalJournal":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    @property
+    def last_lsn(self) -> int:
+        # последний выданный номер (возможно, еще не на диске)
+        return self._next_lsn - 1
+
+    @property
+    def durable_lsn(self) -> int:
+        # последний номер, записанный на диск
+        return self._durable_lsn
+
+    # --- восстановление ---
+
+    def _recover(self) -> int:
+        # читаем только последний сегмент: первые номера остальных — в именах файлов
+        segments = list_segments(self.directory)
+        if not segments:
+            self._file = self._open_segment(1)
+            return 0
+        name_lsn, path = segments[-1]
+        first_lsn, buf = _read_segment(path)
+        if first_lsn is None:
+            # сегмент создан, но заголовок не успел записаться
+            self.recovered_bytes = len(buf)
+            os.remove(path)
+            self._file = self._open_segment(name_lsn)
+            return name_lsn - 1
+        last_lsn = first_lsn - 1
+        pos = _SEGMENT_HEADER.size
+        while True:
+            item = _next_record(buf, pos)
+            if item is None:
+                break
+            last_lsn, _, pos = item
+        if pos != len(buf):
+            self.recovered_bytes = len(buf) - pos
+            with open(path, "r+b") as f:
+                f.truncate(pos)
+                os.fsync(f.fileno())
+        self._file = open(path, "ab")
+        return last_lsn
+
+    def _open_segment(self, first_lsn: int):
+        path = os.path.join(self.directory, f"{first_lsn:020d}{SEGMENT_SUFFIX}")
+        f = open(path, "xb")
+        f.write(_SEGMENT_HEADER.pack(JOURNAL_MAGIC, JOURNAL_VERSION, 0, first_lsn))
+        f.flush()
+        if self.fsync:
+            os.fsync(f.fileno())
+            _fsync_dir(self.directory)
+        return f
+
+    # --- запись ---
+
+    def append(self, kind: str, rental_id: str, data: Optional[Dict[str, Any]] = None, sync: bool = True) -> int:
+        # кодируем вне блокировки; под ней — только номер и crc
+        payload = _payload(kind, rental_id, data or {}, time.time())
+        with self._lock:
+            if self._closed:
+                raise JournalError("Журнал закрыт.")
+            if self._error is not None:
+                raise JournalError("Журнал недоступен после ошибки записи.") from self._error
+            lsn = self._next_lsn
+            self._next_lsn = lsn + 1
+            pending = self._pending
+            pending.append(_record(lsn, payload))
+            if len(pending) == 1:
+                self._batch_started = time.monotonic()
+                self._wake.notify()
+            elif len(pending) >= self.max_batch:
+                self._wake.notify()
+            if not sync:
+                return lsn
+            self._wait(lsn)
+        return lsn
+
+    def wait(self, lsn: int) -> None:
+        with self._lock:
+            self._wait(lsn)
+
+    def _wait(self, lsn: int) -> None:
+        # вызывается под self._lock
+        if self._durable_lsn >= lsn:
+            return
+        self._waiters += 1
+        self._wake.notify()
+        try:
+            while self._durable_lsn < lsn:
+                if self._error is not None:
+                    raise JournalError("Запись журнала не удалась.") from self._error
+                self._durable.wait()
+        finally:
+            self._waiters -= 1
+
+    def flush(self) -> None:
+        # записать буфер сейчас, не дожидаясь flush_interval
+        with self._lock:
+            target = self._next_lsn - 1
+            if self._durable_lsn < target:
+                self._flush_now = True
+                self._wake.notify()
+                self._wait(target)
+
+    def close(self) -> None:
+        # дописываем буфер и останавливаем писателя
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._wake.notify()
+        self._writer.join()
+        self._file.close()
+        if self._error is not None:
+            raise JournalError("Журнал закрыт с ошибкой записи.") from self._error
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                while not self._pending and not self._closed:
+                    self._wake.wait()
+                if not self._pending:
+                    return
+                # без ожидающих добираем пачку до max_batch или до конца интервала;
+                # если кто-то ждет — пишем сразу, пачку соберет время fsync
+                deadline = self._batch_started + self.flush_interval
+                while len(self._pending) < self.max_batch and not (self._closed or self._flush_now or self._waiters):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._wake.wait(remaining)
+                batch, self._pending = self._pending, []
+                self._flush_now = False
+                last_lsn = self._next_lsn - 1
+            try:
+                self._write(batch, last_lsn)
+            except BaseException as exc:
+                with self._lock:
+                    self._error = exc
+                    self._durable.notify_all()
+                return
+            with self._lock:
+                self._durable_lsn = last_lsn
+                self.commits += 1
+                self._durable.notify_all()
+
+    def _write(self, batch: List[bytes], last_lsn: int) -> None:
+        f = self._file
+        f.write(b"".join(batch))
+        f.flush()
+        if self.fsync:
+            os.fsync(f.fileno())
+        if f.tell() >= self.segment_size:
+            f.close()
+            self._file = self._open_segment(last_lsn + 1)
+
+    # --- чтение ---
+
+    def replay(self, from_lsn: int = 1) -> Iterator[RentalEvent]:
+        # записи дальше durable_lsn (еще в буфере или дописываются) не читаем
+        return iter_journal(self.directory, from_lsn, self._durable_lsn)
+
+    def compact(self, upto_lsn: int) -> int:
+        # сегмент удаляется, если следующий начинается не позже upto_lsn + 1;
+        # текущий (последний) сегмент не удаляется никогда
+        segments = list_segments(self.directory)
+        removed = 0
+        for (_, path), (next_lsn, _) in zip(segments, segments[1:]):
+            if next_lsn - 1 > upto_lsn:
+                break
+            os.remove(path)
+            removed += 1
+        if removed and self.fsync:
+            _fsync_dir(self.directory)
+        return removed
+
+# --- подключение к процессам аренды и цепочке одобрения ---
+
+def record_rentals(process: Any, journal: RentalJournal) -> Any:
+    """
+    Журналирование шагов RentalProcess (09_template_method) у экземпляра.
+    created пишется без ожидания, confirmed — с ожиданием fsync; номера
+    идут по порядку, поэтому после rent_scooter на диске обе записи.
+    """
+    create, confirm = process.create_rental, process.confirm_rental
+
+    def create_rental(scooter_id: str, customer_id: str, hours: float) -> Dict[str, Any]:
+        rental = create(scooter_id, customer_id, hours)
+        data = {k: v for k, v in rental.items() if k not in ("rental_id", "status")}
+        journal.append(EVENT_CREATED, rental["rental_id"], data, sync=False)
+        return rental
+
+    def confirm_rental(rental: Dict[str, Any]) -> None:
+        confirm(rental)
+        journal.append(EVENT_CONFIRMED, rental["rental_id"])
+
+    process.create_rental = create_rental
+    process.confirm_rental = confirm_rental
+    return process
+
+def record_approvals(head: Any, journal: RentalJournal) -> Any:
+    # одобренные изменения стоимости из цепочки (08_chain_of_responsibility);
+    # подключаем к голове цепочки, чтобы запрос записывался один раз
+    handle = head.handle
+
+    def journaled(request: Any) -> Dict[str, Any]:
+        result = handle(request)
+        if result.get("approved"):
+            journal.append(EVENT_COST_APPROVED, request.rental_id, {
+                "cost_delta": request.cost_delta,
+                "severity": request.severity,
+                "by": result["by"],
+            })
+        return result
+
+    head.handle = journaled
+    return head
+
+# --- состояние домена и контрольные точки ---
+
+class DomainState:
+    """
+    Состояние домена в виде простых данных, восстанавливаемое из журнала.
+    Поля:
+      - stations: station_id -> {"capacity", "location"}
+      - scooters: scooter_id -> запись самоката (to_dict из 12_serialization)
+      - placement: scooter_id -> station_id самоката на станции
+      - rentals: rental_id -> открытая аренда
+      - lsn: последнее примененное событие
+    Записи не меняются на месте, а заменяются новыми, поэтому снимок для
+    контрольной точки — поверхностные копии словарей (snapshot).
+    """
+    def __init__(self) -> None:
+        self.stations: Dict[str, Dict[str, Any]] = {}
+        self.scooters: Dict[str, Dict[str, Any]] = {}
+        self.placement: Dict[str, str] = {}
+        self.rentals: Dict[str, Dict[str, Any]] = {}
+        self.lsn = 0
+        # самокаты станции (для проверки вместимости); не сохраняется
+        self._members: Dict[str, Set[str]] = {}
+
+    def check(self, kind: str, rental_id: str, data: Dict[str, Any]) -> None:
+        # проверки события без изменения состояния (ValueError, если нельзя применить)
+        if kind not in self._HANDLERS:
+            raise ValueError(f"Неизвестное событие: {kind!r}")
+        checker = self._CHECKS.get(kind)
+        if checker is not None:
+            checker(self, rental_id, data)
+
+    def apply(self, kind: str, rental_id: str, data: Dict[str, Any], lsn: int) -> None:
+        # проверки выполняются до изменений: событие применяется целиком или никак
+        self.check(kind, rental_id, data)
+        self._HANDLERS[kind](self, rental_id, data)
+        self.lsn = lsn
+
+    def apply_event(self, event: RentalEvent) -> None:
+        self.apply(event.kind, event.rental_id, event.data, event.lsn)
+
+    def _check_station_added(self, rental_id: str, data: Dict[str, Any]) -> None:
+        if data["station_id"] in self.stations:
+            raise ValueError(f"Станция {data['station_id']!r} уже есть.")
+
+    def _check_scooter_added(self, rental_id: str, data: Dict[str, Any]) -> None:
+        station_id = data["station_id"]
+        scooter_id = data["scooter"]["scooter_id"]
+        members = self._members.get(station_id)
+        if members is None:
+            raise ValueError(f"Станция {station_id!r} не найдена.")
+        if scooter_id in self.placement:
+            raise ValueError(f"Самокат {scooter_id!r} уже на станции.")
+        if len(members) >= self.stations[station_id]["capacity"]:
+            raise ValueError("Станция переполнена.")
+
+    def _check_availability_changed(self, rental_id: str, data: Dict[str, Any]) -> None:
+        if data["scooter_id"] not in self.scooters:
+            raise ValueError(f"Самокат {data['scooter_id']!r} не найден.")
+
+    def _station_added(self, rental_id: str, data: Dict[str, Any]) -> None:
+        station_id = data["station_id"]
+        self.stations[station_id] = {"capacity": data["capacity"], "location": data.get("location")}
+        self._members[station_id] = set()
+
+    def _scooter_added(self, rental_id: str, data: Dict[str, Any]) -> None:
+        # самокат ставится на станцию (новый или ранее снятый)
+        station_id = data["station_id"]
+        record = data["scooter"]
+        scooter_id = record["scooter_id"]
+        self.scooters[scooter_id] = record
+        self.placement[scooter_id] = station_id
+        self._members[station_id].add(scooter_id)
+
+    def _scooter_removed(self, rental_id: str, data: Dict[str, Any]) -> None:
+        # самокат снят со станции, запись самоката остается
+        station_id = self.placement.pop(data["scooter_id"], None)
+        if station_id is not None:
+            self._members[station_id].discard(data["scooter_id"])
+
+    def _availability_changed(self, rental_id: str, data: Dict[str, Any]) -> None:
+        record = self.scooters[data["scooter_id"]]
+        self.scooters[data["scooter_id"]] = {**record, "is_available": data["is_available"]}
+
+    def _created(self, rental_id: str, data: Dict[str, Any]) -> None:
+        self.rentals[rental_id] = {**data, "rental_id": rental_id, "status": "created"}
+
+    def _confirmed(self, rental_id: str, data: Dict[str, Any]) -> None:
+        rental = self.rentals.get(rental_id)
+        if rental is not None:
+            self.rentals[rental_id] = {**rental, "status": "confirmed"}
+
+    def _cost_approved(self, rental_id: str, data: Dict[str, Any]) -> None:
+        # изменения по закрытым и чужим арендам в состояние не попадают
+        rental = self.rentals.get(rental_id)
+        if rental is not None:
+            delta = rental.get("cost_delta", 0.0) + data["cost_delta"]
+            self.rentals[rental_id] = {**rental, "cost_delta": delta}
+
+    def _rental_closed(self, rental_id: str, data: Dict[str, Any]) -> None:
+        self.rentals.pop(rental_id, None)
+
+    _HANDLERS: Dict[str, Callable[["DomainState", str, Dict[str, Any]], None]] = {
+        EVENT_STATION_ADDED: _station_added,
+        EVENT_SCOOTER_ADDED: _scooter_added,
+        EVENT_SCOOTER_REMOVED: _scooter_removed,
+        EVENT_AVAILABILITY_CHANGED: _availability_changed,
+        EVENT_CREATED: _created,
+        EVENT_CONFIRMED: _confirmed,
+        EVENT_COST_APPROVED: _cost_approved,
+        EVENT_RENTAL_CLOSED: _rental_closed,
+    }
+    # проверки событий, которые могут не примениться
+    _CHECKS: Dict[str, Callable[["DomainState", str, Dict[str, Any]], None]] = {
+        EVENT_STATION_ADDED: _check_station_added,
+        EVENT_SCOOTER_ADDED: _check_scooter_added,
+        EVENT_AVAILABILITY_CHANGED: _check_availability_changed,
+    }
+
+    def snapshot(self) -> Dict[str, Any]:
+        # копируются только ссылки на записи — O(n) без сериализации
+        return {
+            "lsn": self.lsn,
+            "stations": dict(self.stations),
+            "scooters": dict(self.scooters),
+            "placement": dict(self.placement),
+            "rentals": dict(self.rentals),
+        }
+
+    @classmethod
+    def from_snapshot(cls, snap: Dict[str, Any]) -> "DomainState":
+        state = cls()
+        state.lsn = snap["lsn"]
+        state.stations = snap["stations"]
+        state.scooters = snap["scooters"]
+        state.placement = snap["placement"]
+        state.rentals = snap["rentals"]
+        state._members = {station_id: set() for station_id in state.stations}
+        for scooter_id, station_id in state.placement.items():
+            state._members[station_id].add(scooter_id)
+        return state
+
+# Формат контрольной точки (little-endian):
+#   заголовок: magic "SCCP", version u16, reserved u16, lsn u64, size u64, crc32 u32
+#   тело: снимок DomainState в JSON (UTF-8, size байт), crc32 — по телу
+# Файл пишется во временный и переименовывается, поэтому недописанной
+# контрольной точки под именем <lsn>.ckpt не бывает.
+
+CHECKPOINT_MAGIC = b"SCCP"
+CHECKPOINT_VERSION = 1
+CHECKPOINT_SUFFIX = ".ckpt"
+
+_CHECKPOINT_HEADER = struct.Struct("<4sHHQQI")
+
+def list_checkpoints(directory: str) -> List[Tuple[int, str]]:
+    # контрольные точки (lsn, путь) по возрастанию
+    result = []
+    for name in os.listdir(directory):
+        stem, suffix = os.path.splitext(name)
+        if suffix == CHECKPOINT_SUFFIX and stem.isdigit():
+            result.append((int(stem), os.path.join(directory, name)))
+    result.sort()
+    return result
+
+# записей на кусок JSON при записи контрольной точки: между кусками
+# фоновый поток отпускает GIL и не задерживает обработку запросов
+_CHECKPOINT_CHUNK = 2000
+
+def _checkpoint_chunks(snap: Dict[str, Any]) -> Iterator[bytes]:
+    # тот же JSON, что json.dumps(snap), но кусками
+    yield b'{"lsn":%d' % snap["lsn"]
+    for name in ("stations", "scooters", "placement", "rentals"):
+        yield b',"%s":{' % name.encode("ascii")
+        items = list(snap[name].items())
+        for i in range(0, len(items), _CHECKPOINT_CHUNK):
+            part = json.dumps(dict(items[i:i + _CHECKPOINT_CHUNK]), ensure_ascii=False, separators=(",", ":"))
+            yield (b"," if i else b"") + part[1:-1].encode("utf-8")
+        yield b"}"
+    yield b"}"
+
+def write_checkpoint(directory: str, snap: Dict[str, Any], fsync: bool = True) -> str:
+    # заголовок (размер и crc) дописывается после тела
+    path = os.path.join(directory, f"{snap['lsn']:020d}{CHECKPOINT_SUFFIX}")
+    tmp = path + ".tmp"
+    size = crc = 0
+    with open(tmp, "wb") as f:
+        f.write(b"\0" * _CHECKPOINT_HEADER.size)
+        for chunk in _checkpoint_chunks(snap):
+            f.write(chunk)
+            size += len(chunk)
+            crc = zlib.crc32(chunk, crc)
+        f.seek(0)
+        f.write(_CHECKPOINT_HEADER.pack(CHECKPOINT_MAGIC, CHECKPOINT_VERSION, 0, snap["lsn"], size, crc))
+        f.flush()
+        if fsync:
+            os.fsync(f.fileno())
+    os.replace(tmp, path)
+    if fsync:
+        _fsync_dir(directory)
+    return path
+
+def read_checkpoint(path: str) -> Dict[str, Any]:
+    with open(path, "rb") as f:
+        buf = f.read()
+    if len(buf) < _CHECKPOINT_HEADER.size:
+        raise JournalCorruptError(f"{path}: файл слишком короткий для контрольной точки.")
+    magic, version, _, lsn, size, crc = _CHECKPOINT_HEADER.unpack_from(buf)
+    if magic != CHECKPOINT_MAGIC:
+        raise JournalCorruptError(f"{path}: это не контрольная точка.")
+    if version != CHECKPOINT_VERSION:
+        raise JournalCorruptError(f"{path}: неподдерживаемая версия контрольной точки: {version}.")
+    body = buf[_CHECKPOINT_HEADER.size:]
+    if len(body) != size or zlib.crc32(body) != crc:
+        raise JournalCorruptError(f"{path}: контрольная сумма не совпадает.")
+    snap = json.loads(body)
+    if snap["lsn"] != lsn:
+        raise JournalCorruptError(f"{path}: номер в заголовке не совпадает с телом.")
+    return snap
+
+class RecoverableStore:
+    """
+    Состояние домена с журналом и фоновыми контрольными точками.
+    Каталог: journal/ — сегменты журнала, checkpoints/ — контрольные точки.
+    При открытии состояние читается из последней целой контрольной точки
+    (поврежденная пропускается с предупреждением) и дополняется событиями
+    журнала после нее — время восстановления зависит от числа событий с
+    последней точки, а не от длины всей истории.
+    Контрольная точка делается в фоне каждые checkpoint_every событий
+    и/или checkpoint_interval секунд: под блокировкой снимаются только
+    ссылки (DomainState.snapshot), сериализация и запись — вне ее.
+    Хранится keep_checkpoints последних точек; сегменты журнала, целиком
+    вошедшие в самую старую из них, удаляются.
+    append имеет ту же сигнатуру, что RentalJournal.append, поэтому
+    хранилище можно передать в record_rentals / record_approvals.
+    Методы:
+      - append: проверить и применить событие, записать в журнал
+      - add_station / add_scooter / remove_scooter / set_available / close_rental
+      - checkpoint: контрольная точка сейчас (возвращает ее lsn)
+      - close(checkpoint=True)
+    """
+    def __init__(self, directory: str, checkpoint_every: Optional[int] = 100_000,
+                 checkpoint_interval: Optional[float] = None, keep_checkpoints: int = 2,
+                 **journal_options: Any):
+        if keep_checkpoints <= 0:
+            raise ValueError("keep_checkpoints должен быть > 0.")
+        self.directory = directory
+        self.checkpoint_every = checkpoint_every
+        self.checkpoint_interval = checkpoint_interval
+        self.keep_checkpoints = keep_checkpoints
+        self._checkpoint_dir = os.path.join(directory, "checkpoints")
+        os.makedirs(self._checkpoint_dir, exist_ok=True)
+        self.journal = RentalJournal(os.path.join(directory, "journal"), **journal_options)
+        # событий применено при открытии (после контрольной точки)
+        self.replayed = 0
+        self.state = self._recover()
+
+        # _lock — порядок применения совпадает с порядком lsn
+        self._lock = threading.Lock()
+        self._checkpoint_lock = threading.Lock()
+        self._since_checkpoint = 0
+        self._due = threading.Event()
+        self._stopped = False
+        self._checkpointer = None
+        if checkpoint_every or checkpoint_interval:
+            self._checkpointer = threading.Thread(target=self._run, name="rental-checkpoint", daemon=True)
+            self._checkpointer.start()
+
+    def __enter__(self) -> "RecoverableStore":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def _recover(self) -> DomainState:
+        state = DomainState()
+        for lsn, path in reversed(list_checkpoints(self._checkpoint_dir)):
+            try:
+                state = DomainState.from_snapshot(read_checkpoint(path))
+                break
+            except JournalCorruptError as exc:
+                warnings.warn(str(exc), stacklevel=3)
+        if self.journal.last_lsn < state.lsn:
+            raise JournalCorruptError(f"Журнал короче контрольной точки ({state.lsn}).")
+        segments = list_segments(self.journal.directory)
+        if segments[0][0] > state.lsn + 1:
+            raise JournalCorruptError(
+                f"В журнале нет событий {state.lsn + 1}..{segments[0][0] - 1} после контрольной точки."
+            )
+        for event in self.journal.replay(state.lsn + 1):
+            state.apply_event(event)
+            self.replayed += 1
+        return state
+
+    # --- запись событий ---
+
+    def append(self, kind: str, rental_id: str = "", data: Optional[Dict[str, Any]] = None, sync: bool = True) -> int:
+        # событие, не прошедшее проверки состояния, в журнал не попадает;
+        # в состояние — только после успешной записи в журнал (иначе
+        # контрольная точка сохранила бы событие, которого нет в журнале);
+        # fsync ждем вне блокировки, чтобы конкурентные записи делили его
+        data = data or {}
+        with self._lock:
+            self.state.check(kind, rental_id, data)
+            lsn = self.journal.append(kind, rental_id, data, sync=False)
+            self.state.apply(kind, rental_id, data, lsn)
+            self._since_checkpoint += 1
+            if self.checkpoint_every and self._since_checkpoint >= self.checkpoint_every:
+                self._since_checkpoint = 0
+                self._due.set()
+        if sync:
+            self.journal.wait(lsn)
+        return lsn
+
+    def add_station(self, station_id: str, capacity: int, location: Optional[Dict[str, Any]] = None) -> int:
+        return self.append(EVENT_STATION_ADDED, "", {"station_id": station_id, "capacity": capacity, "location": location})
+
+    def add_scooter(self, station_id: str, scooter: Any) -> int:
+        # scooter — объект с to_dict или готовая запись
+        record = scooter.to_dict() if hasattr(scooter, "to_dict") else dict(scooter)
+        return self.append(EVENT_SCOOTER_ADDED, "", {"station_id": station_id, "scooter": record})
+
+    def remove_scooter(self, scooter_id: str) -> int:
+        return self.append(EVENT_SCOOTER_REMOVED, "", {"scooter_id": scooter_id})
+
+    def set_available(self, scooter_id: str, is_available: bool) -> int:
+        return self.append(EVENT_AVAILABILITY_CHANGED, "", {"scooter_id": scooter_id, "is_available": is_available})
+
+    def close_rental(self, rental_id: str) -> int:
+        return self.append(EVENT_RENTAL_CLOSED, rental_id)
+
+    # --- контрольные точки ---
+
+    def checkpoint(self) -> int:
+        with self._checkpoint_lock:
+            with self._lock:
+                snap = self.state.snapshot()
+            lsn = snap["lsn"]
+            checkpoints = list_checkpoints(self._checkpoint_dir)
+            if checkpoints and checkpoints[-1][0] == lsn:
+                return lsn
+            # точка не должна опережать журнал: иначе после падения номера
+            # событий из нее были бы выданы повторно
+            self.journal.wait(lsn)
+            write_checkpoint(self._checkpoint_dir, snap, self.journal.fsync)
+            checkpoints = list_checkpoints(self._checkpoint_dir)
+            for _, path in checkpoints[:-self.keep_checkpoints]:
+                os.remove(path)
+            kept = checkpoints[-self.keep_checkpoints:]
+            self.journal.compact(kept[0][0])
+            return lsn
+
+    def _run(self) -> None:
+        while True:
+            self._due.wait(self.checkpoint_interval)
+            self._due.clear()
+            if self._stopped:
+                return
+            try:
+                self.checkpoint()
+            except Exception as exc:
+                # следующая попытка — по следующему сигналу
+                warnings.warn(f"Контрольная точка не записана: {exc}", stacklevel=2)
+
+    def close(self, checkpoint: bool = True) -> None:
+        # с контрольной точкой следующее открытие не читает журнал
+        if self._checkpointer is not None:
+            self._stopped = True
+            self._due.set()
+            self._checkpointer.join()
+            self._checkpointer = None
+        try:
+            if checkpoint:
+                self.checkpoint()
+        finally:
+            self.journal.close()
+
+def restore_stations(state: DomainState, station_cls: Any, location_cls: Any,
+                     scooter_from_dict: Callable[[Dict[str, Any]], Any], indexed: bool = False) -> Dict[str, Any]:
+    # объекты RentalStation (03_domain_station) с самокатами из состояния
+    stations = {
+        station_id: station_cls(
+            station_id, info["capacity"],
+            location_cls.from_dict(info["location"] or {}),
+            indexed=indexed,
+        )
+        for station_id, info in state.stations.items()
+    }
+    for scooter_id, station_id in state.placement.items():
+        stations[station_id].add_scooter(scooter_from_dict(state.scooters[scooter_id]))
+    return stations
@@ -0,0 +1,527 @@
+from __future__ import annotations
+import heapq
+import math
+import multiprocessing as mp
+import numbers
+import os
+import struct
+import threading
+import zlib
+from array import array
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# локальные исключения, чтобы файл был автономным
+class InvalidScooterError(ValueError):
+    # ошибка некорректных данных самоката или станции
+    pass
+
+class ShardError(RuntimeError):
+    # непредвиденная ошибка в процессе шарда
+    pass
+
+# --- протокол ---
+#
+# Сообщение: код операции u8 и поля подряд; ответ: статус u8 и поля.
+# Поля (порядок байтов — родной, обе стороны на одной машине):
+#   число: struct (u32 / i32 / f64)
+#   строки: count u32, size u32, UTF-8 строк через "\0"
+#   колонка: size u32, байты array
+# Списки передаются колонками, поэтому пакет из миллиона самокатов — это
+# несколько join/tobytes, а не граф объектов pickle.
+
+_U32 = struct.Struct("=I")
+_I32 = struct.Struct("=i")
+_F64 = struct.Struct("=d")
+_STRINGS = struct.Struct("=II")
+
+OP_ADD_STATIONS = 1
+OP_ADD_SCOOTERS = 2
+OP_REMOVE_SCOOTER = 3
+OP_SET_AVAILABLE = 4
+OP_AVAILABLE_COUNT = 5
+OP_STATS = 6
+OP_CITY_COUNTS = 7
+OP_REBALANCE = 8
+OP_TOP_AVAILABLE = 9
+OP_SHUTDOWN = 10
+
+_MAX_U32 = (1 << 32) - 1
+
+_OK = 0
+_INVALID = 1
+_MISSING = 2
+_FAILED = 3
+
+def _pack_strings(values: Sequence[str]) -> bytes:
+    raw = "\0".join(values).encode("utf-8")
+    return _STRINGS.pack(len(values), len(raw)) + raw
+
+def _unpack_strings(buf: memoryview, pos: int) -> Tuple[List[str], int]:
+    count, size = _STRINGS.unpack_from(buf, pos)
+    pos += _STRINGS.size
+    values = str(buf[pos:pos + size], "utf-8").split("\0") if count else []
+    return values, pos + size
+
+def _pack_array(values: array) -> bytes:
+    raw = values.tobytes()
+    return _U32.pack(len(raw)) + raw
+
+def _unpack_array(code: str, buf: memoryview, pos: int) -> Tuple[array, int]:
+    (size,) = _U32.unpack_from(buf, pos)
+    pos += _U32.size
+    values = array(code)
+    values.frombytes(buf[pos:pos + size])
+    return values, pos + size
+
+def _pack_string(value: str) -> bytes:
+    return _pack_strings([value])
+
+def _unpack_string(buf: memoryview, pos: int) -> Tuple[str, int]:
+    values, pos = _unpack_strings(buf, pos)
+    return values[0], pos
+
+# --- состояние шарда (в процессе воркера) ---
+
+class _Station:
+    # станция шарда: самокаты как scooter_id -> [доступен, заряд]
+    __slots__ = ("station_id", "city", "capacity", "scooters", "available")
+
+    def __init__(self, station_id: str, city: str, capacity: int):
+        self.station_id = station_id
+        self.city = city
+        self.capacity = capacity
+        self.scooters: Dict[str, List[int]] = {}
+        self.available = 0
+
+class _Shard:
+    def __init__(self) -> None:
+        self.stations: Dict[str, _Station] = {}
+
+    def station(self, station_id: str) -> _Station:
+        station = self.stations.get(station_id)
+        if station is None:
+            raise KeyError(f"Станция {station_id!r} не найдена.")
+        return station
+
+def _op_add_stations(shard: _Shard, buf: memoryview, pos: int) -> bytes:
+    ids, pos = _unpack_strings(buf, pos)
+    cities, pos = _unpack_strings(buf, pos)
+    capacities, pos = _unpack_array("I", buf, pos)
+    errors = array("I")
+    messages = []
+    for i, (station_id, city, capacity) in enumerate(zip(ids, cities, capacities)):
+        if station_id in shard.stations:
+            errors.append(i)
+            messages.append(f"Станция {station_id!r} уже есть.")
+            continue
+        shard.stations[station_id] = _Station(station_id, city, capacity)
+    return _pack_array(errors) + _pack_strings(messages)
+
+def _op_add_scooters(shard: _Shard, buf: memoryview, pos: int) -> bytes:
+    # валидные строки добавляются, ошибки возвращаются с номерами строк пакета
+    station_ids, pos = _unpack_strings(buf, pos)
+    scooter_ids, pos = _unpack_strings(buf, pos)
+    flags, pos = _unpack_array("B", buf, pos)
+    battery, pos = _unpack_array("B", buf, pos)
+    stations = shard.stations
+    errors = array("I")
+    messages = []
+    for i, station_id in enumerate(station_ids):
+        station = stations.get(station_id)
+        sid = scooter_ids[i]
+        if station is None:
+            message = f"Станция {station_id!r} не найдена."
+        elif sid in station.scooters:
+            message = f"Самокат {sid!r} уже на станции."
+        elif len(station.scooters) >= station.capacity:
+            message = "Станция переполнена."
+        else:
+            station.scooters[sid] = [flags[i], battery[i]]
+            station.available += flags[i]
+            continue
+        errors.append(i)
+        messages.append(message)
+    return _pack_array(errors) + _pack_strings(messages)
+
+def _op_remove_scooter(shard: _Shard, buf: memoryview, pos: int) -> bytes:
+    station_id, pos = _unpack_string(buf, pos)
+    scooter_id, pos = _unpack_string(buf, pos)
+    station = shard.station(station_id)
+    entry = station.scooters.pop(scooter_id, None)
+    if entry is None:
+        return bytes((0,))
+    station.available -= entry[0]
+    return bytes((1,))
+
+def _op_set_available(shard: _Shard, buf: memoryview, pos: int) -> bytes:
+    station_id, pos = _unpack_string(buf, pos)
+    scooter_id, pos = _unpack_string(buf, pos)
+    value = buf[pos]
+    station = shard.station(station_id)
+    entry = station.scooters.get(scooter_id)
+    if entry is None:
+        return bytes((0,))
+    station.available += value - entry[0]
+    entry[0] = value
+    return bytes((1,))
+
+def _op_available_count(shard: _Shard, buf: memoryview, pos: int) -> bytes:
+    station_id, _ = _unpack_string(buf, pos)
+    return _U32.pack(shard.station(station_id).available)
+
+def _op_stats(shard: _Shard, buf: memoryview, pos: int) -> bytes:
+    scooters = sum(len(s.scooters) for s in shard.stations.values())
+    available = sum(s.available for s in shard.stations.values())
+    return _U32.pack(len(shard.stations)) + _U32.pack(scooters) + _U32.pack(available)
+
+def _op_city_counts(shard: _Shard, buf: memoryview, pos: int) -> bytes:
+    # по городам: всего самокатов и доступных с зарядом >= min_battery
+    min_battery = buf[pos]
+    totals: Dict[str, List[int]] = {}
+    for station in shard.stations.values():
+        counts = totals.get(station.city)
+        if counts is None:
+            totals[station.city] = counts = [0, 0]
+        counts[0] += len(station.scooters)
+        counts[1] += sum(1 for available, battery in station.scooters.values() if available and battery >= min_battery)
+    cities = list(totals)
+    return (_pack_strings(cities)
+            + _pack_array(array("I", (totals[c][0] for c in cities)))
+            + _pack_array(array("I", (totals[c][1] for c in cities))))
+
+def _op_rebalance(shard: _Shard, buf: memoryview, pos: int) -> bytes:
+    # станции вне [low, high] по заполненности и сколько самокатов
+    # привезти (> 0) или забрать (< 0)
+    (low,) = _F64.unpack_from(buf, pos)
+    (high,) = _F64.unpack_from(buf, pos + _F64.size)
+    ids: List[str] = []
+    deltas = array("i")
+    for station in shard.stations.values():
+        count = len(station.scooters)
+        if station.capacity <= 0:
+            continue
+        utilization = count / station.capacity
+        if utilization < low:
+            ids.append(station.station_id)
+            deltas.append(math.ceil(low * station.capacity) - count)
+        elif utilization > high:
+            ids.append(station.station_id)
+            deltas.append(math.floor(high * station.capacity) - count)
+    return _pack_strings(ids) + _pack_array(deltas)
+
+def _op_top_available(shard: _Shard, buf: memoryview, pos: int) -> bytes:
+    (k,) = _U32.unpack_from(buf, pos)
+    # при равенстве — по station_id, чтобы результат не зависел от порядка вставки
+    top = heapq.nsmallest(k, shard.stations.values(), key=lambda s: (-s.available, s.station_id))
+    return _pack_strings([s.station_id for s in top]) + _pack_array(array("I", (s.available for s in top)))
+
+_HANDLERS: Dict[int, Callable[[_Shard, memoryview, int], bytes]] = {
+    OP_ADD_STATIONS: _op_add_stations,
+    OP_ADD_SCOOTERS: _op_add_scooters,
+    OP_REMOVE_SCOOTER: _op_remove_scooter,
+    OP_SET_AVAILABLE: _op_set_available,
+    OP_AVAILABLE_COUNT: _op_available_count,
+    OP_STATS: _op_stats,
+    OP_CITY_COUNTS: _op_city_counts,
+    OP_REBALANCE: _op_rebalance,
+    OP_TOP_AVAILABLE: _op_top_available,
+}
+
+def _serve(conn: Any) -> None:
+    # цикл воркера: сообщение -> обработчик -> ответ
+    shard = _Shard()
+    while True:
+        try:
+            message = conn.recv_bytes()
+        except EOFError:
+            return
+        op = message[0]
+        if op == OP_SHUTDOWN:
+            conn.send_bytes(bytes((_OK,)))
+            return
+        try:
+            reply = bytes((_OK,)) + _HANDLERS[op](shard, memoryview(message), 1)
+        except InvalidScooterError as exc:
+            reply = bytes((_INVALID,)) + _pack_string(str(exc))
+        except KeyError as exc:
+            reply = bytes((_MISSING,)) + _pack_string(exc.args[0] if exc.args else "")
+        except Exception as exc:
+            reply = bytes((_FAILED,)) + _pack_string(f"{type(exc).__name__}: {exc}")
+        conn.send_bytes(reply)
+
+# --- маршрутизатор ---
+
+def _stable_hash(key: str) -> int:
+    # hash() строк случаен в каждом процессе, crc32 — нет
+    return zlib.crc32(key.encode("utf-8"))
+
+class ShardedFleetEngine:
+    """
+    Станции и самокаты, распределенные по процессам-шардам.
+    Станция принадлежит шарду по городу (partition="city") или по хешу
+    station_id (partition="station"); операции со станцией уходят в ее
+    шард, запросы по всему парку рассылаются всем шардам одновременно,
+    и результаты объединяются здесь.
+    Обмен — компактный двоичный протокол по каналам (см. OP_*), без pickle.
+    Шард хранит у самоката только доступность и заряд — этого достаточно
+    для запросов ниже; сами объекты Scooter остаются у вызывающего кода.
+    Методы:
+      - add_station / add_station_rows (пакетом) / add_stations (объекты RentalStation с самокатами)
+      - add_scooter / add_scooters (пакетом: ошибки — список (номер, текст))
+      - remove_scooter / set_available / available_count
+      - stats / city_counts / rebalance_plan / top_available: по всему парку
+      - close (или with ... as engine)
+    Вызовы из нескольких потоков выполняются по очереди.
+    """
+    def __init__(self, workers: Optional[int] = None, partition: str = "city",
+                 start_method: Optional[str] = None):
+        if partition not in ("city", "station"):
+            raise ValueError("partition должен быть 'city' или 'station'.")
+        workers = workers or os.cpu_count() or 1
+        if start_method is None:
+            # fork не требует импорта модуля в дочернем процессе
+            start_method = "fork" if "fork" in mp.get_all_start_methods() else "spawn"
+        ctx = mp.get_context(start_method)
+        self.partition = partition
+        self._lock = threading.Lock()
+        self._station_shard: Dict[str, int] = {}
+        self._conns = []
+        self._processes = []
+        try:
+            for i in range(workers):
+                parent, child = ctx.Pipe()
+                process = ctx.Process(target=_serve, args=(child,), name=f"fleet-shard-{i}", daemon=True)
+                process.start()
+                child.close()
+                self._conns.append(parent)
+                self._processes.append(process)
+        except BaseException:
+            self.close()
+            raise
+
+    def __enter__(self) -> "ShardedFleetEngine":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    @property
+    def workers(self) -> int:
+        return len(self._conns)
+
+    def shard_for(self, station_id: str, city: str) -> int:
+        key = city if self.partition == "city" else station_id
+        return _stable_hash(key) % len(self._conns)
+
+    def shard_of(self, station_id: str) -> int:
+        shard = self._station_shard.get(station_id)
+        if shard is None:
+            raise KeyError(f"Станция {station_id!r} не найдена.")
+        return shard
+
+    # --- обмен с шардами ---
+
+    def _check(self, reply: bytes) -> memoryview:
+        status = reply[0]
+        view = memoryview(reply)
+        if status == _OK:
+            return view
+        message, _ = _unpack_string(view, 1)
+        if status == _INVALID:
+            raise InvalidScooterError(message)
+        if status == _MISSING:
+            raise KeyError(message)
+        raise ShardError(message)
+
+    def _call(self, shard: int, message: bytes) -> memoryview:
+        with self._lock:
+            conn = self._conns[shard]
+            conn.send_bytes(message)
+            return self._check(conn.recv_bytes())
+
+    def _scatter(self, messages: Dict[int, bytes]) -> Dict[int, memoryview]:
+        # сначала отправляем всем, потом собираем: шарды считают параллельно
+        with self._lock:
+            for shard, message in messages.items():
+                self._conns[shard].send_bytes(message)
+            replies = {shard: self._conns[shard].recv_bytes() for shard in messages}
+        return {shard: self._check(reply) for shard, reply in replies.items()}
+
+    def _broadcast(self, message: bytes) -> List[memoryview]:
+        return list(self._scatter(dict.fromkeys(range(len(self._conns)), message)).values())
+
+    # --- станции и самокаты ---
+
+    def add_station(self, station_id: str, capacity: int, city: str) -> None:
+        errors = self.add_station_rows([(station_id, capacity, city)])
+        if errors:
+            raise InvalidScooterError(errors[0][1])
+
+    def add_station_rows(self, rows: Sequence[Tuple[str, int, str]]) -> List[Tuple[int, str]]:
+        # строки (station_id, capacity, city); ошибки — (номер строки, текст)
+        # повтор station_id в пакете отклоняется до отправки: при разбиении
+        # по городу копии ушли бы в разные шарды
+        groups: Dict[int, List[int]] = {}
+        errors: List[Tuple[int, str]] = []
+        seen = set()
+        for i, (station_id, capacity, city) in enumerate(rows):
+            if not isinstance(capacity, numbers.Integral) or not 0 <= capacity <= _MAX_U32:
+                errors.append((i, f"Вместимость станции {station_id!r} должна быть целым числом 0..{_MAX_U32}."))
+            elif station_id in self._station_shard:
+                errors.append((i, f"Станция {station_id!r} уже есть."))
+            elif station_id in seen:
+                errors.append((i, f"Станция {station_id!r} повторяется в пакете."))
+            else:
+                seen.add(station_id)
+                groups.setdefault(self.shard_for(station_id, city), []).append(i)
+        messages = {
+            shard: bytes((OP_ADD_STATIONS,))
+            + _pack_strings([rows[i][0] for i in idx])
+            + _pack_strings([rows[i][2] for i in idx])
+            + _pack_array(array("I", (int(rows[i][1]) for i in idx)))
+            for shard, idx in groups.items()
+        }
+        for shard, reply in self._scatter(messages).items():
+            failed, messages_list = self._errors(reply)
+            failed_rows = {groups[shard][j] for j in failed}
+            errors.extend((groups[shard][j], text) for j, text in zip(failed, messages_list))
+            for i in groups[shard]:
+                if i not in failed_rows:
+                    self._station_shard[rows[i][0]] = shard
+        errors.sort()
+        return errors
+
+    def _errors(self, reply: memoryview) -> Tuple[array, List[str]]:
+        failed, pos = _unpack_array("I", reply, 1)
+        messages, _ = _unpack_strings(reply, pos)
+        return failed, messages
+
+    def add_stations(self, stations: Iterable[Any]) -> List[Tuple[int, str]]:
+        """
+        Перенос объектов RentalStation (03_domain_station) вместе с самокатами.
+        Возвращает ошибки самокатов (номер в общем списке самокатов, текст).
+        """
+        stations = list(stations)
+        station_errors = self.add_station_rows(
+            [(s.station_id, s.capacity, s.location_info.city) for s in stations]
+        )
+        if station_errors:
+            raise InvalidScooterError(station_errors[0][1])
+        return self.add_scooters(
+            (station.station_id, scooter.scooter_id, getattr(scooter, "is_available", True),
+             getattr(scooter, "battery_level", 100))
+            for station in stations for scooter in station.scooters
+        )
+
+    def add_scooter(self, station_id: str, scooter_id: str, is_available: bool = True, battery_level: int = 100) -> None:
+        errors = self.add_scooters([(station_id, scooter_id, is_available, battery_level)])
+        if errors:
+            raise InvalidScooterError(errors[0][1])
+
+    def add_scooters(self, rows: Iterable[Tuple[str, str, bool, int]]) -> List[Tuple[int, str]]:
+        # строки (station_id, scooter_id, is_available, battery_level) одним сообщением на шард
+        # дробный заряд округляется вниз: для целого порога min_battery
+        # сравнение с ним дает тот же результат
+        groups: Dict[int, List[Tuple[int, Tuple[str, str, bool, int]]]] = {}
+        errors: List[Tuple[int, str]] = []
+        station_shard = self._station_shard
+        for i, row in enumerate(rows):
+            shard = station_shard.get(row[0])
+            battery = row[3]
+            if shard is None:
+                errors.append((i, f"Станция {row[0]!r} не найдена."))
+            elif not isinstance(battery, numbers.Real) or not 0 <= battery <= 100:
+                errors.append((i, "Уровень заряда должен быть 0..100."))
+            else:
+                if not isinstance(battery, numbers.Integral):
+                    row = (row[0], row[1], row[2], math.floor(battery))
+                groups.setdefault(shard, []).append((i, row))
+        messages = {
+            shard: bytes((OP_ADD_SCOOTERS,))
+            + _pack_strings([row[0] for _, row in items])
+            + _pack_strings([row[1] for _, row in items])
+            + _pack_array(array("B", (1 if row[2] else 0 for _, row in items)))
+            + _pack_array(array("B", (int(row[3]) for _, row in items)))
+            for shard, items in groups.items()
+        }
+        for shard, reply in self._scatter(messages).items():
+            failed, texts = self._errors(reply)
+            errors.extend((groups[shard][j][0], text) for j, text in zip(failed, texts))
+        errors.sort()
+        return errors
+
+    def remove_scooter(self, station_id: str, scooter_id: str) -> bool:
+        reply = self._call(self.shard_of(station_id),
+                           bytes((OP_REMOVE_SCOOTER,)) + _pack_string(station_id) + _pack_string(scooter_id))
+        return bool(reply[1])
+
+    def set_available(self, station_id: str, scooter_id: str, is_available: bool) -> bool:
+        reply = self._call(self.shard_of(station_id),
+                           bytes((OP_SET_AVAILABLE,)) + _pack_string(station_id) + _pack_string(scooter_id)
+                           + bytes((1 if is_available else 0,)))
+        return bool(reply[1])
+
+    def available_count(self, station_id: str) -> int:
+        reply = self._call(self.shard_of(station_id), bytes((OP_AVAILABLE_COUNT,)) + _pack_string(station_id))
+        return _U32.unpack_from(reply, 1)[0]
+
+    # --- запросы по всему парку ---
+
+    def stats(self) -> Dict[str, int]:
+        result = {"stations": 0, "scooters": 0, "available": 0}
+        for reply in self._broadcast(bytes((OP_STATS,))):
+            stations, scooters, available = struct.unpack_from("=III", reply, 1)
+            result["stations"] += stations
+            result["scooters"] += scooters
+            result["available"] += available
+        return result
+
+    def city_counts(self, min_battery: int = 0) -> Dict[str, Dict[str, int]]:
+        # при разбиении по городу город целиком в одном шарде, по station_id — суммируем
+        if not 0 <= min_battery <= 100:
+            raise ValueError("min_battery должен быть в диапазоне 0..100.")
+        result: Dict[str, Dict[str, int]] = {}
+        for reply in self._broadcast(bytes((OP_CITY_COUNTS, min_battery))):
+            cities, pos = _unpack_strings(reply, 1)
+            totals, pos = _unpack_array("I", reply, pos)
+            available, _ = _unpack_array("I", reply, pos)
+            for city, total, free in zip(cities, totals, available):
+                counts = result.setdefault(city, {"total": 0, "available": 0})
+                counts["total"] += total
+                counts["available"] += free
+        return result
+
+    def rebalance_plan(self, low: float = 0.3, high: float = 0.8) -> List[Tuple[str, int]]:
+        # (station_id, сколько привезти > 0 / забрать < 0); самые нуждающиеся первыми
+        plan: List[Tuple[str, int]] = []
+        for reply in self._broadcast(bytes((OP_REBALANCE,)) + _F64.pack(low) + _F64.pack(high)):
+            ids, pos = _unpack_strings(reply, 1)
+            deltas, _ = _unpack_array("i", reply, pos)
+            plan.extend(zip(ids, deltas))
+        plan.sort(key=lambda item: (-item[1], item[0]))
+        return plan
+
+    def top_available(self, k: int = 10) -> List[Tuple[str, int]]:
+        # k станций с наибольшим числом доступных: top-k каждого шарда и слияние
+        candidates: List[Tuple[str, int]] = []
+        for reply in self._broadcast(bytes((OP_TOP_AVAILABLE,)) + _U32.pack(k)):
+            ids, pos = _unpack_strings(reply, 1)
+            counts, _ = _unpack_array("I", reply, pos)
+            candidates.extend(zip(ids, counts))
+        # тот же ключ, что в шардах: (-доступных, station_id)
+        return heapq.nsmallest(k, candidates, key=lambda item: (-item[1], item[0]))
+
+    def close(self) -> None:
+        conns, self._conns = self._conns, []
+        for conn in conns:
+            try:
+                conn.send_bytes(bytes((OP_SHUTDOWN,)))
+                conn.recv_bytes()
+            except (OSError, EOFError):
+                pass
+            conn.close()
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
@@ -0,0 +1,366 @@
+from __future__ import annotations
+import math
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy нужен только для быстрого перебора больших карт
+    np = None
+
+# битовая карта — целое Python: бит k относится к самокату в слоте k;
+# пересечение условий — &, объединение — |, размер — bit_count()
+
+# биты перебираются кусками: bin() короткого куска, пустые области пропускаются
+_CHUNK_BITS = 4096
+_CHUNK_MASK = (1 << _CHUNK_BITS) - 1
+
+def _bits(mask: int, limit: Optional[int] = None) -> List[int]:
+    # номера установленных битов по возрастанию (не больше limit)
+    if np is not None and limit is None and mask.bit_length() > _CHUNK_BITS:
+        raw = np.frombuffer(mask.to_bytes((mask.bit_length() + 7) // 8, "little"), dtype=np.uint8)
+        return np.flatnonzero(np.unpackbits(raw, bitorder="little")).tolist()
+    result: List[int] = []
+    base = 0
+    while mask:
+        chunk = mask & _CHUNK_MASK
+        if not chunk:
+            # к куску с младшим установленным битом
+            skip = ((mask & -mask).bit_length() - 1) // _CHUNK_BITS * _CHUNK_BITS
+            mask >>= skip
+            base += skip
+            continue
+        digits = bin(chunk)[:1:-1]
+        k = digits.find("1")
+        while k != -1:
+            result.append(base + k)
+            if limit is not None and len(result) >= limit:
+                return result
+            k = digits.find("1", k + 1)
+        mask >>= _CHUNK_BITS
+        base += _CHUNK_BITS
+    return result
+
+def _from_slots(slots: List[int]) -> int:
+    # битовая карта из списка номеров без n операций над большим целым
+    if not slots:
+        return 0
+    raw = bytearray(max(slots) // 8 + 1)
+    for slot in slots:
+        raw[slot >> 3] |= 1 << (slot & 7)
+    return int.from_bytes(raw, "little")
+
+def default_type_of(scooter: Any) -> str:
+    # TYPE (12_serialization), ключ реестра (06_scooter_meta) или имя класса
+    return getattr(scooter, "TYPE", None) or getattr(scooter, "REGISTRY_KEY", None) or type(scooter).__name__.lower()
+
+class _BitSliced:
+    """
+    Битово-срезанный индекс целых значений >= 0: карта planes[i] — самокаты,
+    у которых установлен бит i значения. Сравнение со значением — проход
+    по битам от старшего, по две-три операции над картами на бит.
+    """
+    def __init__(self, bits: int = 0):
+        self.planes: List[int] = [0] * bits
+
+    def set(self, bit: int, old: int, new: int) -> None:
+        # меняются только карты отличающихся битов
+        if new.bit_length() > len(self.planes):
+            self.planes.extend([0] * (new.bit_length() - len(self.planes)))
+        diff = old ^ new
+        i = 0
+        while diff:
+            if diff & 1:
+                self.planes[i] = self.planes[i] | bit if (new >> i) & 1 else self.planes[i] & ~bit
+            diff >>= 1
+            i += 1
+
+    def clear(self, bit: int, old: int) -> None:
+        self.set(bit, old, 0)
+
+    def compare(self, mask: int, value: int) -> Tuple[int, int]:
+        # (значение < value, значение == value) в пределах mask;
+        # x & ~plane записано как x ^ (x & plane): стоимость по размеру x
+        if value < 0:
+            return 0, 0
+        if value.bit_length() > len(self.planes):
+            return mask, 0
+        less, equal = 0, mask
+        for i in range(len(self.planes) - 1, -1, -1):
+            plane = self.planes[i]
+            common = equal & plane
+            if (value >> i) & 1:
+                less |= equal ^ common
+                equal = common
+            else:
+                equal ^= common
+            if not equal:
+                break
+        return less, equal
+
+class AvailabilityIndex:
+    """
+    Индекс доступности самокатов по всему парку на битовых картах.
+    Карты: по типу, доступности, станции и городу; заряд и ставка —
+    битово-срезанные индексы (ставка в единицах 1/rate_scale, по умолчанию
+    копейки), поэтому диапазон стоит O(число бит), а не O(число значений).
+    Запрос пересекает карты условий; точно сравниваются только самокаты,
+    у которых ставка совпала с границей в единицах rate_scale.
+    Обновление — инкрементальное:
+      - станции (03_domain_station) подключаются через attach_station:
+        на их add_listener сверяется состав станции (O(размер станции));
+      - самокаты с add_listener (01_scooter, 12_serialization) сообщают
+        об изменении свойств сами, для остальных после изменения нужно
+        вызвать refresh.
+    Самокат, снятый со всех станций, из индекса удаляется.
+    Методы:
+      - attach_station / detach_station
+      - add_scooter / remove_scooter / refresh: ручное управление
+      - query: самокаты по условиям (type, min_battery, max_rate, available,
+        station_id или city, limit)
+      - count: число подходящих без создания списка
+    """
+    def __init__(self, rate_scale: int = 100, type_of: Optional[Callable[[Any], str]] = None):
+        if rate_scale <= 0:
+            raise ValueError("rate_scale должен быть > 0.")
+        self.rate_scale = rate_scale
+        self._type_of = type_of or default_type_of
+        # слоты: scooter_id -> слот, слот -> объект и текущие значения полей
+        self._slot_of: Dict[str, int] = {}
+        self._objects: List[Any] = []
+        self._free: List[int] = []
+        self._types: List[Optional[str]] = []
+        self._battery: List[int] = []
+        self._rates: List[float] = []
+        self._rate_units: List[int] = []
+        self._placement: List[Optional[str]] = []
+        # битовые карты
+        self._live = 0
+        self._available = 0
+        self._by_type: Dict[str, int] = {}
+        self._battery_index = _BitSliced(7)
+        self._rate_index = _BitSliced()
+        self._by_station: Dict[str, int] = {}
+        self._by_city: Dict[str, int] = {}
+        # станции: город и известный индексу состав
+        self._station_city: Dict[str, Optional[str]] = {}
+        self._members: Dict[str, Set[str]] = {}
+        self._stations: Dict[str, Any] = {}
+
+    def __len__(self) -> int:
+        return len(self._slot_of)
+
+    def __contains__(self, scooter_id: object) -> bool:
+        return scooter_id in self._slot_of
+
+    # --- станции ---
+
+    def attach_station(self, station: Any) -> None:
+        station_id = station.station_id
+        if station_id in self._stations:
+            return
+        location = getattr(station, "location_info", None)
+        self._stations[station_id] = station
+        self._station_city[station_id] = getattr(location, "city", None)
+        self._members.setdefault(station_id, set())
+        self._sync_station(station)
+        station.add_listener(self._on_station_changed)
+
+    def detach_station(self, station: Any) -> None:
+        # самокаты станции уходят из индекса вместе с ней
+        station_id = station.station_id
+        if self._stations.pop(station_id, None) is None:
+            return
+        station.remove_listener(self._on_station_changed)
+        for scooter_id in list(self._members.get(station_id, ())):
+            self._leave(scooter_id, station_id)
+        self._members.pop(station_id, None)
+        self._station_city.pop(station_id, None)
+
+    def _on_station_changed(self, station: Any) -> None:
+        self._sync_station(station)
+
+    def _sync_station(self, station: Any) -> None:
+        # сверяем состав станции с известным индексу
+        station_id = station.station_id
+        current = {s.scooter_id: s for s in station.scooters}
+        known = self._members[station_id]
+        for scooter_id in [sid for sid in known if sid not in current]:
+            self._leave(scooter_id, station_id)
+        for scooter_id, scooter in current.items():
+            if scooter_id not in known:
+                self.add_scooter(scooter, station_id)
+
+    def _leave(self, scooter_id: str, station_id: str) -> None:
+        self._members[station_id].discard(scooter_id)
+        slot = self._slot_of.get(scooter_id)
+        # самокат мог уже переехать на другую станцию
+        if slot is not None and self._placement[slot] == station_id:
+            self.remove_scooter(scooter_id)
+
+    # --- самокаты ---
+
+    def add_scooter(self, scooter: Any, station_id: Optional[str] = None) -> None:
+        # уже известный самокат переносится на station_id
+        scooter_id = scooter.scooter_id
+        slot = self._slot_of.get(scooter_id)
+        if slot is not None:
+            self._place(slot, station_id)
+            return
+        if self._free:
+            slot = self._free.pop()
+        else:
+            slot = len(self._objects)
+            self._objects.append(None)
+            self._types.append(None)
+            self._battery.append(0)
+            self._rates.append(0.0)
+            self._rate_units.append(0)
+            self._placement.append(None)
+        self._slot_of[scooter_id] = slot
+        self._objects[slot] = scooter
+        self._placement[slot] = None
+        bit = 1 << slot
+        self._live |= bit
+        kind = self._type_of(scooter)
+        self._types[slot] = kind
+        self._by_type[kind] = self._by_type.get(kind, 0) | bit
+        self._battery[slot] = self._rate_units[slot] = 0
+        self._set_battery(slot, scooter.battery_level, bit)
+        self._set_rate(slot, scooter.hourly_rate, bit)
+        if scooter.is_available:
+            self._available |= bit
+        self._place(slot, station_id)
+        add_listener = getattr(scooter, "add_listener", None)
+        if add_listener is not None:
+            add_listener(self._on_scooter_changed)
+
+    def remove_scooter(self, scooter_id: str) -> bool:
+        slot = self._slot_of.pop(scooter_id, None)
+        if slot is None:
+            return False
+        scooter = self._objects[slot]
+        remove_listener = getattr(scooter, "remove_listener", None)
+        if remove_listener is not None:
+            remove_listener(self._on_scooter_changed)
+        bit = 1 << slot
+        clear = ~bit
+        self._place(slot, None)
+        self._live &= clear
+        self._available &= clear
+        kind = self._types[slot]
+        self._by_type[kind] &= clear
+        self._battery_index.clear(bit, self._battery[slot])
+        self._rate_index.clear(bit, self._rate_units[slot])
+        self._objects[slot] = None
+        self._free.append(slot)
+        return True
+
+    def refresh(self, scooter_id: str) -> None:
+        # перечитать поля самоката без add_listener
+        slot = self._slot_of[scooter_id]
+        scooter = self._objects[slot]
+        for name in ("battery_level", "hourly_rate", "is_available"):
+            self._update(slot, name, getattr(scooter, name))
+
+    def _on_scooter_changed(self, scooter: Any, name: str, old: Any, new: Any) -> None:
+        slot = self._slot_of.get(scooter.scooter_id)
+        if slot is not None:
+            self._update(slot, name, new)
+
+    def _update(self, slot: int, name: str, value: Any) -> None:
+        bit = 1 << slot
+        if name == "battery_level":
+            self._set_battery(slot, value, bit)
+        elif name == "hourly_rate":
+            self._set_rate(slot, value, bit)
+        elif name == "is_available":
+            self._available = self._available | bit if value else self._available & ~bit
+
+    def _set_battery(self, slot: int, value: int, bit: int) -> None:
+        level = min(100, max(0, int(value)))
+        self._battery_index.set(bit, self._battery[slot], level)
+        self._battery[slot] = level
+
+    def _set_rate(self, slot: int, value: float, bit: int) -> None:
+        # единицы округляются вниз: точная проверка нужна только при равенстве
+        units = max(0, math.floor(value * self.rate_scale))
+        self._rate_index.set(bit, self._rate_units[slot], units)
+        self._rate_units[slot] = units
+        self._rates[slot] = value
+
+    def _place(self, slot: int, station_id: Optional[str]) -> None:
+        old = self._placement[slot]
+        if old == station_id:
+            return
+        bit = 1 << slot
+        if old is not None:
+            self._by_station[old] &= ~bit
+            city = self._station_city.get(old)
+            if city is not None:
+                self._by_city[city] &= ~bit
+            members = self._members.get(old)
+            if members is not None:
+                members.discard(self._objects[slot].scooter_id)
+        self._placement[slot] = station_id
+        if station_id is not None:
+            self._by_station[station_id] = self._by_station.get(station_id, 0) | bit
+            city = self._station_city.get(station_id)
+            if city is not None:
+                self._by_city[city] = self._by_city.get(city, 0) | bit
+            self._members.setdefault(station_id, set()).add(self._objects[slot].scooter_id)
+
+    # --- запросы ---
+
+    def _match(self, scooter_type: Optional[str], min_battery: Optional[int], max_rate: Optional[float],
+               available: Optional[bool], station_id: Optional[str], city: Optional[str],
+               prefix: Optional[int] = None) -> int:
+        # сначала узкие условия (область, тип), затем диапазоны; prefix
+        # ограничивает младшими слотами, и все операции стоят O(prefix)
+        mask = self._live if prefix is None else self._live & prefix
+        if station_id is not None:
+            mask &= self._by_station.get(station_id, 0)
+        if city is not None:
+            mask &= self._by_city.get(city, 0)
+        if scooter_type is not None:
+            mask &= self._by_type.get(scooter_type, 0)
+        if available is not None:
+            common = mask & self._available
+            mask = common if available else mask ^ common
+        if min_battery is not None and mask:
+            # заряд >= min_battery — все, кроме заряда < min_battery
+            below, _ = self._battery_index.compare(mask, math.ceil(min_battery))
+            mask ^= below
+        if max_rate is not None and mask:
+            less, equal = self._rate_index.compare(mask, math.floor(max_rate * self.rate_scale))
+            if equal:
+                rates = self._rates
+                less |= _from_slots([slot for slot in _bits(equal) if rates[slot] <= max_rate])
+            mask = less
+        return mask
+
+    def query(self, scooter_type: Optional[str] = None, min_battery: Optional[int] = None,
+              max_rate: Optional[float] = None, available: Optional[bool] = True,
+              station_id: Optional[str] = None, city: Optional[str] = None,
+              limit: Optional[int] = None) -> List[Any]:
+        # None — условие не задано; по умолчанию только доступные.
+        # С limit условия проверяются на растущем префиксе слотов:
+        # первые limit подходящих находятся без прохода по всему парку
+        objects = self._objects
+        if limit is None:
+            mask = self._match(scooter_type, min_battery, max_rate, available, station_id, city)
+            return [objects[slot] for slot in _bits(mask)]
+        if limit <= 0:
+            return []
+        total = self._live.bit_length()
+        end = max(_CHUNK_BITS, limit * 64)
+        while True:
+            prefix = (1 << end) - 1 if end < total else None
+            mask = self._match(scooter_type, min_battery, max_rate, available, station_id, city, prefix)
+            if prefix is None or mask.bit_count() >= limit:
+                return [objects[slot] for slot in _bits(mask, limit)]
+            end *= 4
+
+    def count(self, scooter_type: Optional[str] = None, min_battery: Optional[int] = None,
+              max_rate: Optional[float] = None, available: Optional[bool] = True,
+              station_id: Optional[str] = None, city: Optional[str] = None) -> int:
+        return self._match(scooter_type, min_battery, max_rate, available, station_id, city).bit_count()
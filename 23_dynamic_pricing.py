@@ -0,0 +1,210 @@
+from __future__ import annotations
+import time
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+# простые исключения локально, чтобы файл был автономным
+class UnknownStationError(KeyError):
+    # станция не подключена к ценообразованию
+    pass
+
+# смещения часовых поясов кратны 15 минутам, а переходы на летнее время
+# приходятся на целые четверти часа UTC: внутри такого интервала смещение
+# постоянно, и его достаточно перечитывать раз в интервал
+_OFFSET_STEP = 900
+
+# коэффициенты времени суток по часам: ночью дешевле, в часы пик дороже
+DEFAULT_TIME_FACTORS: Tuple[float, ...] = (
+    0.9, 0.9, 0.9, 0.9, 0.9, 0.9,        # 00-06
+    1.0, 1.1, 1.25, 1.25, 1.1, 1.0,      # 06-12
+    1.0, 1.0, 1.0, 1.0, 1.1, 1.25,       # 12-18
+    1.25, 1.1, 1.0, 1.0, 0.95, 0.95,     # 18-24
+)
+
+def surge_multiplier(utilization: float, time_factor: float, low: float = 0.2, high: float = 0.8,
+                     max_surge: float = 1.5, max_discount: float = 0.1) -> float:
+    """
+    Множитель цены по заполненности и времени суток.
+    Заполненность — доля занятых мест: мало самокатов (ниже low) — спрос
+    выше предложения, наценка растет линейно до max_surge при пустой станции;
+    переполненная станция (выше high) — скидка до max_discount.
+    Результат округляется до сотых, чтобы цена не дрожала.
+    """
+    if utilization < low:
+        factor = 1.0 + (max_surge - 1.0) * (low - utilization) / low
+    elif utilization > high:
+        factor = 1.0 - max_discount * (min(utilization, 1.0) - high) / (1.0 - high)
+    else:
+        factor = 1.0
+    return round(factor * time_factor, 2)
+
+class DynamicPricing:
+    """
+    Динамические множители цены по станциям с кешированием.
+    Заполненность для множителя — смесь заполненности станции и города
+    (вес local_weight у станции): соседние станции тоже влияют на спрос.
+    Кеш:
+      - занятость станций и суммы по городам обновляются на add_listener
+        станции (03_domain_station) за O(1), без обхода города;
+      - множитель станции хранится вместе с меткой (корзина времени,
+        версия города) и пересчитывается при первом запросе после смены
+        заполненности самой станции, перехода в новую корзину времени или
+        смены заполненности города (округленной до процента — иначе каждая
+        аренда сбрасывала бы кеш всех станций города);
+      - цена — формула типа самоката (calculate_rental_cost) на множитель,
+        поэтому quote стоит O(1) при любом числе станций.
+    Время: сутки делятся на len(time_factors) корзин, clock — секунды эпохи,
+    utc_offset — сдвиг местного времени в секундах; по умолчанию — смещение
+    часового пояса системы на текущий момент (с учетом перехода на летнее
+    время), перечитывается раз в 15 минут времени clock.
+    Изменение capacity не отслеживается — после него вызывайте update.
+    Методы:
+      - attach_station / detach_station / update
+      - multiplier(station_id): текущий множитель
+      - city_utilization(city): заполненность города для множителя
+      - quote(station_id, scooter, hours): стоимость аренды с множителем
+      - recomputed: сколько раз множитель считался заново
+    """
+    def __init__(self, time_factors: Sequence[float] = DEFAULT_TIME_FACTORS, local_weight: float = 0.7,
+                 low: float = 0.2, high: float = 0.8, max_surge: float = 1.5, max_discount: float = 0.1,
+                 clock: Callable[[], float] = time.time, utc_offset: Optional[float] = None):
+        if not time_factors:
+            raise ValueError("time_factors не должен быть пустым.")
+        if not 0.0 <= local_weight <= 1.0:
+            raise ValueError("local_weight должен быть в [0, 1].")
+        if not 0.0 < low <= high < 1.0:
+            raise ValueError("Нужно 0 < low <= high < 1.")
+        self.time_factors = tuple(time_factors)
+        self.local_weight = local_weight
+        self.low, self.high = low, high
+        self.max_surge, self.max_discount = max_surge, max_discount
+        self.bucket_seconds = 86400.0 / len(self.time_factors)
+        self._clock = clock
+        self._utc_offset = utc_offset
+        # смещение системного пояса и номер 15-минутного интервала, для которого оно прочитано
+        self._local_offset = 0
+        self._offset_step: Optional[int] = None
+        # станции: объект, город, заполненность (utilization станции),
+        # последние известные занятость и вместимость
+        self._stations: Dict[str, Any] = {}
+        self._city_of: Dict[str, str] = {}
+        self._local: Dict[str, float] = {}
+        self._used: Dict[str, int] = {}
+        self._capacity: Dict[str, int] = {}
+        # суммы по городам, округленная заполненность и ее версия
+        self._city_used: Dict[str, int] = {}
+        self._city_capacity: Dict[str, int] = {}
+        self._city_level: Dict[str, float] = {}
+        self._city_version: Dict[str, int] = {}
+        # кеш: station_id -> (корзина времени, версия города, множитель)
+        self._cache: Dict[str, Tuple[int, int, float]] = {}
+        self.recomputed = 0
+
+    def __len__(self) -> int:
+        return len(self._stations)
+
+    def __contains__(self, station_id: object) -> bool:
+        return station_id in self._stations
+
+    # --- станции ---
+
+    def attach_station(self, station: Any) -> None:
+        station_id = station.station_id
+        if station_id in self._stations:
+            self.update(station)
+            return
+        location = getattr(station, "location_info", None)
+        city = getattr(location, "city", None) or ""
+        self._stations[station_id] = station
+        self._city_of[station_id] = city
+        self._local[station_id] = 0.0
+        self._used[station_id] = 0
+        self._capacity[station_id] = 0
+        self._city_used.setdefault(city, 0)
+        self._city_capacity.setdefault(city, 0)
+        self._city_level.setdefault(city, 0.0)
+        self._city_version.setdefault(city, 0)
+        self.update(station)
+        add_listener = getattr(station, "add_listener", None)
+        if add_listener is not None:
+            add_listener(self.update)
+
+    def detach_station(self, station_id: str) -> bool:
+        station = self._stations.pop(station_id, None)
+        if station is None:
+            return False
+        remove_listener = getattr(station, "remove_listener", None)
+        if remove_listener is not None:
+            remove_listener(self.update)
+        city = self._city_of.pop(station_id)
+        self._local.pop(station_id)
+        self._city_used[city] -= self._used.pop(station_id)
+        self._city_capacity[city] -= self._capacity.pop(station_id)
+        self._cache.pop(station_id, None)
+        self._refresh_city(city)
+        return True
+
+    def update(self, station: Any) -> None:
+        # изменение заполненности: поправить суммы города на разницу
+        station_id = station.station_id
+        if station_id not in self._stations:
+            return
+        used, capacity = len(station.scooters), max(0, station.capacity)
+        old_used, old_capacity = self._used[station_id], self._capacity[station_id]
+        if used == old_used and capacity == old_capacity:
+            return
+        city = self._city_of[station_id]
+        self._used[station_id], self._capacity[station_id] = used, capacity
+        self._local[station_id] = station.utilization()
+        self._city_used[city] += used - old_used
+        self._city_capacity[city] += capacity - old_capacity
+        self._cache.pop(station_id, None)
+        self._refresh_city(city)
+
+    def city_utilization(self, city: str) -> float:
+        # заполненность города, округленная до процента
+        return self._city_level[city]
+
+    def _refresh_city(self, city: str) -> None:
+        capacity = self._city_capacity[city]
+        level = round(self._city_used[city] / capacity, 2) if capacity else 0.0
+        if level != self._city_level[city]:
+            self._city_level[city] = level
+            self._city_version[city] += 1
+
+    # --- цены ---
+
+    def time_bucket(self) -> int:
+        # номер корзины времени от начала эпохи (местное время)
+        now = self._clock()
+        offset = self._utc_offset
+        if offset is None:
+            step = int(now // _OFFSET_STEP)
+            if step != self._offset_step:
+                self._local_offset = time.localtime(now).tm_gmtoff
+                self._offset_step = step
+            offset = self._local_offset
+        return int((now + offset) // self.bucket_seconds)
+
+    def multiplier(self, station_id: str) -> float:
+        city = self._city_of.get(station_id)
+        if city is None:
+            raise UnknownStationError(station_id)
+        bucket = self.time_bucket()
+        version = self._city_version[city]
+        cached = self._cache.get(station_id)
+        if cached is not None and cached[0] == bucket and cached[1] == version:
+            return cached[2]
+        value = self._compute(station_id, city, bucket)
+        self._cache[station_id] = (bucket, version, value)
+        return value
+
+    def quote(self, station_id: str, scooter: Any, hours: float) -> float:
+        # формула типа самоката, затем множитель станции
+        return round(scooter.calculate_rental_cost(hours) * self.multiplier(station_id), 2)
+
+    def _compute(self, station_id: str, city: str, bucket: int) -> float:
+        self.recomputed += 1
+        regional = self._city_level[city]
+        utilization = self.local_weight * self._local[station_id] + (1.0 - self.local_weight) * regional
+        time_factor = self.time_factors[bucket % len(self.time_factors)]
+        return surge_multiplier(utilization, time_factor, self.low, self.high, self.max_surge, self.max_discount)
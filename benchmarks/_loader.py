@@ -0,0 +1,20 @@
+from __future__ import annotations
+import importlib.util
+import sys
+from pathlib import Path
+from types import ModuleType
+
+# корень репозитория (модули заданий лежат там)
+ROOT = Path(__file__).resolve().parent.parent
+
+def load_module(name: str) -> ModuleType:
+    # имена модулей начинаются с цифры, поэтому грузим их по пути к файлу
+    key = "scooter_" + name
+    if key in sys.modules:
+        return sys.modules[key]
+    spec = importlib.util.spec_from_file_location(key, ROOT / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    # регистрируем до исполнения: нужно dataclasses и pickle
+    sys.modules[key] = module
+    spec.loader.exec_module(module)
+    return module
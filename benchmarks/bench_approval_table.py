@@ -0,0 +1,62 @@
+from __future__ import annotations
+import argparse
+import random
+import time
+
+from _loader import load_module
+
+chain_mod = load_module("08_chain_of_responsibility")
+
+def make_requests(n: int, seed: int = 1):
+    rnd = random.Random(seed)
+    return [
+        chain_mod.ChangeRequest(f"R-{i}", rnd.randint(0, 100), round(rnd.uniform(-100, 100), 2))
+        for i in range(n)
+    ]
+
+def run(n: int) -> dict:
+    requests = make_requests(n)
+    chain = chain_mod.StationOperator(chain_mod.Manager(chain_mod.Admin()))
+    table = chain_mod.DecisionTable.from_chain(chain)
+
+    t0 = time.perf_counter()
+    expected = [chain.handle(r) for r in requests]
+    chain_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    decided = [table.decide(r) for r in requests]
+    table_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    batch = table.decide_batch(requests)
+    batch_s = time.perf_counter() - t0
+
+    # векторный расчет по уже собранным массивам, без словарей ответа
+    severities = [r.severity for r in requests]
+    deltas = [r.cost_delta for r in requests]
+    t0 = time.perf_counter()
+    names = table.approver_names(severities, deltas)
+    vector_s = time.perf_counter() - t0
+
+    assert decided == expected
+    assert batch == expected
+    assert names == [d["by"] for d in expected]
+    return {
+        "requests": n,
+        "chain_s": chain_s,
+        "decide_s": table_s,
+        "decide_batch_s": batch_s,
+        "vector_s": vector_s,
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="DecisionTable против цепочки обработчиков")
+    parser.add_argument("--requests", type=int, default=200_000)
+    args = parser.parse_args()
+    r = run(args.requests)
+    print(f"{r['requests']} запросов: цепочка {r['chain_s']:.3f} с, decide {r['decide_s']:.3f} с, "
+          f"decide_batch {r['decide_batch_s']:.3f} с, approver_names {r['vector_s']:.3f} с "
+          f"(x{r['chain_s'] / r['vector_s']:.1f})")
+
+if __name__ == "__main__":
+    main()
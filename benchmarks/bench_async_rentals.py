@@ -0,0 +1,83 @@
+from __future__ import annotations
+import argparse
+import asyncio
+import time
+
+from _loader import load_module
+
+tm = load_module("09_template_method")
+
+class LocalAvailabilityStore:
+    # локальная замена хранилища доступности с задержкой ответа
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    async def is_available(self, scooter_id: str) -> bool:
+        await asyncio.sleep(self.latency)
+        return True
+
+    def is_available_blocking(self, scooter_id: str) -> bool:
+        time.sleep(self.latency)
+        return True
+
+class LocalNotifier:
+    # локальная замена сервиса уведомлений
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.sent = 0
+
+    async def send(self, rental: dict) -> None:
+        await asyncio.sleep(self.latency)
+        self.sent += 1
+
+    def send_blocking(self, rental: dict) -> None:
+        time.sleep(self.latency)
+        self.sent += 1
+
+class BlockingOnlineRentalProcess(tm.OnlineRentalProcess):
+    # синхронный процесс с теми же задержками ввода-вывода
+    def __init__(self, store: LocalAvailabilityStore, notifier: LocalNotifier):
+        self.store = store
+        self.notifier = notifier
+
+    def check_availability(self, scooter_id: str) -> None:
+        super().check_availability(scooter_id)
+        self.store.is_available_blocking(scooter_id)
+
+    def confirm_rental(self, rental: dict) -> None:
+        self.notifier.send_blocking(rental)
+        super().confirm_rental(rental)
+
+def requests(n: int):
+    return [(f"SC-{i}", f"C-{i}", 1.0) for i in range(n)]
+
+def run(n: int, latency: float, concurrency: int) -> dict:
+    store, notifier = LocalAvailabilityStore(latency), LocalNotifier(latency)
+    blocking = BlockingOnlineRentalProcess(store, notifier)
+    t0 = time.perf_counter()
+    for scooter_id, customer_id, hours in requests(n):
+        blocking.rent_scooter(scooter_id, customer_id, hours)
+    sync_s = time.perf_counter() - t0
+
+    process = tm.AsyncOnlineRentalProcess(store, notifier, default_timeout=latency * 20)
+    pipeline = tm.RentalPipeline(process, concurrency=concurrency)
+    t0 = time.perf_counter()
+    results = asyncio.run(pipeline.run(requests(n)))
+    async_s = time.perf_counter() - t0
+    failed = sum(isinstance(r, Exception) for r in results)
+    assert failed == 0, f"{failed} аренд не выполнено"
+    return {"rentals": n, "sync_rps": n / sync_s, "async_rps": n / async_s, "speedup": sync_s / async_s}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Нагрузочный тест: синхронный и асинхронный rent_scooter")
+    parser.add_argument("-n", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.005, help="задержка одного обращения к хранилищу, с")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 100])
+    args = parser.parse_args()
+    for c in args.concurrency:
+        r = run(args.n, args.latency, c)
+        print(f"concurrency={c:>4}: синхронно {r['sync_rps']:.0f} аренд/с, "
+              f"асинхронно {r['async_rps']:.0f} аренд/с (x{r['speedup']:.1f})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+from __future__ import annotations
+import argparse
+import random
+import time
+
+from _loader import load_module
+import synthetic
+
+index_mod = load_module("22_availability_index")
+
+def build(size: int, per_station: int):
+    stations = synthetic.stations(size // per_station, capacity=per_station)
+    # самокаты 12_serialization: тип (TYPE) и сеттеры с уведомлениями
+    for i, scooter in enumerate(synthetic.scooters(size)):
+        stations[i // per_station].add_scooter(scooter)
+    return stations
+
+def scan(stations, scooter_type, min_battery, max_rate, city, limit):
+    # текущий способ: get_available_scooters по каждой станции и фильтр
+    result = []
+    for station in stations:
+        if city is not None and station.location_info.city != city:
+            continue
+        for s in station.get_available_scooters():
+            if scooter_type is not None and s.TYPE != scooter_type:
+                continue
+            if min_battery is not None and s.battery_level < min_battery:
+                continue
+            if max_rate is not None and s.hourly_rate > max_rate:
+                continue
+            result.append(s)
+            if limit is not None and len(result) >= limit:
+                return result
+    return result
+
+def queries(n: int, seed: int = 8):
+    rnd = random.Random(seed)
+    return [
+        (rnd.choice([None, "city", "off_road", "foldable"]), rnd.choice([None, 20, 50, 80]),
+         rnd.choice([None, 5.5, 10, 15.25]), rnd.choice([None, None, "Moscow"]), rnd.choice([None, None, 20]))
+        for _ in range(n)
+    ]
+
+def check(index, stations, qs) -> None:
+    for kind, battery, rate, city, _ in qs:
+        expected = {s.scooter_id for s in scan(stations, kind, battery, rate, city, None)}
+        everything = index.query(kind, battery, rate, city=city)
+        assert {s.scooter_id for s in everything} == expected, (kind, battery, rate, city)
+        # с limit — те же первые самокаты, что и без него
+        assert index.query(kind, battery, rate, city=city, limit=20) == everything[:20]
+        assert index.query(kind, battery, rate, city=city, limit=0) == []
+
+def mutate(stations, changes: int, rnd: random.Random) -> None:
+    # смена свойств через сеттеры и переезды между станциями
+    for _ in range(changes):
+        station = rnd.choice(stations)
+        if not station.scooters:
+            continue
+        s = rnd.choice(station.scooters)
+        roll = rnd.random()
+        if roll < 0.3:
+            s.battery_level = rnd.randint(0, 100)
+        elif roll < 0.6:
+            s.is_available = not s.is_available
+        elif roll < 0.8:
+            s.hourly_rate = round(rnd.uniform(1, 20), 2)
+        else:
+            target = rnd.choice(stations)
+            if len(target.scooters) < target.capacity and target is not station:
+                station.remove_scooter(s.scooter_id)
+                target.add_scooter(s)
+
+def run(size: int, per_station: int, n_queries: int) -> dict:
+    stations = build(size, per_station)
+    index = index_mod.AvailabilityIndex()
+    t0 = time.perf_counter()
+    for station in stations:
+        index.attach_station(station)
+    build_s = time.perf_counter() - t0
+    qs = queries(n_queries)
+    check(index, stations, qs[:20])
+
+    scan_s = index_s = scan_top_s = index_top_s = 0.0
+    for kind, battery, rate, city, limit in qs:
+        # запросы с limit (выдача ближайших) учитываются отдельно
+        t0 = time.perf_counter()
+        scan(stations, kind, battery, rate, city, limit)
+        t1 = time.perf_counter()
+        index.query(kind, battery, rate, city=city, limit=limit)
+        t2 = time.perf_counter()
+        if limit is None:
+            scan_s += t1 - t0
+            index_s += t2 - t1
+        else:
+            scan_top_s += t1 - t0
+            index_top_s += t2 - t1
+    n_top = sum(1 for q in qs if q[4] is not None)
+    n_all = len(qs) - n_top
+
+    rnd = random.Random(9)
+    t0 = time.perf_counter()
+    mutate(stations, 5000, rnd)
+    update_s = time.perf_counter() - t0
+    check(index, stations, qs[:20])
+    return {"build_s": build_s, "scan_ms": scan_s / n_all * 1000, "index_ms": index_s / n_all * 1000,
+            "scan_top_ms": scan_top_s / n_top * 1000, "index_top_ms": index_top_s / n_top * 1000,
+            "update_us": update_s / 5000 * 1e6}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Запросы доступности: обход станций против битовых индексов")
+    parser.add_argument("--sizes", default="10k,100k")
+    parser.add_argument("--per-station", type=int, default=40)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+    from suite import parse_size
+    for size in (parse_size(s) for s in args.sizes.split(",") if s.strip()):
+        r = run(size, args.per_station, args.queries)
+        print(f"{size:>8} самокатов: все подходящие — обход {r['scan_ms']:7.2f} мс, индекс {r['index_ms']:6.2f} мс "
+              f"(x{r['scan_ms'] / r['index_ms']:.0f}); limit 20 — обход {r['scan_top_ms']:6.3f} мс, "
+              f"индекс {r['index_top_ms']:6.3f} мс (x{r['scan_top_ms'] / r['index_top_ms']:.1f}); "
+              f"построение {r['build_s']:.2f} с, изменение с обновлением индекса {r['update_us']:.1f} мкс")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+from __future__ import annotations
+import argparse
+import random
+import time
+
+from _loader import load_module
+
+ser = load_module("12_serialization")
+
+def make_records(n: int, seed: int = 1, bad_share: float = 0.0):
+    # синтетические записи в формате to_dict, часть — с ошибками
+    rnd = random.Random(seed)
+    extras = {"city": ("max_speed", 25), "off_road": ("tire_type", "mud"), "foldable": ("weight", 11.5)}
+    records = []
+    for i in range(n):
+        t = rnd.choice(list(extras))
+        d = {
+            "type": t,
+            "scooter_id": f"SC-{i}",
+            "model": f"M{i % 10}",
+            "battery_level": rnd.randint(0, 100),
+            "hourly_rate": rnd.choice([1.5, 2.0, 3.25]),
+            "is_available": rnd.random() < 0.8,
+        }
+        if rnd.random() < 0.5:
+            key, value = extras[t]
+            d[key] = value
+        if rnd.random() < bad_share:
+            d["battery_level"] = 150
+        records.append(d)
+    return records
+
+def slow_path(records):
+    # текущий путь: from_dict на каждую запись
+    result, errors = [], []
+    for i, d in enumerate(records):
+        try:
+            result.append(ser.Scooter.from_dict(d))
+        except (KeyError, TypeError, ValueError) as exc:
+            errors.append((i, exc))
+    return result, errors
+
+def run(n: int, repeat: int, bad_share: float) -> dict:
+    records = make_records(n, bad_share=bad_share)
+    ser.compile_decoder(ser.CityScooter)  # компиляция не входит в замер
+    best_slow = best_bulk = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        expected, expected_errors = slow_path(records)
+        best_slow = min(best_slow, time.perf_counter() - t0)
+        t0 = time.perf_counter()
+        got = ser.Scooter.from_dicts(records)
+        best_bulk = min(best_bulk, time.perf_counter() - t0)
+    assert [s.to_dict() for s in got.scooters] == [s.to_dict() for s in expected]
+    assert [(i, str(e)) for i, e in got.errors] == [(i, str(e)) for i, e in expected_errors]
+    return {"records": n, "from_dict_s": best_slow, "bulk_s": best_bulk, "speedup": best_slow / best_bulk}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Scooter.from_dicts против from_dict по записи")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--bad-share", type=float, default=0.01)
+    args = parser.parse_args()
+    for n in args.sizes:
+        r = run(n, args.repeat, args.bad_share)
+        print(f"{r['records']:>8} записей: from_dict {r['from_dict_s']:.3f} с, "
+              f"from_dicts {r['bulk_s']:.3f} с (x{r['speedup']:.1f})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+from __future__ import annotations
+import argparse
+import random
+import time
+
+from _loader import load_module
+
+factory = load_module("07_scooter_factory")
+ScooterFactory = factory.ScooterFactory
+
+TYPES = ["city", "off_road", "foldable"]
+EXTRA = {"city": ("max_speed", 25), "off_road": ("tire_type", "mud"), "foldable": ("weight", 11.5)}
+
+def make_rows(n: int, seed: int = 1):
+    rnd = random.Random(seed)
+    rows = []
+    for i in range(n):
+        t = rnd.choice(TYPES)
+        name, value = EXTRA[t]
+        rows.append({
+            "scooter_type": t,
+            "scooter_id": f"SC-{i}",
+            "model": rnd.choice(["X1", "X2", "Pro"]),
+            "hourly_rate": round(rnd.uniform(1, 20), 2),
+            name: value,
+        })
+    return rows
+
+def state(s) -> tuple:
+    extra = EXTRA[{"CityScooter": "city", "OffRoadScooter": "off_road", "FoldableScooter": "foldable"}[type(s).__name__]][0]
+    return type(s).__name__, s.scooter_id, s.model, s.hourly_rate, getattr(s, extra)
+
+def run(n: int) -> dict:
+    rows = make_rows(n)
+
+    t0 = time.perf_counter()
+    baseline = []
+    for row in rows:
+        kwargs = dict(row)
+        baseline.append(ScooterFactory.create_scooter(kwargs.pop("scooter_type"), **kwargs))
+    loop_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    by_rows = ScooterFactory.create_many(rows)
+    rows_s = time.perf_counter() - t0
+
+    # колонки одного типа (новый город: один тип, общая модель)
+    columns = {
+        "scooter_id": [f"SC-{i}" for i in range(n)],
+        "hourly_rate": [row["hourly_rate"] for row in rows],
+    }
+    proto = ScooterFactory.create_scooter("city", scooter_id="PROTO", model="X1", hourly_rate=1.0, max_speed=30)
+    t0 = time.perf_counter()
+    baseline_city = [
+        ScooterFactory.create_scooter("city", scooter_id=sid, model="X1", hourly_rate=rate, max_speed=30)
+        for sid, rate in zip(columns["scooter_id"], columns["hourly_rate"])
+    ]
+    city_loop_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    by_columns = ScooterFactory.create_many(columns, prototype=proto)
+    columns_s = time.perf_counter() - t0
+
+    assert not by_rows.errors and not by_columns.errors
+    assert [state(s) for s in by_rows.scooters] == [state(s) for s in baseline]
+    assert [state(s) for s in by_columns.scooters] == [state(s) for s in baseline_city]
+    return {
+        "scooters": n,
+        "create_scooter_s": loop_s,
+        "create_many_rows_s": rows_s,
+        "create_scooter_city_s": city_loop_s,
+        "create_many_columns_s": columns_s,
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="create_many против create_scooter в цикле")
+    parser.add_argument("--scooters", type=int, default=100_000)
+    args = parser.parse_args()
+    r = run(args.scooters)
+    print(f"{r['scooters']} самокатов, строки: create_scooter {r['create_scooter_s']:.3f} с, "
+          f"create_many {r['create_many_rows_s']:.3f} с (x{r['create_scooter_s'] / r['create_many_rows_s']:.1f})")
+    print(f"колонки + прототип: create_scooter {r['create_scooter_city_s']:.3f} с, "
+          f"create_many {r['create_many_columns_s']:.3f} с (x{r['create_scooter_city_s'] / r['create_many_columns_s']:.1f})")
+
+if __name__ == "__main__":
+    main()
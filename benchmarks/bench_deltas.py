@@ -0,0 +1,62 @@
+from __future__ import annotations
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from _loader import load_module
+import synthetic
+
+scooter_mod = load_module("01_scooter")
+serialization = load_module("12_serialization")
+
+def mutate(scooters, changes: int, rnd: random.Random) -> None:
+    for s in rnd.sample(scooters, changes):
+        if rnd.random() < 0.5:
+            s.battery_level = rnd.randint(0, 100)
+        else:
+            s.is_available = not s.is_available
+
+def run(size: int, changes: int, rounds: int, seed: int = 5) -> dict:
+    rnd = random.Random(seed)
+    directory = tempfile.mkdtemp(prefix="scooter_deltas_")
+    try:
+        store = serialization.FleetDeltaStore(os.path.join(directory, "fleet"), max_deltas=8)
+        store.save_base(synthetic.scooters(size))
+        # рабочий цикл: загрузка из хранилища, изменения через сеттеры, дельты
+        scooters = store.load()
+        tracker = scooter_mod.DirtyTracker(scooters)
+        full_path = os.path.join(directory, "full.json")
+        full = delta = 0.0
+        for _ in range(rounds):
+            mutate(scooters, changes, rnd)
+            t0 = time.perf_counter()
+            serialization.save_scooters_to_json(scooters, full_path)
+            full += time.perf_counter() - t0
+            t0 = time.perf_counter()
+            store.save_delta(tracker)
+            delta += time.perf_counter() - t0
+        loaded = {s.scooter_id: s.to_dict() for s in store.load()}
+        expected = {s.scooter_id: s.to_dict() for s in scooters}
+        assert loaded == expected, "база с дельтами не совпадает с парком"
+        return {"full_ms": full / rounds * 1000, "delta_ms": delta / rounds * 1000,
+                "deltas_left": len(store.delta_paths())}
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Полное сохранение парка против дельт изменений")
+    parser.add_argument("--sizes", default="10k,100k")
+    parser.add_argument("--changes", type=int, default=100, help="измененных самокатов между сохранениями")
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+    from suite import parse_size
+    for size in (parse_size(s) for s in args.sizes.split(",") if s.strip()):
+        r = run(size, args.changes, args.rounds)
+        print(f"{size:>8} самокатов, {args.changes} изменений: полное сохранение {r['full_ms']:8.1f} мс, "
+              f"дельта {r['delta_ms']:6.2f} мс (x{r['full_ms'] / r['delta_ms']:.0f}), дельт после слияний {r['deltas_left']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+from __future__ import annotations
+import argparse
+import random
+import time
+
+from _loader import load_module
+import synthetic
+
+pricing_mod = load_module("23_dynamic_pricing")
+factory_mod = load_module("07_scooter_factory")
+
+TYPES = ("city", "off_road", "foldable")
+
+class Clock:
+    # управляемые часы: переход корзины времени без ожидания
+    def __init__(self, now: float = 8 * 3600.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+def build(n_stations: int, capacity: int, rnd: random.Random):
+    stations = synthetic.stations(n_stations, capacity=capacity)
+    spare = []
+    for i, station in enumerate(stations):
+        for j in range(rnd.randrange(capacity + 1)):
+            station.add_scooter(factory_mod.ScooterFactory.create_scooter(
+                rnd.choice(TYPES), scooter_id=f"SC-{i}-{j}", model="M", hourly_rate=round(rnd.uniform(3, 15), 2)))
+    for j in range(1000):
+        spare.append(factory_mod.ScooterFactory.create_scooter(
+            rnd.choice(TYPES), scooter_id=f"SP-{j}", model="M", hourly_rate=round(rnd.uniform(3, 15), 2)))
+    return stations, spare
+
+def naive_quote(pricing, stations, station, scooter, hours: float) -> float:
+    # расчет с нуля: заполненность станции, обход города, время суток
+    city = station.location_info.city
+    used = capacity = 0
+    for s in stations:
+        if s.location_info.city == city:
+            used += len(s.scooters)
+            capacity += s.capacity
+    regional = round(used / capacity, 2) if capacity else 0.0
+    utilization = pricing.local_weight * station.utilization() + (1.0 - pricing.local_weight) * regional
+    bucket = pricing.time_bucket()
+    m = pricing_mod.surge_multiplier(utilization, pricing.time_factors[bucket % len(pricing.time_factors)],
+                                     pricing.low, pricing.high, pricing.max_surge, pricing.max_discount)
+    return round(scooter.calculate_rental_cost(hours) * m, 2)
+
+def rent_or_return(stations, spare, rnd: random.Random) -> None:
+    # аренда забирает самокат со станции, возврат ставит на другую
+    station = rnd.choice(stations)
+    if spare and len(station.scooters) < station.capacity and rnd.random() < 0.5:
+        station.add_scooter(spare.pop())
+    elif station.scooters:
+        s = rnd.choice(station.scooters)
+        station.remove_scooter(s.scooter_id)
+        spare.append(s)
+
+def run(n_stations: int, capacity: int, n_quotes: int, rentals_every: int, seed: int = 12) -> dict:
+    rnd = random.Random(seed)
+    stations, spare = build(n_stations, capacity, rnd)
+    clock = Clock()
+    pricing = pricing_mod.DynamicPricing(clock=clock, utc_offset=0)
+    for station in stations:
+        pricing.attach_station(station)
+    nonempty = [s for s in stations if s.scooters]
+
+    # одинаковые цены после аренд и смены корзин времени
+    for step in range(300):
+        if step % 50 == 0:
+            clock.now += pricing.bucket_seconds
+        rent_or_return(stations, spare, rnd)
+        station = rnd.choice([s for s in nonempty if s.scooters] or stations)
+        if station.scooters:
+            scooter = rnd.choice(station.scooters)
+            hours = rnd.choice((0.5, 1, 4))
+            expected = naive_quote(pricing, stations, station, scooter, hours)
+            assert pricing.quote(station.station_id, scooter, hours) == expected, station.station_id
+
+    picks = []
+    for _ in range(n_quotes):
+        station = rnd.choice(nonempty)
+        if station.scooters:
+            picks.append((station, rnd.choice(station.scooters), rnd.choice((0.5, 1, 4))))
+    naive_n = max(1, min(len(picks), 20_000 // max(1, n_stations // 100)))
+    t0 = time.perf_counter()
+    for station, scooter, hours in picks[:naive_n]:
+        naive_quote(pricing, stations, station, scooter, hours)
+    naive_s = (time.perf_counter() - t0) / naive_n
+
+    # прогрев: первый расчет множителя каждой станции не входит в замер
+    for station in stations:
+        pricing.multiplier(station.station_id)
+    recomputed = pricing.recomputed
+    t0 = time.perf_counter()
+    for i, (station, scooter, hours) in enumerate(picks):
+        if i % rentals_every == 0:
+            rent_or_return(stations, spare, rnd)
+        pricing.quote(station.station_id, scooter, hours)
+    cached_s = (time.perf_counter() - t0) / len(picks)
+    return {"naive_us": naive_s * 1e6, "cached_us": cached_s * 1e6,
+            "recompute_share": (pricing.recomputed - recomputed) / len(picks)}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Динамические цены: расчет с нуля против кеша множителей")
+    parser.add_argument("--stations", default="1k,10k,100k")
+    parser.add_argument("--capacity", type=int, default=20)
+    parser.add_argument("--quotes", type=int, default=200_000)
+    parser.add_argument("--rentals-every", type=int, default=10, help="аренда/возврат раз в N расчетов цены")
+    args = parser.parse_args()
+    from suite import parse_size
+    for n in (parse_size(s) for s in args.stations.split(",") if s.strip()):
+        r = run(n, args.capacity, args.quotes, args.rentals_every)
+        print(f"{n:>8} станций: с нуля {r['naive_us']:9.1f} мкс/цена, кеш {r['cached_us']:5.2f} мкс/цена "
+              f"(x{r['naive_us'] / r['cached_us']:.0f}), пересчетов множителя {r['recompute_share']:.1%}")
+
+if __name__ == "__main__":
+    main()
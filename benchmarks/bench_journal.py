@@ -0,0 +1,103 @@
+from __future__ import annotations
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+
+from _loader import load_module
+
+journal_mod = load_module("20_rental_journal")
+template = load_module("09_template_method")
+chain = load_module("08_chain_of_responsibility")
+
+def per_event_fsync(directory: str, n: int) -> float:
+    # наивный вариант: каждая запись — свой write и fsync
+    path = os.path.join(directory, "naive.log")
+    t0 = time.perf_counter()
+    with open(path, "ab") as f:
+        for i in range(n):
+            f.write(journal_mod._record(i + 1, journal_mod._payload("confirmed", f"R-{i}", {}, time.time())))
+            f.flush()
+            os.fsync(f.fileno())
+    return n / (time.perf_counter() - t0)
+
+def group_commit(directory: str, rentals: int, threads: int) -> dict:
+    # аренды из нескольких потоков: created + confirmed на каждую
+    with journal_mod.RentalJournal(os.path.join(directory, "journal")) as journal:
+        process = journal_mod.record_rentals(template.OnlineRentalProcess(), journal)
+        per_thread = rentals // threads
+
+        def work() -> None:
+            for i in range(per_thread):
+                process.rent_scooter(f"SC-{i}", "C-1", 1)
+
+        workers = [threading.Thread(target=work) for _ in range(threads)]
+        t0 = time.perf_counter()
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+        elapsed = time.perf_counter() - t0
+        events = journal.last_lsn
+        assert journal.durable_lsn == events
+        commits = journal.commits
+    return {"events_per_s": events / elapsed, "events": events, "commits": commits}
+
+def check_torn_tail(directory: str, n: int, seed: int = 7) -> int:
+    # обрезаем хвост в случайном месте и дописываем мусор: после открытия
+    # должен остаться целый префикс событий, а запись — продолжаться
+    rnd = random.Random(seed)
+    path = os.path.join(directory, "torn")
+    head = chain.StationOperator(chain.Manager(chain.Admin()))
+    with journal_mod.RentalJournal(path, segment_size=64 << 10) as journal:
+        journal_mod.record_approvals(head, journal)
+        for i in range(n):
+            head.handle(chain.ChangeRequest(f"R-{i}", rnd.randint(0, 100), rnd.uniform(-100, 100)))
+        written = list(journal.replay())
+    checked = 0
+    for _ in range(20):
+        _, last = journal_mod.list_segments(path)[-1]
+        size = os.path.getsize(last)
+        with open(last, "r+b") as f:
+            f.truncate(rnd.randrange(size // 2, size))
+            f.seek(0, os.SEEK_END)
+            f.write(os.urandom(rnd.randrange(0, 64)))
+        with journal_mod.RentalJournal(path, segment_size=64 << 10) as journal:
+            recovered = list(journal.replay())
+            assert recovered == written[:len(recovered)], "восстановлен не префикс журнала"
+            lsn = journal.append("confirmed", "R-after")
+            assert lsn == len(recovered) + 1
+            written = list(journal.replay())
+        checked += 1
+    return checked
+
+def run(rentals: int, threads: int, naive: int) -> dict:
+    directory = tempfile.mkdtemp(prefix="scooter_journal_")
+    try:
+        return {
+            "per_event_fsync": per_event_fsync(directory, naive),
+            "group_commit": group_commit(directory, rentals, threads),
+            "torn_tail_checks": check_torn_tail(directory, 2000),
+        }
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Журнал аренд: групповая фиксация и восстановление хвоста")
+    parser.add_argument("--rentals", type=int, default=20_000)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--naive", type=int, default=2_000, help="записей в варианте с fsync на каждую")
+    args = parser.parse_args()
+    r = run(args.rentals, args.threads, args.naive)
+    g = r["group_commit"]
+    print(f"fsync на каждую запись: {r['per_event_fsync']:.0f} событий/с")
+    print(f"групповая фиксация ({args.threads} потоков): {g['events_per_s']:.0f} событий/с, "
+          f"{g['events']} событий за {g['commits']} fsync")
+    print(f"x{g['events_per_s'] / r['per_event_fsync']:.1f}")
+    print(f"проверок обрезанного хвоста: {r['torn_tail_checks']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+from __future__ import annotations
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from _loader import load_module
+
+BENCH_DIR = Path(__file__).resolve().parent
+
+# синтетический модуль типа: класс с ключом реестра и несколькими методами
+PLUGIN_TEMPLATE = '''from __future__ import annotations
+from _synthetic_base import Scooter
+
+RATE_FACTOR = {factor}
+
+class SyntheticScooter{i}(Scooter):
+    REGISTRY_KEY = "synthetic_{i}"
+
+    def calculate_rental_cost(self, hours: float) -> float:
+        return self.hourly_rate * RATE_FACTOR * hours
+
+    def describe(self) -> str:
+        return f"{{self.model}} ({{self.REGISTRY_KEY}})"
+
+    def max_hours(self, budget: float) -> float:
+        return budget / (self.hourly_rate * RATE_FACTOR)
+'''
+
+BASE_MODULE = '''from _loader import load_module
+Scooter = load_module("06_scooter_meta").Scooter
+'''
+
+# код, исполняемый в отдельном процессе: время от начала регистрации
+# до первого успешного get_scooter_class
+STARTUP = '''
+import json, sys, time
+sys.path[:0] = [{bench!r}, {plugins!r}]
+from _loader import load_module
+meta = load_module("06_scooter_meta")
+t0 = time.perf_counter()
+if {mode!r} == "eager":
+    import importlib
+    for i in range({n}):
+        importlib.import_module(f"synthetic_types.type_{{i}}")
+else:
+    meta.register_manifest({manifest!r})
+cls = meta.get_scooter_class("synthetic_{probe}")
+elapsed = time.perf_counter() - t0
+assert cls is not None and cls.__name__ == "SyntheticScooter{probe}"
+print(json.dumps({{"seconds": elapsed, "modules": len(sys.modules), "registered": len(meta.ScooterMeta.registry)}}))
+'''
+
+def make_plugins(root: Path, n: int) -> Path:
+    # пакет synthetic_types с n модулями и манифест ключ -> модуль
+    package = root / "synthetic_types"
+    package.mkdir()
+    (package / "__init__.py").write_text("")
+    (root / "_synthetic_base.py").write_text(BASE_MODULE)
+    manifest = {}
+    for i in range(n):
+        (package / f"type_{i}.py").write_text(PLUGIN_TEMPLATE.format(i=i, factor=1 + i % 7 / 10))
+        manifest[f"synthetic_{i}"] = f"synthetic_types.type_{i}"
+    path = root / "manifest.json"
+    path.write_text(json.dumps(manifest))
+    return path
+
+def startup(mode: str, plugins: Path, manifest: Path, n: int, probe: int) -> dict:
+    code = STARTUP.format(bench=str(BENCH_DIR), plugins=str(plugins), mode=mode, n=n,
+                          manifest=str(manifest), probe=probe)
+    t0 = time.perf_counter()
+    out = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout
+    result = json.loads(out)
+    result["process_seconds"] = time.perf_counter() - t0
+    return result
+
+def run(n: int, repeat: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        manifest = make_plugins(root, n)
+        # прогрев: байткод модулей попадает в __pycache__, как у установленного пакета
+        startup("eager", root, manifest, n, n - 1)
+        results = {}
+        for mode in ("eager", "lazy"):
+            runs = [startup(mode, root, manifest, n, n - 1) for _ in range(repeat)]
+            best = min(runs, key=lambda r: r["seconds"])
+            results[mode] = best
+    # в одном процессе: ленивый тип загружается при первом обращении
+    meta = load_module("06_scooter_meta")
+    meta.register_lazy("bench_city", f"{meta.__name__}:CityScooter")
+    assert "bench_city" in meta.available_types()
+    assert meta.get_scooter_class("BENCH_CITY") is meta.CityScooter
+    assert "bench_city" not in meta.ScooterMeta.lazy
+    return {"types": n, "eager": results["eager"], "lazy": results["lazy"]}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Время старта: импорт всех типов против ленивого реестра")
+    parser.add_argument("--types", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    r = run(args.types, args.repeat)
+    eager, lazy = r["eager"], r["lazy"]
+    print(f"{r['types']} типов: импорт всех {eager['seconds'] * 1e3:.0f} мс "
+          f"(процесс {eager['process_seconds'] * 1e3:.0f} мс, классов {eager['registered']}), "
+          f"ленивый реестр {lazy['seconds'] * 1e3:.1f} мс "
+          f"(процесс {lazy['process_seconds'] * 1e3:.0f} мс, классов {lazy['registered']})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+from __future__ import annotations
+import argparse
+import tracemalloc
+from datetime import datetime
+
+from _loader import load_module
+
+scooter_mod = load_module("01_scooter")
+domain = load_module("03_domain_station")
+factory = load_module("07_scooter_factory")
+chain = load_module("08_chain_of_responsibility")
+ser = load_module("12_serialization")
+comparisons = load_module("13_comparisons")
+
+class _PlainScooter(scooter_mod.Scooter):
+    # конкретный подкласс для абстрактного Scooter из 01_scooter
+    __slots__ = ()
+
+    def calculate_rental_cost(self, hours: float) -> float:
+        return self.hourly_rate * hours
+
+def _slot_names(cls):
+    # имена слотов по всей иерархии (с учетом искажения приватных имен)
+    names = []
+    for klass in reversed(cls.__mro__):
+        for name in getattr(klass, "__slots__", ()):
+            if name.startswith("__") and not name.endswith("__"):
+                name = f"_{klass.__name__.lstrip('_')}{name}"
+            names.append(name)
+    return names
+
+def _copy_into(target, source, names):
+    # копируем поля; списки (подписчики) у каждого объекта свои
+    for name in names:
+        value = getattr(source, name)
+        setattr(target, name, value[:] if isinstance(value, list) else value)
+    return target
+
+def _dict_layout(cls):
+    # класс с __dict__ и теми же полями: раскладка моделей до __slots__
+    return type(f"Dict{cls.__name__}", (), {})
+
+def _measure(build, n: int) -> float:
+    # байт на объект по данным tracemalloc
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [build(i) for i in range(n)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objects
+    return (after - before) / n
+
+MODELS = {
+    "01 Scooter": lambda i: _PlainScooter(f"S{i}", "M", 50, 2.0),
+    "07 CityScooter": lambda i: factory.CityScooter(f"S{i}", "M", 2.0),
+    "07 OffRoadScooter": lambda i: factory.OffRoadScooter(f"S{i}", "M", 2.0),
+    "12 CityScooter": lambda i: ser.CityScooter(f"S{i}", "M", 50, 2.0),
+    "12 FoldableScooter": lambda i: ser.FoldableScooter(f"S{i}", "M", 50, 2.0),
+    "03 Location": lambda i: domain.Location("Moscow", f"addr {i}", 55.75, 37.61),
+    "08 ChangeRequest": lambda i: chain.ChangeRequest(f"R{i}", 10, 5.0),
+    "13 Rental": lambda i: comparisons.Rental(f"R{i}", "C", "S", datetime(2024, 1, 1), 2.0, 10.0),
+}
+
+def run(n: int) -> list:
+    rows = []
+    for name, make in MODELS.items():
+        # оба варианта копируют поля из одних и тех же образцов,
+        # поэтому в замер попадает только сам объект
+        samples = [make(i) for i in range(n)]
+        cls = type(samples[0])
+        names = _slot_names(cls)
+        legacy_cls = _dict_layout(cls)
+        slotted = _measure(lambda i: _copy_into(object.__new__(cls), samples[i], names), n)
+        legacy = _measure(lambda i: _copy_into(legacy_cls(), samples[i], names), n)
+        rows.append({"model": name, "dict_bytes": legacy, "slots_bytes": slotted})
+    return rows
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Память на объект: __dict__ против __slots__")
+    parser.add_argument("-n", type=int, default=100_000)
+    args = parser.parse_args()
+    print(f"{'модель':<20} {'__dict__, Б':>12} {'__slots__, Б':>13} {'экономия':>9}")
+    for r in run(args.n):
+        saved = 1 - r["slots_bytes"] / r["dict_bytes"]
+        print(f"{r['model']:<20} {r['dict_bytes']:>12.0f} {r['slots_bytes']:>13.0f} {saved:>8.0%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+from __future__ import annotations
+import argparse
+import time
+
+from _loader import load_module
+
+metrics = load_module("19_metrics")
+template = load_module("09_template_method")
+chain = load_module("08_chain_of_responsibility")
+domain = load_module("03_domain_station")
+perms = load_module("10_permissions")
+
+import synthetic
+
+def time_rentals(process, requests) -> float:
+    rent = process.rent_scooter
+    t0 = time.perf_counter()
+    for scooter_id, customer_id, hours in requests:
+        rent(scooter_id, customer_id, hours)
+    return time.perf_counter() - t0
+
+def time_handle(head, requests) -> float:
+    handle = head.handle
+    t0 = time.perf_counter()
+    for r in requests:
+        handle(r)
+    return time.perf_counter() - t0
+
+def best(fn, repeat: int) -> float:
+    return min(fn() for _ in range(repeat))
+
+def run(n: int, repeat: int) -> dict:
+    rentals = synthetic.rental_requests(n)
+    changes = synthetic.change_requests(n)
+    process = template.OnlineRentalProcess()
+    head = chain.StationOperator(chain.Manager(chain.Admin()))
+
+    before = (best(lambda: time_rentals(process, rentals), repeat), best(lambda: time_handle(head, changes), repeat))
+    ins = metrics.Instrumentation()
+    ins.rental_processes(template.RentalProcess, template.OnlineRentalProcess, template.OfflineRentalProcess)
+    ins.approval_chain(head)
+    ins.permissions(perms)
+    ins.stations(domain.RentalStation)
+    enabled = (best(lambda: time_rentals(process, rentals), repeat), best(lambda: time_handle(head, changes), repeat))
+    snapshot = ins.registry.to_dict()
+    ins.uninstall()
+    after = (best(lambda: time_rentals(process, rentals), repeat), best(lambda: time_handle(head, changes), repeat))
+
+    # каждый вызов учтен ровно один раз
+    rent_count = sum(s["count"] for s in snapshot["rental_rent_scooter_seconds"]["samples"])
+    assert rent_count == n * repeat
+    decided = sum(s["value"] for s in snapshot["approval_decisions_total"]["samples"])
+    assert decided == n * repeat
+    text = metrics.MetricsRegistry.to_prometheus(ins.registry)
+    assert "# TYPE rental_step_seconds histogram" in text
+    return {
+        "calls": n,
+        "rent_ns": [t / n * 1e9 for t in (before[0], enabled[0], after[0])],
+        "handle_ns": [t / n * 1e9 for t in (before[1], enabled[1], after[1])],
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Стоимость инструментовки: до, включена, после снятия")
+    parser.add_argument("--calls", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    r = run(args.calls, args.repeat)
+    for name, (before, enabled, after) in (("rent_scooter", r["rent_ns"]), ("Handler.handle", r["handle_ns"])):
+        print(f"{name}: без метрик {before:.0f} нс, с метриками {enabled:.0f} нс, после uninstall {after:.0f} нс")
+
+if __name__ == "__main__":
+    main()
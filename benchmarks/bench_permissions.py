@@ -0,0 +1,81 @@
+from __future__ import annotations
+import argparse
+import timeit
+
+from _loader import load_module
+
+perms = load_module("10_permissions")
+
+def passthrough(fn):
+    # пустая обертка: нижняя граница стоимости любого декоратора
+    def wrapper(*args, **kwargs):
+        return fn(*args, **kwargs)
+    return wrapper
+
+class User:
+    def __init__(self, roles):
+        self.roles = set(roles)
+
+class Service:
+    def __init__(self, user):
+        self.user = user
+
+    def plain(self, x):
+        return x
+
+    @passthrough
+    def wrapped(self, x):
+        return x
+
+    @perms.check_permissions("operator")
+    def checked(self, x):
+        return x
+
+    @perms.require_role("operator")
+    def cached(self, x):
+        return x
+
+def run(number: int, repeat: int) -> dict:
+    service = Service(User({"customer", "operator"}))
+
+    # корректность: отказ без роли и сброс кеша при смене ролей
+    denied = Service(User({"customer"}))
+    for method in (denied.checked, denied.cached):
+        try:
+            method(1)
+        except perms.PermissionDeniedError:
+            pass
+        else:
+            raise AssertionError("ожидался PermissionDeniedError")
+    perms.permission_cache.set_roles(denied.user, {"operator"})
+    assert denied.cached(1) == 1
+
+    def best(stmt) -> float:
+        return min(timeit.repeat(stmt, number=number, repeat=repeat)) / number * 1e9
+
+    plain = best(lambda: service.plain(1))
+    wrapped = best(lambda: service.wrapped(1))
+    checked = best(lambda: service.checked(1))
+    cached = best(lambda: service.cached(1))
+    return {
+        "plain_ns": plain,
+        "passthrough_ns": wrapped,
+        "check_permissions_ns": checked,
+        "require_role_ns": cached,
+        "check_permissions_overhead_ns": checked - plain,
+        "require_role_overhead_ns": cached - plain,
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Накладные расходы декораторов прав")
+    parser.add_argument("--number", type=int, default=500_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    r = run(args.number, args.repeat)
+    print(f"без декоратора {r['plain_ns']:.0f} нс, пустая обертка {r['passthrough_ns']:.0f} нс, "
+          f"check_permissions {r['check_permissions_ns']:.0f} нс "
+          f"(+{r['check_permissions_overhead_ns']:.0f}), require_role {r['require_role_ns']:.0f} нс "
+          f"(+{r['require_role_overhead_ns']:.0f})")
+
+if __name__ == "__main__":
+    main()
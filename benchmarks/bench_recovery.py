@@ -0,0 +1,98 @@
+from __future__ import annotations
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from _loader import load_module
+import synthetic
+
+journal_mod = load_module("20_rental_journal")
+domain = load_module("03_domain_station")
+serialization = load_module("12_serialization")
+
+STATIONS = 50
+PER_STATION = 40
+
+def build_history(directory: str, events: int, checkpoint_every, seed: int = 3) -> float:
+    # станции с самокатами, затем аренды и смена доступности до events событий;
+    # возвращает наибольшую задержку append (с)
+    rnd = random.Random(seed)
+    store = journal_mod.RecoverableStore(directory, checkpoint_every=checkpoint_every, fsync=False, segment_size=1 << 20)
+    worst = 0.0
+    for i in range(STATIONS):
+        store.add_station(f"ST-{i}", PER_STATION, {"city": "Moscow", "address": f"addr-{i}"})
+    records = synthetic.scooter_dicts(STATIONS * PER_STATION, seed)
+    for i, record in enumerate(records):
+        store.add_scooter(f"ST-{i // PER_STATION}", record)
+    ids = [r["scooter_id"] for r in records]
+    open_rentals = []
+    while store.journal.last_lsn < events:
+        t0 = time.perf_counter()
+        roll = rnd.random()
+        if roll < 0.3 or not open_rentals:
+            rental_id = f"R-{store.journal.last_lsn}"
+            store.append("created", rental_id, {"scooter_id": rnd.choice(ids), "customer_id": "C-1", "hours": 1}, sync=False)
+            open_rentals.append(rental_id)
+        elif roll < 0.6:
+            store.append("confirmed", rnd.choice(open_rentals), sync=False)
+        elif roll < 0.8:
+            store.append("rental_closed", open_rentals.pop(rnd.randrange(len(open_rentals))), sync=False)
+        else:
+            store.append("availability_changed", "", {"scooter_id": rnd.choice(ids), "is_available": rnd.random() < 0.7}, sync=False)
+        worst = max(worst, time.perf_counter() - t0)
+    store.journal.flush()
+    # имитация падения: без финальной контрольной точки
+    store.close(checkpoint=False)
+    return worst
+
+def recover(directory: str):
+    t0 = time.perf_counter()
+    store = journal_mod.RecoverableStore(directory, checkpoint_every=None, fsync=False)
+    elapsed = time.perf_counter() - t0
+    state, replayed = store.state, store.replayed
+    store.close(checkpoint=False)
+    return elapsed, state, replayed
+
+def run(lengths, checkpoint_every: int) -> list:
+    rows = []
+    for events in lengths:
+        root = tempfile.mkdtemp(prefix="scooter_recovery_")
+        try:
+            full_dir, ckpt_dir = os.path.join(root, "full"), os.path.join(root, "ckpt")
+            build_history(full_dir, events, None)
+            worst = build_history(ckpt_dir, events, checkpoint_every)
+            full_time, full_state, full_replayed = recover(full_dir)
+            ckpt_time, ckpt_state, ckpt_replayed = recover(ckpt_dir)
+            assert full_state.snapshot() == ckpt_state.snapshot(), "состояния после восстановления различаются"
+            stations = journal_mod.restore_stations(
+                ckpt_state, domain.RentalStation, domain.Location, serialization.Scooter.from_dict, indexed=True,
+            )
+            assert sum(len(s.scooters) for s in stations.values()) == len(ckpt_state.placement)
+            segments = len(journal_mod.list_segments(os.path.join(ckpt_dir, "journal")))
+            rows.append({
+                "events": events,
+                "full_replay_s": full_time, "full_replayed": full_replayed,
+                "checkpoint_s": ckpt_time, "checkpoint_replayed": ckpt_replayed,
+                "segments_left": segments, "worst_append_s": worst,
+            })
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+    return rows
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Время восстановления: полный журнал против контрольной точки")
+    parser.add_argument("--lengths", default="25k,100k,400k", help="длины истории через запятую")
+    parser.add_argument("--checkpoint-every", type=int, default=15_000)
+    args = parser.parse_args()
+    from suite import parse_size
+    lengths = [parse_size(s) for s in args.lengths.split(",") if s.strip()]
+    for r in run(lengths, args.checkpoint_every):
+        print(f"{r['events']:>8} событий: полный журнал {r['full_replay_s'] * 1000:8.1f} мс ({r['full_replayed']} событий), "
+              f"контрольная точка {r['checkpoint_s'] * 1000:7.1f} мс ({r['checkpoint_replayed']} событий), "
+              f"сегментов {r['segments_left']}, макс. append {r['worst_append_s'] * 1000:.1f} мс")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+from __future__ import annotations
+import argparse
+import multiprocessing as mp
+import sys
+import tempfile
+import threading
+import time
+
+from _loader import load_module
+
+template = load_module("09_template_method")
+
+def _generate_explicit(args) -> list:
+    # отдельный процесс со своим worker_id
+    worker_id, n = args
+    generator = template.RentalIdGenerator(worker_id=worker_id)
+    return [generator.next_id("ONL") for _ in range(n)]
+
+_leased = None
+
+def _generate_leased(n: int) -> list:
+    # генератор с арендованным номером, созданный в родителе до fork:
+    # в потомке номер арендуется заново
+    process = template.OnlineRentalProcess(_leased)
+    return [process.rent_scooter("SC-1", "C-1", 1)["rental_id"] for _ in range(n)]
+
+def check_processes(processes: int, per_process: int) -> dict:
+    # уникальность и порядок внутри процесса; повторы одной пары самокат/клиент
+    global _leased
+    with mp.get_context("spawn").Pool(processes) as pool:
+        explicit = pool.map(_generate_explicit, [(i, per_process) for i in range(processes)])
+    leased = []
+    if "fork" in mp.get_all_start_methods():
+        with tempfile.TemporaryDirectory(prefix="scooter_workers_") as directory:
+            _leased = template.RentalIdGenerator(lease_dir=directory)
+            with mp.get_context("fork").Pool(processes) as pool:
+                leased = pool.map(_generate_leased, [per_process] * processes)
+    result = {}
+    for name, batches in (("explicit", explicit), ("fork_leased", leased)):
+        if not batches:
+            continue
+        flat = [i for batch in batches for i in batch]
+        duplicates = len(flat) - len(set(flat))
+        ordered = all(batch == sorted(batch) for batch in batches)
+        workers = {template.parse_rental_id(batch[0])["worker_id"] for batch in batches}
+        result[name] = {"ids": len(flat), "duplicates": duplicates, "ordered": ordered, "workers": len(workers)}
+    return result
+
+def throughput(n: int, threads: int) -> float:
+    # идентификаторов в секунду на один общий генератор
+    generator = template.RentalIdGenerator(worker_id=1)
+    per_thread = n // threads
+    seen = [None] * threads
+
+    def work(k: int) -> None:
+        next_id = generator.next_id
+        seen[k] = [next_id("ONL") for _ in range(per_thread)]
+
+    workers = [threading.Thread(target=work, args=(k,)) for k in range(threads)]
+    t0 = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - t0
+    flat = [i for batch in seen for i in batch]
+    assert len(set(flat)) == len(flat), "повторяющиеся идентификаторы в потоках"
+    return len(flat) / elapsed
+
+def run(processes: int, per_process: int, n: int) -> dict:
+    return {
+        "processes": check_processes(processes, per_process),
+        "throughput": {threads: throughput(n, threads) for threads in (1, 4)},
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Уникальность и скорость генератора rental_id")
+    parser.add_argument("--processes", type=int, default=8)
+    parser.add_argument("--per-process", type=int, default=50_000)
+    parser.add_argument("--ids", type=int, default=400_000)
+    args = parser.parse_args()
+    r = run(args.processes, args.per_process, args.ids)
+    failed = False
+    for name, info in r["processes"].items():
+        print(f"{name}: {info['ids']} идентификаторов из {info['workers']} воркеров, "
+              f"повторов {info['duplicates']}, порядок внутри процесса {'да' if info['ordered'] else 'НЕТ'}")
+        failed |= info["duplicates"] > 0 or not info["ordered"]
+    for threads, rate in r["throughput"].items():
+        print(f"{threads} поток(а): {rate / 1e6:.2f} млн идентификаторов/с")
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
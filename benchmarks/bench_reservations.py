@@ -0,0 +1,89 @@
+from __future__ import annotations
+import argparse
+import random
+import sys
+import threading
+import time
+
+from _loader import load_module
+
+scooter_mod = load_module("01_scooter")
+reservations_mod = load_module("18_reservations")
+
+class _CityScooter(scooter_mod.Scooter):
+    __slots__ = ()
+
+    def calculate_rental_cost(self, hours: float) -> float:
+        return self.hourly_rate * hours
+
+def stress(threads: int, scooters: int, ops: int, stripes: int) -> dict:
+    # потоки резервируют случайные самокаты из общего пула и отпускают их;
+    # holders — число владельцев самоката (под отдельной блокировкой теста),
+    # больше одного владельца означает двойную бронь
+    fleet = [_CityScooter(f"SC-{i}", "M", 80, 2.0) for i in range(scooters)]
+    manager = reservations_mod.ReservationManager(stripes=stripes)
+    holders = [0] * scooters
+    holders_lock = threading.Lock()
+    double_booked = [0]
+    reserved = [0] * threads
+    start = threading.Barrier(threads + 1)
+
+    def worker(index: int) -> None:
+        rnd = random.Random(index)
+        start.wait()
+        for _ in range(ops):
+            i = rnd.randrange(scooters)
+            scooter = fleet[i]
+            reservation = manager.try_reserve(scooter, f"C-{index}")
+            if reservation is None:
+                continue
+            with holders_lock:
+                holders[i] += 1
+                if holders[i] > 1:
+                    double_booked[0] += 1
+            reserved[index] += 1
+            # держим резерв, давая другим потокам шанс вмешаться
+            time.sleep(0)
+            with holders_lock:
+                holders[i] -= 1
+            manager.release(scooter, reservation)
+
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for t in pool:
+        t.start()
+    start.wait()
+    t0 = time.perf_counter()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - t0
+    assert not manager.active(), "остались неснятые резервы"
+    assert all(s.is_available for s in fleet)
+    return {
+        "threads": threads,
+        "stripes": stripes,
+        "double_booked": double_booked[0],
+        "reserved": sum(reserved),
+        "ops_per_s": threads * ops / elapsed,
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Стресс-тест резервирования самокатов в потоках")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--scooters", type=int, default=64, help="маленький пул — больше конфликтов")
+    parser.add_argument("--ops", type=int, default=20_000, help="попыток резерва на поток")
+    parser.add_argument("--stripes", type=int, nargs="+", default=[1, 64])
+    args = parser.parse_args()
+    # частое переключение потоков, чтобы гонки проявлялись
+    sys.setswitchinterval(1e-6)
+    failed = False
+    for stripes in args.stripes:
+        for threads in args.threads:
+            r = stress(threads, args.scooters, args.ops, stripes)
+            failed |= r["double_booked"] > 0
+            print(f"stripes={stripes:>3} threads={threads:>3}: {r['ops_per_s']:>9.0f} попыток/с, "
+                  f"резервов {r['reserved']:>7}, двойных броней {r['double_booked']}")
+    if failed:
+        sys.exit("обнаружено двойное бронирование")
+
+if __name__ == "__main__":
+    main()
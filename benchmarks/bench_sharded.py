@@ -0,0 +1,82 @@
+from __future__ import annotations
+import argparse
+import os
+import random
+import time
+
+from _loader import load_module
+
+engine_mod = load_module("21_sharded_engine")
+
+CITIES = ("Moscow", "Saint Petersburg", "Kazan", "Novosibirsk", "Yekaterinburg",
+          "Nizhny Novgorod", "Samara", "Omsk", "Rostov", "Ufa", "Perm", "Voronezh")
+
+def fleet(stations: int, per_station: int, seed: int = 4):
+    rnd = random.Random(seed)
+    station_rows = [(f"ST-{i}", per_station, CITIES[i % len(CITIES)]) for i in range(stations)]
+    scooter_rows = []
+    for i in range(stations):
+        for j in range(rnd.randrange(per_station + 1)):
+            scooter_rows.append((f"ST-{i}", f"SC-{i}-{j}", rnd.random() < 0.7, rnd.randint(0, 100)))
+    return station_rows, scooter_rows
+
+def timed(fn, repeat: int):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+def run(worker_counts, stations: int, per_station: int, repeat: int, partition: str) -> list:
+    station_rows, scooter_rows = fleet(stations, per_station)
+    rows = []
+    reference = None
+    for workers in worker_counts:
+        with engine_mod.ShardedFleetEngine(workers, partition=partition) as engine:
+            t0 = time.perf_counter()
+            engine.add_station_rows(station_rows)
+            errors = engine.add_scooters(scooter_rows)
+            load = time.perf_counter() - t0
+            assert not errors, errors[:3]
+            query, counts = timed(lambda: engine.city_counts(min_battery=20), repeat)
+            plan_time, plan = timed(lambda: engine.rebalance_plan(0.3, 0.8), repeat)
+            top_time, top = timed(lambda: engine.top_available(20), repeat)
+            ids = [row[0] for row in station_rows[:2000]]
+            routed, _ = timed(lambda: [engine.available_count(s) for s in ids], 1)
+            result = (counts, plan, top)
+            if reference is None:
+                reference = result
+            assert result == reference, "результаты зависят от числа шардов"
+            rows.append({
+                "workers": workers, "load_s": load, "city_counts_s": query,
+                "rebalance_s": plan_time, "top_s": top_time,
+                "routed_us": routed / len(ids) * 1e6, "scooters": engine.stats()["scooters"],
+            })
+    return rows
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Масштабирование шардированного движка по числу процессов")
+    parser.add_argument("--workers", default=None, help="список через запятую (по умолчанию 1,2,4..cpu)")
+    parser.add_argument("--stations", type=int, default=20_000)
+    parser.add_argument("--per-station", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--partition", choices=("city", "station"), default="station")
+    args = parser.parse_args()
+    if args.workers:
+        counts = [int(w) for w in args.workers.split(",")]
+    else:
+        cpu = os.cpu_count() or 1
+        counts = sorted({1, 2, 4, cpu} | {w for w in (8, 16) if w <= cpu})
+    print(f"процессоров: {os.cpu_count()}")
+    rows = run(counts, args.stations, args.per_station, args.repeat, args.partition)
+    base = rows[0]["city_counts_s"]
+    for r in rows:
+        print(f"{r['workers']:>3} шард(ов): загрузка {r['scooters']} самокатов {r['load_s']:.2f} с, "
+              f"city_counts {r['city_counts_s'] * 1000:7.1f} мс (x{base / r['city_counts_s']:.2f}), "
+              f"rebalance {r['rebalance_s'] * 1000:6.1f} мс, top {r['top_s'] * 1000:5.1f} мс, "
+              f"маршрутизация {r['routed_us']:.0f} мкс/оп")
+
+if __name__ == "__main__":
+    main()
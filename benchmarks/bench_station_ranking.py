@@ -0,0 +1,86 @@
+from __future__ import annotations
+import argparse
+import random
+import time
+
+from _loader import load_module
+
+domain = load_module("03_domain_station")
+ranking_mod = load_module("17_station_ranking")
+
+class _Scooter:
+    # минимальный самокат для станции
+    __slots__ = ("scooter_id", "is_available")
+
+    def __init__(self, scooter_id: str):
+        self.scooter_id = scooter_id
+        self.is_available = True
+
+def make_stations(n: int, seed: int = 1):
+    rnd = random.Random(seed)
+    stations = []
+    for i in range(n):
+        capacity = rnd.choice([10, 20, 40])
+        station = domain.RentalStation(f"ST-{i}", capacity, domain.Location("Moscow", f"addr-{i}"), indexed=True)
+        for j in range(rnd.randint(0, capacity)):
+            station.add_scooter(_Scooter(f"SC-{i}-{j}"))
+        stations.append(station)
+    return stations
+
+def tick(stations, rnd, changes: int, counter: list) -> None:
+    # несколько станций меняют заполненность за тик
+    for station in rnd.sample(stations, changes):
+        if station.scooters and (rnd.random() < 0.5 or len(station.scooters) >= station.capacity):
+            station.remove_scooter(station.scooters[-1].scooter_id)
+        else:
+            counter[0] += 1
+            station.add_scooter(_Scooter(f"NEW-{counter[0]}"))
+
+def run(n: int, ticks: int, changes: int, top: int) -> dict:
+    stations = make_stations(n)
+    rnd = random.Random(2)
+    counter = [0]
+
+    # эталон: полная пересортировка на каждом тике
+    t0 = time.perf_counter()
+    for _ in range(ticks):
+        tick(stations, rnd, changes, counter)
+        ordered = sorted(stations)
+        full_sorted = (ordered[::-1][:top], ordered[:top])
+    baseline = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    ranking = ranking_mod.StationRanking(stations)
+    build = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for _ in range(ticks):
+        tick(stations, rnd, changes, counter)
+        ranked = (ranking.most_full(top), ranking.most_empty(top))
+    incremental = time.perf_counter() - t0
+
+    # сверяем последний тик с полной сортировкой
+    ordered = sorted(stations, key=ranking_mod.station_key)
+    assert [s.station_id for s in ranked[0]] == [s.station_id for s in ordered[::-1][:top]]
+    assert [s.station_id for s in ranked[1]] == [s.station_id for s in ordered[:top]]
+    del full_sorted
+    return {
+        "stations": n,
+        "sorted_tick_ms": baseline / ticks * 1e3,
+        "ranking_tick_ms": incremental / ticks * 1e3,
+        "build_s": build,
+        "speedup": baseline / incremental,
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="StationRanking против sorted() на каждом тике")
+    parser.add_argument("--stations", type=int, default=50_000)
+    parser.add_argument("--ticks", type=int, default=20)
+    parser.add_argument("--changes", type=int, default=50, help="станций меняется за тик")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+    r = run(args.stations, args.ticks, args.changes, args.top)
+    print(f"{r['stations']} станций, {args.changes} изменений за тик: sorted() {r['sorted_tick_ms']:.1f} мс/тик, "
+          f"StationRanking {r['ranking_tick_ms']:.3f} мс/тик (x{r['speedup']:.0f}), построение {r['build_s']:.2f} с")
+
+if __name__ == "__main__":
+    main()
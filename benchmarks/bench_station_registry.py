@@ -0,0 +1,98 @@
+from __future__ import annotations
+import argparse
+import random
+import time
+
+from _loader import load_module
+
+domain = load_module("03_domain_station")
+registry_mod = load_module("14_station_registry")
+
+# центры городов для синтетических станций
+CITIES = {
+    "Moscow": (55.7558, 37.6173),
+    "Saint Petersburg": (59.9343, 30.3351),
+    "Kazan": (55.7963, 49.1088),
+    "Novosibirsk": (55.0084, 82.9357),
+}
+
+def make_stations(n: int, seed: int = 1, unlocated_share: float = 0.01):
+    # станции вокруг центров городов, часть без координат
+    rnd = random.Random(seed)
+    names = list(CITIES)
+    stations = []
+    for i in range(n):
+        city = names[i % len(names)]
+        lat0, lon0 = CITIES[city]
+        if rnd.random() < unlocated_share:
+            loc = domain.Location(city, f"addr-{i}")
+        else:
+            loc = domain.Location(city, f"addr-{i}", lat0 + rnd.uniform(-0.2, 0.2), lon0 + rnd.uniform(-0.3, 0.3))
+        stations.append(domain.RentalStation(f"ST-{i}", 10, loc, indexed=True))
+    return stations
+
+def linear_within_radius(stations, lat, lon, radius_m):
+    # эталон: перебор всех станций
+    result = []
+    for s in stations:
+        coords = registry_mod.station_coordinates(s)
+        if coords is None:
+            continue
+        d = registry_mod.haversine_m(lat, lon, coords[0], coords[1])
+        if d <= radius_m:
+            result.append((d, s))
+    result.sort(key=lambda pair: (pair[0], pair[1].station_id))
+    return result
+
+def run(n: int, queries: int, radius_m: float, k: int) -> dict:
+    stations = make_stations(n)
+    rnd = random.Random(2)
+    points = []
+    for i in range(queries):
+        lat0, lon0 = list(CITIES.values())[i % len(CITIES)]
+        points.append((lat0 + rnd.uniform(-0.2, 0.2), lon0 + rnd.uniform(-0.3, 0.3)))
+
+    t0 = time.perf_counter()
+    reg = registry_mod.StationRegistry()
+    reg.add_many(stations)
+    build = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    expected = [linear_within_radius(stations, lat, lon, radius_m) for lat, lon in points]
+    linear = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    got = [reg.within_radius(lat, lon, radius_m) for lat, lon in points]
+    indexed = time.perf_counter() - t0
+    assert [[s.station_id for _, s in r] for r in got] == [[s.station_id for _, s in r] for r in expected]
+
+    t0 = time.perf_counter()
+    for lat, lon in points:
+        reg.nearest(lat, lon, k)
+    knn = time.perf_counter() - t0
+
+    return {
+        "stations": n,
+        "queries": queries,
+        "build_s": build,
+        "linear_radius_ms": linear / queries * 1e3,
+        "indexed_radius_ms": indexed / queries * 1e3,
+        "speedup": linear / indexed if indexed else float("inf"),
+        "knn_ms": knn / queries * 1e3,
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="StationRegistry против линейного перебора")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 50_000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--radius", type=float, default=500.0)
+    parser.add_argument("-k", type=int, default=5)
+    args = parser.parse_args()
+    for n in args.sizes:
+        r = run(n, args.queries, args.radius, args.k)
+        print(f"{r['stations']:>7} станций: перебор {r['linear_radius_ms']:.3f} мс, "
+              f"индекс {r['indexed_radius_ms']:.3f} мс (x{r['speedup']:.0f}), "
+              f"kNN(k={args.k}) {r['knn_ms']:.3f} мс, построение {r['build_s']:.2f} с")
+
+if __name__ == "__main__":
+    main()
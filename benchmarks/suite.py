@@ -0,0 +1,270 @@
+from __future__ import annotations
+import argparse
+import gc
+import json
+import math
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from _loader import load_module
+import synthetic
+
+BENCH_DIR = Path(__file__).resolve().parent
+DEFAULT_BASELINE = BENCH_DIR / "baseline.json"
+
+# кейс: setup(size) -> (функция для замера, число операций в ней);
+# подготовка данных в замер не входит
+Case = Callable[[int], Tuple[Callable[[], Any], int]]
+CASES: Dict[str, Case] = {}
+
+# самокатов на станцию в кейсах станций
+PER_STATION = 40
+
+def case(name: str) -> Callable[[Case], Case]:
+    def register(fn: Case) -> Case:
+        CASES[name] = fn
+        return fn
+    return register
+
+def _filled_stations(size: int, indexed: bool) -> Tuple[List[Any], List[Any]]:
+    stations = synthetic.stations(math.ceil(size / PER_STATION), capacity=PER_STATION, indexed=indexed)
+    scooters = synthetic.station_scooters(size)
+    for i, s in enumerate(scooters):
+        stations[i // PER_STATION].add_scooter(s)
+    return stations, scooters
+
+for _mode, _indexed in (("plain", False), ("indexed", True)):
+    @case(f"station.add_scooter[{_mode}]")
+    def _add(size: int, indexed: bool = _indexed):
+        stations = synthetic.stations(math.ceil(size / PER_STATION), capacity=PER_STATION, indexed=indexed)
+        scooters = synthetic.station_scooters(size)
+
+        def body():
+            for i, s in enumerate(scooters):
+                stations[i // PER_STATION].add_scooter(s)
+        return body, size
+
+    @case(f"station.remove_scooter[{_mode}]")
+    def _remove(size: int, indexed: bool = _indexed):
+        stations, scooters = _filled_stations(size, indexed)
+        order = list(range(size))
+        random.Random(2).shuffle(order)
+
+        def body():
+            for i in order:
+                stations[i // PER_STATION].remove_scooter(scooters[i].scooter_id)
+        return body, size
+
+    @case(f"station.get_available_scooters[{_mode}]")
+    def _available(size: int, indexed: bool = _indexed):
+        stations, _ = _filled_stations(size, indexed)
+
+        def body():
+            for station in stations:
+                station.get_available_scooters()
+        return body, len(stations)
+
+@case("scooter.calculate_rental_cost")
+def _cost(size: int):
+    scooters = synthetic.scooters(size)
+    hours = [0.5, 1, 2, 4, 6]
+
+    def body():
+        for i, s in enumerate(scooters):
+            s.calculate_rental_cost(hours[i % 5])
+    return body, size
+
+@case("scooter.from_dict")
+def _from_dict(size: int):
+    serialization = load_module("12_serialization")
+    records = synthetic.scooter_dicts(size)
+    from_dict = serialization.Scooter.from_dict
+
+    def body():
+        for d in records:
+            from_dict(d)
+    return body, size
+
+@case("json.save")
+def _json_save(size: int):
+    serialization = load_module("12_serialization")
+    scooters = synthetic.scooters(size)
+    path = _temp_path("save")
+
+    def body():
+        serialization.save_scooters_to_json(scooters, path)
+    return body, size
+
+@case("json.load")
+def _json_load(size: int):
+    serialization = load_module("12_serialization")
+    path = _temp_path("load")
+    serialization.save_scooters_to_json(synthetic.scooters(size), path)
+
+    def body():
+        serialization.load_scooters_from_json(path)
+    return body, size
+
+@case("handler.handle")
+def _handle(size: int):
+    chain = load_module("08_chain_of_responsibility")
+    head = chain.StationOperator(chain.Manager(chain.Admin()))
+    requests = synthetic.change_requests(size)
+
+    def body():
+        for r in requests:
+            head.handle(r)
+    return body, size
+
+@case("check_permissions")
+def _permissions(size: int):
+    perms = load_module("10_permissions")
+
+    class User:
+        def __init__(self, roles):
+            self.roles = set(roles)
+
+    class Service:
+        def __init__(self, user):
+            self.user = user
+
+        @perms.check_permissions("operator")
+        def update(self, x):
+            return x
+
+    service = Service(User({"customer", "operator"}))
+
+    def body():
+        update = service.update
+        for i in range(size):
+            update(i)
+    return body, size
+
+for _channel in ("Online", "Offline"):
+    @case(f"rent_scooter[{_channel.lower()}]")
+    def _rent(size: int, channel: str = _channel):
+        template = load_module("09_template_method")
+        process = getattr(template, f"{channel}RentalProcess")()
+        requests = synthetic.rental_requests(size)
+
+        def body():
+            rent = process.rent_scooter
+            for scooter_id, customer_id, hours in requests:
+                rent(scooter_id, customer_id, hours)
+        return body, size
+
+# временный каталог текущего прогона (создается и удаляется в run)
+_TEMP_DIR: Optional[str] = None
+
+def _temp_path(name: str) -> str:
+    if _TEMP_DIR is None:
+        raise RuntimeError("Файловые кейсы запускаются только внутри run().")
+    return os.path.join(_TEMP_DIR, f"{name}.json")
+
+def parse_size(text: str) -> int:
+    # 1000, 10k, 1m
+    text = text.strip().lower()
+    factor = {"k": 1_000, "m": 1_000_000}.get(text[-1:], 1)
+    return int(float(text[:-1] if factor > 1 else text) * factor)
+
+def measure(name: str, size: int, repeat: int) -> Dict[str, Any]:
+    # лучшее время из repeat прогонов; подготовка — заново для каждого прогона
+    best = math.inf
+    ops = 0
+    for _ in range(repeat):
+        body, ops = CASES[name](size)
+        gc.collect()
+        t0 = time.perf_counter()
+        body()
+        best = min(best, time.perf_counter() - t0)
+        del body
+    return {"case": name, "size": size, "ops": ops, "seconds": best, "ns_per_op": best / max(ops, 1) * 1e9}
+
+def run(sizes: List[int], repeat: int = 3, only: Optional[str] = None) -> Dict[str, Any]:
+    global _TEMP_DIR
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="scooter_bench_") as directory:
+        _TEMP_DIR = directory
+        try:
+            for name in CASES:
+                if only and only not in name:
+                    continue
+                for size in sizes:
+                    results[f"{name}@{size}"] = measure(name, size, repeat)
+        finally:
+            _TEMP_DIR = None
+    return {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[Dict[str, Any]]:
+    # сравнение ns_per_op с базой; регрессия — рост больше чем на threshold
+    rows = []
+    base = baseline.get("results", {})
+    for key, result in current["results"].items():
+        old = base.get(key)
+        if old is None:
+            continue
+        ratio = result["ns_per_op"] / old["ns_per_op"] if old["ns_per_op"] else math.inf
+        rows.append({
+            "key": key,
+            "baseline_ns": old["ns_per_op"],
+            "current_ns": result["ns_per_op"],
+            "ratio": ratio,
+            "regression": ratio > 1 + threshold,
+        })
+    return rows
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Набор бенчмарков горячих путей на синтетических данных")
+    parser.add_argument("--sizes", default="1k,10k,100k", help="размеры через запятую (1k..1m)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--only", help="только кейсы, в имени которых есть подстрока")
+    parser.add_argument("--output", help="куда сохранить результаты (JSON)")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="база для сравнения (JSON)")
+    parser.add_argument("--threshold", type=float, default=0.25, help="допустимое замедление, доля (0.25 = 25%%)")
+    parser.add_argument("--list", action="store_true", help="показать кейсы и выйти")
+    args = parser.parse_args()
+    if args.list:
+        print("\n".join(CASES))
+        return
+
+    sizes = [parse_size(s) for s in args.sizes.split(",") if s.strip()]
+    current = run(sizes, args.repeat, args.only)
+    for key, r in current["results"].items():
+        print(f"{key:48} {r['ns_per_op']:12.1f} нс/оп  ({r['seconds']:.3f} с)")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(current, f, ensure_ascii=False, indent=2)
+        print(f"результаты сохранены в {args.output}")
+
+    if not os.path.exists(args.baseline):
+        print(f"база {args.baseline} не найдена, сравнение пропущено")
+        return
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    rows = compare(current, baseline, args.threshold)
+    regressions = [row for row in rows if row["regression"]]
+    for row in rows:
+        mark = "РЕГРЕССИЯ" if row["regression"] else ""
+        print(f"{row['key']:48} x{row['ratio']:.2f} {mark}")
+    print(f"сравнено {len(rows)}, регрессий {len(regressions)} (порог {args.threshold:.0%})")
+    if regressions:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
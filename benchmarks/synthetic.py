@@ -0,0 +1,98 @@
+from __future__ import annotations
+import random
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+from _loader import load_module
+
+# генераторы синтетических данных для бенчмарков; одинаковый seed — одинаковые данные
+
+TYPES = ("city", "off_road", "foldable")
+MODELS = ("X1", "X2", "Pro", "Lite", "Max")
+EXTRA = {"city": "max_speed", "off_road": "tire_type", "foldable": "weight"}
+
+def scooter_dicts(n: int, seed: int = 1) -> List[Dict[str, Any]]:
+    # записи в формате to_dict модуля 12_serialization
+    rnd = random.Random(seed)
+    result = []
+    for i in range(n):
+        t = TYPES[i % 3]
+        record = {
+            "type": t,
+            "scooter_id": f"SC-{i}",
+            "model": rnd.choice(MODELS),
+            "battery_level": rnd.randint(0, 100),
+            "hourly_rate": round(rnd.uniform(1, 20), 2),
+            "is_available": rnd.random() < 0.7,
+        }
+        if t == "city":
+            record["max_speed"] = rnd.choice([20, 25, 30])
+        elif t == "off_road":
+            record["tire_type"] = rnd.choice(["mud", "all-terrain"])
+        else:
+            record["weight"] = round(rnd.uniform(9, 15), 1)
+        result.append(record)
+    return result
+
+def scooters(n: int, seed: int = 1) -> List[Any]:
+    # самокаты 12_serialization (с расчетом стоимости и to_dict)
+    serialization = load_module("12_serialization")
+    return [serialization.Scooter.from_dict(d) for d in scooter_dicts(n, seed)]
+
+class StationScooter:
+    # легкий самокат для станций: только то, что читает RentalStation
+    __slots__ = ("scooter_id", "is_available")
+
+    def __init__(self, scooter_id: str, is_available: bool = True):
+        self.scooter_id = scooter_id
+        self.is_available = is_available
+
+def station_scooters(n: int, seed: int = 1) -> List[StationScooter]:
+    rnd = random.Random(seed)
+    return [StationScooter(f"SC-{i}", rnd.random() < 0.7) for i in range(n)]
+
+def stations(n: int, capacity: int = 50, indexed: bool = False, seed: int = 1) -> List[Any]:
+    # пустые станции с координатами вокруг Москвы
+    domain = load_module("03_domain_station")
+    rnd = random.Random(seed)
+    return [
+        domain.RentalStation(
+            f"ST-{i}", capacity,
+            domain.Location("Moscow", f"addr-{i}", latitude=55.75 + rnd.uniform(-0.2, 0.2),
+                            longitude=37.62 + rnd.uniform(-0.3, 0.3)),
+            indexed=indexed,
+        )
+        for i in range(n)
+    ]
+
+def rentals(n: int, seed: int = 1) -> List[Any]:
+    # аренды 13_comparisons за месяц
+    comparisons = load_module("13_comparisons")
+    rnd = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    result = []
+    for i in range(n):
+        hours = round(rnd.uniform(0.25, 8), 2)
+        result.append(comparisons.Rental(
+            rental_id=f"R-{i}",
+            customer_id=f"C-{rnd.randrange(max(1, n // 10))}",
+            scooter_id=f"SC-{rnd.randrange(n)}",
+            start=start + timedelta(seconds=rnd.randrange(30 * 24 * 3600)),
+            hours=hours,
+            cost=round(hours * rnd.uniform(1, 20), 2),
+        ))
+    return result
+
+def change_requests(n: int, seed: int = 1) -> List[Any]:
+    # запросы на изменение для всех уровней цепочки
+    chain = load_module("08_chain_of_responsibility")
+    rnd = random.Random(seed)
+    return [
+        chain.ChangeRequest(f"R-{i}", rnd.randint(0, 100), round(rnd.uniform(-100, 100), 2))
+        for i in range(n)
+    ]
+
+def rental_requests(n: int, seed: int = 1) -> List[tuple]:
+    # тройки (scooter_id, customer_id, hours) для rent_scooter
+    rnd = random.Random(seed)
+    return [(f"SC-{rnd.randrange(n)}", f"C-{rnd.randrange(max(1, n // 10))}", rnd.choice([0.5, 1, 2, 4])) for _ in range(n)]
@@ -0,0 +1,166 @@
+from __future__ import annotations
+import importlib.util
+import multiprocessing as mp
+import os
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+def _load(name: str):
+    # имена модулей начинаются с цифры, поэтому грузим их по пути к файлу
+    key = "scooter_" + name
+    if key in sys.modules:
+        return sys.modules[key]
+    spec = importlib.util.spec_from_file_location(key, ROOT / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[key] = module
+    spec.loader.exec_module(module)
+    return module
+
+template = _load("09_template_method")
+
+class FakeClock:
+    # часы в наносекундах, которыми управляет тест
+    def __init__(self, ms: int):
+        self.ns = ms * 1_000_000
+
+    def __call__(self) -> int:
+        return self.ns
+
+@pytest.fixture
+def no_worker_env(monkeypatch):
+    monkeypatch.delenv(template.WORKER_ID_ENV, raising=False)
+    monkeypatch.delenv(template.WORKER_LEASE_DIR_ENV, raising=False)
+    monkeypatch.delenv(template.WORKER_ID_STRICT_ENV, raising=False)
+    monkeypatch.setattr(template, "_default_generator", None)
+    monkeypatch.setattr(template, "_random_warned", False)
+
+def test_missing_worker_id_falls_back_to_random(no_worker_env):
+    # шаблонный метод работает без настройки; предупреждение — один раз
+    with pytest.warns(RuntimeWarning):
+        online = template.OnlineRentalProcess().rent_scooter("S1", "C1", 2)
+    offline = template.OfflineRentalProcess().rent_scooter("S1", "C1", 2)
+    assert online["rental_id"].startswith("ONL-") and offline["rental_id"].startswith("OFF-")
+    assert template.parse_rental_id(online["rental_id"])["worker_id"] == template.default_rental_ids().worker_id
+
+def test_missing_worker_id_fails_in_strict_mode(no_worker_env, monkeypatch):
+    with pytest.raises(template.WorkerIdError):
+        template.RentalIdGenerator(strict=True)
+    monkeypatch.setenv(template.WORKER_ID_STRICT_ENV, "1")
+    with pytest.raises(template.WorkerIdError):
+        template.RentalIdGenerator()
+
+def test_worker_id_env_out_of_range(no_worker_env, monkeypatch):
+    monkeypatch.setenv(template.WORKER_ID_ENV, str(template.MAX_WORKER_ID + 1))
+    with pytest.raises(template.WorkerIdError):
+        template.RentalIdGenerator()
+
+def test_sequence_overflow_takes_next_millisecond():
+    start = template.RENTAL_ID_EPOCH_MS + 1000
+    generator = template.RentalIdGenerator(worker_id=3, clock=FakeClock(start))
+    ids = [generator.next_id("ONL") for _ in range(3 * 4096 + 5)]
+    assert len(set(ids)) == len(ids)
+    assert ids == sorted(ids)
+    parsed = [template.parse_rental_id(i) for i in ids]
+    assert parsed[4095]["created_ms"] == start and parsed[4095]["sequence"] == 4095
+    assert parsed[4096]["created_ms"] == start + 1 and parsed[4096]["sequence"] == 0
+    assert parsed[-1]["created_ms"] == start + 3
+    assert {p["worker_id"] for p in parsed} == {3}
+
+def test_clock_moving_backwards_keeps_order():
+    clock = FakeClock(template.RENTAL_ID_EPOCH_MS + 10_000)
+    generator = template.RentalIdGenerator(worker_id=1, clock=clock)
+    ids = [generator.next_int() for _ in range(10)]
+    clock.ns -= 5_000 * 1_000_000
+    ids += [generator.next_int() for _ in range(5000)]
+    clock.ns += 10_000 * 1_000_000
+    ids += [generator.next_int() for _ in range(10)]
+    assert len(set(ids)) == len(ids)
+    assert ids == sorted(ids)
+
+def test_string_matches_integer():
+    generator = template.RentalIdGenerator(worker_id=7, clock=FakeClock(template.RENTAL_ID_EPOCH_MS + 5))
+    for _ in range(5000):
+        text = generator.next_id("OFF")
+        assert text == f"OFF-{generator.next_int() - 1:016x}"
+
+_PROCESS_SCRIPT = textwrap.dedent("""
+    import importlib.util, sys
+    spec = importlib.util.spec_from_file_location("tm", sys.argv[1])
+    tm = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(tm)
+    generator = tm.RentalIdGenerator()
+    print("\\n".join(generator.next_id("ONL") for _ in range(int(sys.argv[2]))))
+""")
+
+def test_unique_across_independent_processes(tmp_path, no_worker_env):
+    # одновременные независимые процессы арендуют разные номера из каталога
+    env = dict(os.environ, **{template.WORKER_LEASE_DIR_ENV: str(tmp_path / "workers")})
+    procs = [
+        subprocess.Popen([sys.executable, "-c", _PROCESS_SCRIPT, str(ROOT / "09_template_method.py"), "20000"],
+                         env=env, stdout=subprocess.PIPE, text=True)
+        for _ in range(6)
+    ]
+    batches = [p.communicate(timeout=60)[0].split() for p in procs]
+    assert all(p.returncode == 0 for p in procs)
+    flat = [i for batch in batches for i in batch]
+    assert len(flat) == 6 * 20000
+    assert len(set(flat)) == len(flat)
+    assert len({template.parse_rental_id(b[0])["worker_id"] for b in batches}) == 6
+
+_leased = None
+
+def _leased_ids(n: int) -> list:
+    return [_leased.next_id("ONL") for _ in range(n)]
+
+def _inherited_env_fails(_) -> bool:
+    try:
+        template.default_rental_ids().next_id("ONL")
+    except template.WorkerIdError:
+        return True
+    return False
+
+@pytest.mark.skipif("fork" not in mp.get_all_start_methods(), reason="нужен fork")
+def test_unique_across_forked_children(tmp_path, no_worker_env, monkeypatch):
+    global _leased
+    _leased = template.RentalIdGenerator(lease_dir=str(tmp_path / "workers"))
+    parent = _leased_ids(100)
+    with mp.get_context("fork").Pool(4) as pool:
+        batches = pool.map(_leased_ids, [20000] * 4)
+    flat = parent + [i for batch in batches for i in batch]
+    assert len(set(flat)) == len(flat)
+
+@pytest.mark.skipif("fork" not in mp.get_all_start_methods(), reason="нужен fork")
+def test_forked_child_cannot_reuse_env_worker_id(no_worker_env, monkeypatch):
+    monkeypatch.setenv(template.WORKER_ID_ENV, "5")
+    template.default_rental_ids().next_id("ONL")
+    with mp.get_context("fork").Pool(2) as pool:
+        assert all(pool.map(_inherited_env_fails, range(2)))
+
+def _default_ids(n: int) -> list:
+    return [template.default_rental_ids().next_id("ONL") for _ in range(n)]
+
+@pytest.mark.skipif("fork" not in mp.get_all_start_methods(), reason="нужен fork")
+def test_forked_child_keeps_working_with_random_worker_id(no_worker_env):
+    # случайный номер в потомке выбирается заново, генератор не блокируется
+    with pytest.warns(RuntimeWarning):
+        parent = _default_ids(10)
+    with mp.get_context("fork").Pool(2) as pool:
+        batches = pool.map(_default_ids, [1000, 1000])
+    assert all(len(set(batch)) == 1000 for batch in batches)
+    assert parent == sorted(parent)
+
+def test_subclass_without_super_init(no_worker_env, monkeypatch):
+    monkeypatch.setenv(template.WORKER_ID_ENV, "2")
+
+    class Legacy(template.OnlineRentalProcess):
+        def __init__(self):
+            self.calls = 0
+
+    rental = Legacy().rent_scooter("SC-1", "C-1", 1)
+    assert template.parse_rental_id(rental["rental_id"])["worker_id"] == 2